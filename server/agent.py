@@ -0,0 +1,430 @@
+"""
+Worker agent for multi-host deployments.
+
+Runs on each bot host when the front server is started with DISPATCH_MODE=dispatcher.
+It starts runner.py processes on request of the dispatcher, with the same warm
+worker pool, spawner, reaper and admission control as the server in local mode,
+and pushes its capacity, running bots and exits to the dispatcher every
+AGENT_REPORT_SECS and as soon as a bot exits. Draining an agent (SIGUSR1 or
+POST /admin/drain) reports it full, so the dispatcher places no further calls
+on it, and shuts it down once its bots have finished.
+
+Several agents can run on one machine for local testing:
+    python agent.py --port 7871 --dispatcher http://127.0.0.1:7860
+    python agent.py --port 7872 --dispatcher http://127.0.0.1:7860
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Set
+
+import aiohttp
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from loguru import logger
+
+from config.server import ServerConfig
+from utils.access import check_admin, check_agent_key
+from utils.admission import AdmissionController, AdmissionRejected
+from utils.drain import DrainController, stop_processes
+from utils.events import RUNNER_EVENTS
+from utils.ipc import read_messages
+from utils.metrics import (
+    MetricsCollector,
+    admission_metrics,
+    process_metrics,
+    registry_metrics,
+    render_exposition,
+)
+from utils.reaper import ProcessReaper
+from utils.resources import ResourceLimiter, parse_cpu_list
+from utils.registry import BotRegistry
+from utils.spawner import BotSpawner
+from utils.worker_pool import WorkerPool
+
+# Reported exits are dropped after this long if the dispatcher never acknowledges them
+EXIT_RETENTION_SECS = 60
+
+# Bot channel messages kept for the next report while the dispatcher is unreachable
+MAX_PENDING_EVENTS = 1000
+
+# Load server configuration
+server_config = ServerConfig()
+
+# Runtime state
+bot_registry = BotRegistry()
+bot_args: list[str] = []
+pending_exits: Dict[int, Dict[str, Any]] = {}  # Exits not yet acknowledged by the dispatcher
+pending_events: List[Dict[str, Any]] = []  # Bot channel messages not yet reported
+pipeline_metrics = MetricsCollector()  # Pipeline metrics of this agent's bots, on /metrics
+report_now = asyncio.Event()
+
+admission = AdmissionController(
+    active_count=lambda: bot_registry.active_count,
+    max_bots=server_config.max_bots,
+    cpu_per_bot=server_config.bot_cpu_budget,
+    memory_per_bot_mb=server_config.bot_memory_mb,
+    max_cpu_utilization=server_config.max_cpu_utilization,
+    queue_timeout=server_config.admission_queue_timeout,
+    max_queue=server_config.admission_max_queue,
+    retry_after=server_config.admission_retry_after,
+)
+
+resource_limiter = ResourceLimiter(
+    pin_cpus=server_config.bot_cpu_pinning,
+    cpus=parse_cpu_list(server_config.bot_cpus),
+    memory_max_mb=server_config.bot_memory_max_mb,
+    cpu_quota=server_config.bot_cpu_quota,
+)
+
+# Configure loguru (removing default handler and adding our custom handler)
+logger.remove()
+logger.add(
+    sys.stderr,
+    level="DEBUG",
+    format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
+    enqueue=True,
+)
+
+
+def build_report() -> Dict[str, Any]:
+    """Capacity, running bots and unacknowledged exits of this agent."""
+    capacity = admission.snapshot()
+    if drain.draining:
+        capacity["free"] = 0
+    return {
+        "agent_id": server_config.agent_id,
+        "url": server_config.agent_url,
+        **capacity,
+        "draining": drain.draining,
+        "active": bot_registry.active_count,
+        "running": [record.pid for record in bot_registry.active()],
+        "exits": list(pending_exits.values()),
+        "events": list(pending_events),
+    }
+
+
+async def send_report(session: aiohttp.ClientSession) -> None:
+    """Push one report to the dispatcher and drop what it acknowledged."""
+    headers = {"X-Agent-Key": server_config.agent_api_key}
+    report = build_report()
+    try:
+        async with session.post(
+            f"{server_config.dispatcher_url}/agents/report",
+            json=report,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=server_config.agent_report_interval),
+        ) as r:
+            r.raise_for_status()
+            del pending_events[: len(report["events"])]
+            for pid in (await r.json())["acked"]:
+                pending_exits.pop(pid, None)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning(f"Failed to report to dispatcher: {e!r}")
+
+
+async def report_loop(session: aiohttp.ClientSession) -> None:
+    """Push reports to the dispatcher periodically and right after a bot exits."""
+    while True:
+        await send_report(session)
+
+        expired = time.time() - EXIT_RETENTION_SECS
+        for pid in [pid for pid, e in pending_exits.items() if e["ended_at"] < expired]:
+            del pending_exits[pid]
+
+        report_now.clear()
+        try:
+            await asyncio.wait_for(report_now.wait(), server_config.agent_report_interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts the warm worker pool and the report loop, and stops them on shutdown.
+    Bots still running at shutdown are stopped and their exits reported one last time.
+    """
+    session = aiohttp.ClientSession()
+    await worker_pool.start()
+    reporter = asyncio.create_task(report_loop(session))
+    logger.info(
+        f"Worker agent {server_config.agent_id} at {server_config.agent_url} "
+        f"reporting to {server_config.dispatcher_url}"
+    )
+    if hasattr(signal, "SIGUSR1"):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, begin_drain, "SIGUSR1")
+    try:
+        yield
+    finally:
+        await stop_bots()
+        reporter.cancel()
+        await worker_pool.stop()
+        await reaper.stop()
+        if pending_exits:
+            await send_report(session)
+        spawner.shutdown()
+        await session.close()
+
+
+async def handle_bot_exit(proc: subprocess.Popen) -> None:
+    """
+    Called by the reaper as soon as a bot process exits; queues the exit for the dispatcher.
+    """
+    record = bot_registry.finish(proc.pid, proc.returncode)
+    if not record:
+        return
+    admission.notify()
+    drain.notify()
+    logger.info(f"Bot process {proc.pid} exited with code {proc.returncode}")
+    pending_exits[proc.pid] = {
+        "pid": proc.pid,
+        "exit_code": proc.returncode,
+        "ended_at": record.ended_at,
+    }
+    report_now.set()
+
+
+def handle_bot_message(pid: int, message: Dict[str, Any]) -> None:
+    """Queue lifecycle messages from a bot's channel for the dispatcher and record metrics."""
+    if message.get("type") in RUNNER_EVENTS and len(pending_events) < MAX_PENDING_EVENTS:
+        pending_events.append({"pid": pid, **message})
+    elif message.get("type") == "metrics":
+        pipeline_metrics.record(message)
+
+
+async def read_bot_channel(proc: subprocess.Popen) -> None:
+    async for message in read_messages(proc.stdout):
+        handle_bot_message(proc.pid, message)
+
+
+async def stop_bots() -> None:
+    """Stop the bots still running; their exits are queued for the dispatcher."""
+    procs = [record.proc for record in bot_registry.active() if record.proc]
+    if procs:
+        logger.warning(f"Stopping {len(procs)} running bots")
+        await stop_processes(procs, server_config.drain_stop_grace)
+
+
+async def drained(timed_out: bool) -> None:
+    """Shut the agent down once a drain completes."""
+    await stop_bots()
+    logger.info("Drain complete, shutting down")
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+def begin_drain(reason: str) -> None:
+    """Start draining and tell the dispatcher right away that the agent takes no more bots."""
+    if drain.begin(reason):
+        report_now.set()
+
+
+drain = DrainController(
+    active_count=lambda: bot_registry.active_count,
+    timeout=server_config.drain_timeout,
+    on_drained=drained,
+)
+reaper = ProcessReaper(on_exit=handle_bot_exit)
+channel_readers: Set[asyncio.Task] = set()
+
+app: FastAPI = FastAPI(lifespan=lifespan)
+
+
+def check_not_draining() -> None:
+    if drain.draining:
+        raise HTTPException(
+            status_code=503,
+            detail="Agent is draining",
+            headers={"Retry-After": str(server_config.admission_retry_after)},
+        )
+
+
+def parse_agent_args():
+    """Parse agent-specific arguments and store remaining args for bot processes"""
+    import argparse
+
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--host", help="Agent host")
+    parser.add_argument("--port", type=int, help="Agent port")
+    parser.add_argument("--dispatcher", help="Dispatcher URL (default: DISPATCHER_URL)")
+    parser.add_argument("--agent-url", help="URL the dispatcher reaches this agent at")
+    parser.add_argument("--agent-id", help="Agent ID (default: hostname:port)")
+
+    agent_args, remaining_args = parser.parse_known_args()
+
+    if agent_args.host:
+        server_config.host = agent_args.host
+    if agent_args.port:
+        server_config.port = agent_args.port
+    if agent_args.dispatcher:
+        server_config.dispatcher_url = agent_args.dispatcher
+    if agent_args.agent_url:
+        server_config.agent_url = agent_args.agent_url
+    if agent_args.agent_id:
+        server_config.agent_id = agent_args.agent_id
+
+    if not server_config.dispatcher_url:
+        parser.error("--dispatcher or DISPATCHER_URL is required")
+    if not server_config.agent_api_key:
+        parser.error("AGENT_API_KEY is required, the key shared with the dispatcher")
+    server_config.agent_url = server_config.agent_url or (
+        f"http://{socket.gethostname()}:{server_config.port}"
+    )
+    server_config.agent_id = server_config.agent_id or (
+        f"{socket.gethostname()}:{server_config.port}"
+    )
+
+    global bot_args
+    bot_args = remaining_args
+
+
+parse_agent_args()
+
+
+spawner = BotSpawner(
+    server_dir=os.path.dirname(os.path.abspath(__file__)),
+    bot_args=bot_args,
+    threads=server_config.spawn_threads,
+    runner=server_config.bot_runner,
+    limiter=resource_limiter,
+)
+
+worker_pool = WorkerPool(
+    size=server_config.warm_workers,
+    spawn=lambda: spawner.spawn("--worker", stdin=subprocess.PIPE, stdout=subprocess.PIPE),
+    on_message=handle_bot_message,
+)
+
+
+@app.post("/spawn")
+async def spawn_bot(request: Request) -> Dict[str, Any]:
+    """
+    Start a bot for the given room.
+
+    Returns:
+        Dict containing the bot's pid
+    """
+    check_agent_key(request, server_config.agent_api_key)
+    body = await request.json()
+    room_url, token = body["room_url"], body["token"]
+    # Trace context of the dispatcher's connect, continued by the bot's spans
+    traceparent = body.get("traceparent")
+    # Profile payload the bot runs with, applied over this agent's configuration
+    profile = body.get("profile")
+
+    check_not_draining()
+    try:
+        await admission.acquire()
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
+
+    try:
+        check_not_draining()
+        proc = worker_pool.acquire(room_url, token, traceparent, profile)
+        if proc is None:
+            trace_args = ("--traceparent", traceparent) if traceparent else ()
+            profile_args = ("--profile", json.dumps(profile)) if profile else ()
+            proc = await spawner.spawn(
+                "-u", room_url, "-t", token, *trace_args, *profile_args, stdout=subprocess.PIPE
+            )
+            reader = asyncio.create_task(read_bot_channel(proc))
+            channel_readers.add(reader)
+            reader.add_done_callback(channel_readers.discard)
+        bot_registry.add(proc.pid, room_url, proc)
+        reaper.watch(proc)
+    except Exception as e:
+        logger.error(f"Bot startup failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to start bot process: {e}")
+    finally:
+        admission.release()
+
+    logger.info(f"Started bot process {proc.pid} for room {room_url}")
+    return {"pid": proc.pid}
+
+
+@app.get("/capacity")
+async def get_capacity(request: Request) -> Dict[str, Any]:
+    """
+    Health check for the dispatcher: the agent's current capacity.
+    """
+    check_agent_key(request, server_config.agent_api_key)
+    report = build_report()
+    del report["exits"]
+    return report
+
+
+@app.get("/metrics")
+async def get_metrics() -> PlainTextResponse:
+    """
+    Prometheus metrics of the bots on this agent; scrape every agent for the fleet view.
+    """
+    # Async so that the snapshots are taken on the event loop; only /proc reads use a thread
+    processes = await asyncio.to_thread(resource_limiter.running)
+    return PlainTextResponse(
+        render_exposition(
+            pipeline_metrics.render(),
+            registry_metrics(bot_registry.summary()),
+            process_metrics(processes),
+            admission_metrics(admission.snapshot()),
+        ),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@app.get("/status")
+async def get_status_summary() -> Dict[str, Any]:
+    """
+    Get aggregate status of the bots on this agent.
+    """
+    # Async so that the snapshots are taken on the event loop, which changes the state
+    exits: List[Dict[str, Any]] = [record.to_dict() for record in bot_registry.recent_exits()]
+    return {
+        **bot_registry.summary(),
+        "recent_exits": exits,
+        "admission": admission.snapshot(),
+        "drain": drain.snapshot(),
+        "resources": resource_limiter.snapshot(),
+    }
+
+
+@app.get("/status/{pid}")
+async def get_status(pid: int):
+    """
+    Get the status of a specific bot process, with its resource usage while it runs.
+    """
+    record = bot_registry.get(pid)
+    if not record:
+        raise HTTPException(status_code=404, detail=f"Bot with process id: {pid} not found")
+    status = record.to_dict()
+    if record.state == "running":
+        # /proc and cgroup reads stay off the event loop
+        status["resources"] = await asyncio.to_thread(resource_limiter.usage, record.pid)
+    return JSONResponse(status)
+
+
+@app.post("/admin/drain")
+async def start_drain(request: Request) -> Dict[str, Any]:
+    """
+    Stop taking bots, wait for running ones to finish (up to DRAIN_TIMEOUT_SECS), then
+    shut down. Requires ADMIN_API_KEY if set, otherwise only loopback clients may drain.
+    """
+    check_admin(request, server_config.admin_api_key)
+    begin_drain(f"requested by {request.client.host if request.client else 'unknown'}")
+    return drain.snapshot()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    logger.info("Starting worker agent")
+    uvicorn.run(app, host=server_config.host, port=server_config.port)
@@ -1,19 +1,16 @@
 """Base bot framework for shared functionality."""
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Optional, List, Dict
 
+from pipecat.observers.base_observer import BaseObserver
 from pipecat.pipeline.task import PipelineParams, PipelineTask
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.parallel_pipeline import ParallelPipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.processors.frameworks.rtvi import RTVIConfig, RTVIProcessor
 from pipecat.processors.filters.function_filter import FunctionFilter
-from pipecat.services.deepgram import DeepgramSTTService, DeepgramTTSService
-from pipecat.services.cartesia import CartesiaTTSService
-from pipecat.services.elevenlabs import ElevenLabsTTSService
-from pipecat.services.google import GoogleLLMService
-from pipecat.services.openai import OpenAILLMService
 from pipecat.processors.aggregators.openai_llm_context import (
     OpenAILLMContext,
     OpenAILLMContextFrame,
@@ -23,9 +20,7 @@ from pipecat.processors.filters.stt_mute_filter import (
     STTMuteConfig,
     STTMuteStrategy,
 )
-from pipecat.services.rime import RimeHttpTTSService
 from pipecat.transports.services.daily import DailyTransport, DailyParams
-from pipecat.audio.vad.silero import SileroVADAnalyzer
 from pipecat.sync.event_notifier import EventNotifier
 from pipecat.processors.user_idle_processor import UserIdleProcessor
 from pipecat.frames.frames import (
@@ -38,13 +33,14 @@ from pipecat.frames.frames import (
     FunctionCallInProgressFrame,
     FunctionCallResultFrame,
 )
-from deepgram import LiveOptions
-
 from loguru import logger
 import time
 
+from .completeness import CompletenessClassifier, load_model
+from .providers import create_llm, create_stt, create_tts
+from .vad import SharedSileroVADAnalyzer
+from .warmup import ServiceWarmUp
 from .smart_endpointing import (
-    CLASSIFIER_SYSTEM_INSTRUCTION,
     CompletenessCheck,
     OutputGate,
     StatementJudgeContextFilter,
@@ -63,96 +59,14 @@ class BaseBot(ABC):
         """
         self.config = config
 
-        # Initialize STT service
-        self.stt = DeepgramSTTService(
-            api_key=config.deepgram_api_key, live_options=LiveOptions(model="nova-3-general")
+        # Initialize STT, TTS and LLM services; only the selected providers are imported
+        self.stt = create_stt(config)
+        self.tts = create_tts(config)
+        system_instruction = (
+            system_messages[0]["content"] if system_messages else "You are a voice assistant"
         )
-
-        # Initialize TTS service
-        match config.tts_provider:
-            case "elevenlabs":
-                if not config.elevenlabs_api_key:
-                    raise ValueError("ElevenLabs API key is required for ElevenLabs TTS")
-
-                self.tts = ElevenLabsTTSService(
-                    api_key=config.elevenlabs_api_key,
-                    voice_id=config.elevenlabs_voice_id,
-                )
-            case "cartesia":
-                if not config.cartesia_api_key:
-                    raise ValueError("Cartesia API key is required for Cartesia TTS")
-
-                self.tts = CartesiaTTSService(
-                    api_key=config.cartesia_api_key, voice_id=config.cartesia_voice
-                )
-            case "deepgram":
-                if not config.deepgram_api_key:
-                    raise ValueError("Deepgram API key is required for Deepgram TTS")
-
-                self.tts = DeepgramTTSService(
-                    api_key=config.deepgram_api_key, voice=config.deepgram_voice
-                )
-            case "rime":
-                if not config.rime_api_key:
-                    raise ValueError("Rime API key is required for Rime TTS")
-
-                self.tts = RimeHttpTTSService(
-                    api_key=config.rime_api_key,
-                    voice_id=config.rime_voice_id,
-                    params=RimeHttpTTSService.InputParams(
-                        reduce_latency=config.rime_reduce_latency,
-                        speed_alpha=config.rime_speed_alpha,
-                    ),
-                )
-            case _:
-                raise ValueError(f"Invalid TTS provider: {config.tts_provider}")
-
-        # Initialize LLM services
-        match config.llm_provider:
-            case "google":
-                if not config.google_api_key:
-                    raise ValueError("Google API key is required for Google LLM")
-
-                # Main conversation LLM
-                system_instruction = (
-                    system_messages[0]["content"]
-                    if system_messages
-                    else "You are a voice assistant"
-                )
-                self.conversation_llm = GoogleLLMService(
-                    api_key=config.google_api_key,
-                    model=config.google_model,
-                    params=config.google_params,
-                    system_instruction=system_instruction,
-                )
-                self.llm = self.conversation_llm
-
-                # Statement classifier LLM for endpoint detection
-                self.statement_llm = GoogleLLMService(
-                    name="StatementJudger",
-                    api_key=config.google_api_key,
-                    model=config.classifier_model,
-                    temperature=0.0,
-                    system_instruction=CLASSIFIER_SYSTEM_INSTRUCTION,
-                )
-
-            case "openai":
-                if not config.openai_api_key:
-                    raise ValueError("OpenAI API key is required for OpenAI LLM")
-
-                self.conversation_llm = OpenAILLMService(
-                    api_key=config.openai_api_key,
-                    model=config.openai_model,
-                    params=config.openai_params,
-                )
-
-                # Note: Smart endpointing currently only supports Google LLM
-                raise NotImplementedError(
-                    "Smart endpointing is currently only supported with Google LLM"
-                )
-
-            case _:
-                raise ValueError(f"Invalid LLM provider: {config.llm_provider}")
+        self.conversation_llm, self.statement_llm = create_llm(config, system_instruction)
+        self.llm = self.conversation_llm
 
         # Initialize context
         self.context = OpenAILLMContext(messages=system_messages)
@@ -179,7 +93,7 @@ class BaseBot(ABC):
         self.transport_params = DailyParams(
             audio_out_enabled=True,
             vad_enabled=True,
-            vad_analyzer=SileroVADAnalyzer(),
+            vad_analyzer=SharedSileroVADAnalyzer(),
             vad_audio_passthrough=True,
         )
 
@@ -188,8 +102,22 @@ class BaseBot(ABC):
 
         # Initialize smart endpointing components
         self.notifier = EventNotifier()
-        self.statement_judge_context_filter = StatementJudgeContextFilter(notifier=self.notifier)
-        self.completeness_check = CompletenessCheck(notifier=self.notifier)
+        # Confident turns are classified locally, the rest by the statement LLM
+        self.completeness_classifier = CompletenessClassifier(
+            (
+                load_model(config.endpoint_model_file)
+                if config.endpoint_classifier == "local"
+                else None
+            ),
+            confidence=config.endpoint_confidence,
+            log_file=config.endpoint_log_file,
+        )
+        self.statement_judge_context_filter = StatementJudgeContextFilter(
+            notifier=self.notifier, classifier=self.completeness_classifier
+        )
+        self.completeness_check = CompletenessCheck(
+            notifier=self.notifier, classifier=self.completeness_classifier
+        )
         self.output_gate = OutputGate(notifier=self.notifier, start_open=True)
 
         async def user_idle_notifier(frame):
@@ -201,6 +129,7 @@ class BaseBot(ABC):
         self.transport: Optional[DailyTransport] = None
         self.task: Optional[PipelineTask] = None
         self.runner: Optional[PipelineRunner] = None
+        self.pipeline_params: Optional[PipelineParams] = None
 
     async def setup_transport(self, url: str, token: str):
         """Set up the transport with the given URL and token."""
@@ -232,8 +161,16 @@ class BaseBot(ABC):
                 ]
             )
 
-    def create_pipeline(self):
-        """Create the processing pipeline."""
+    def create_pipeline(
+        self, handle_sigint: bool = True, observers: Optional[List[BaseObserver]] = None
+    ):
+        """Create the processing pipeline.
+
+        Args:
+            handle_sigint: Whether the pipeline runner stops the bot on SIGINT; disabled when
+                several bots share a process.
+            observers: Observers watching the frames flowing through the pipeline.
+        """
         if not self.transport:
             raise RuntimeError("Transport must be set up before creating pipeline")
 
@@ -293,15 +230,60 @@ class BaseBot(ABC):
             ]
         )
 
-        self.task = PipelineTask(
-            pipeline,
-            PipelineParams(
-                allow_interruptions=True,
-                enable_metrics=True,
-                enable_usage_metrics=True,
-            ),
+        self.pipeline_params = PipelineParams(
+            allow_interruptions=True,
+            enable_metrics=True,
+            enable_usage_metrics=True,
+            observers=observers or [],
         )
-        self.runner = PipelineRunner()
+        self.task = PipelineTask(pipeline, self.pipeline_params)
+        self.runner = PipelineRunner(handle_sigint=handle_sigint)
+
+    def warm_up(self) -> asyncio.Task:
+        """Open the service connections and load the VAD model in the background.
+
+        Started before `start`, this runs while the transport joins the room; the
+        services then adopt the connections instead of opening them when the
+        pipeline starts. Failures are logged and left to the services' own connect.
+
+        Returns:
+            Task resolving to the seconds each warm-up took, by component.
+        """
+        if not self.pipeline_params:
+            raise RuntimeError("Pipeline must be created before warming up")
+
+        started = time.monotonic()
+        steps = {
+            "vad": asyncio.create_task(asyncio.to_thread(self.transport_params.vad_analyzer.load))
+        }
+        for name, service in (
+            ("stt", self.stt),
+            ("tts", self.tts),
+            ("llm", self.conversation_llm),
+            ("statement_llm", self.statement_llm),
+        ):
+            if isinstance(service, ServiceWarmUp):
+                steps[name] = service.warm_up(self.pipeline_params)
+
+        async def timed(name: str, step: asyncio.Task, timings: Dict[str, float]):
+            try:
+                await step
+            except Exception as e:
+                logger.warning(f"Warm-up of {name} failed: {e}")
+            else:
+                timings[name] = time.monotonic() - started
+
+        async def run() -> Dict[str, float]:
+            timings: Dict[str, float] = {}
+            try:
+                await asyncio.gather(*(timed(name, step, timings) for name, step in steps.items()))
+            finally:
+                for step in steps.values():
+                    step.cancel()
+            logger.debug(f"Warmed up: {timings}")
+            return timings
+
+        return asyncio.create_task(run())
 
     async def start(self):
         """Start the bot's main task."""
@@ -316,6 +298,10 @@ class BaseBot(ABC):
         if self.transport:
             await self.transport.close()
 
+    def current_node(self) -> Optional[str]:
+        """Name of the conversation flow node the bot is in, for bots that use flows."""
+        return None
+
     @abstractmethod
     async def _handle_first_participant(self):
         """Override in subclass to handle the first participant joining."""
@@ -0,0 +1,239 @@
+"""Local completeness classifier for smart endpointing.
+
+Deciding whether the user has finished speaking with the statement LLM costs
+a network round trip on every turn before the output gate opens. Most turns
+are easy ("Yes", "My name is John Smith." versus "Well I think it"), so a
+small logistic regression over word n-grams of the user's text, its last
+words and its overlap with the assistant's previous prompt answers those
+locally in microseconds. Only turns where the model is not confident go to the
+statement LLM, whose decisions can be logged as training data for the next
+model.
+
+The default model is trained, when first used, from the labelled examples in
+`CLASSIFIER_SYSTEM_INSTRUCTION`. `tools/endpointing_report.py` trains a model
+from those examples and logged decisions, saves it for `ENDPOINT_MODEL_FILE`
+and reports its accuracy and latency.
+"""
+
+import json
+import math
+import re
+import time
+from dataclasses import dataclass
+from functools import cache
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+
+from loguru import logger
+
+_WORD = re.compile(r"[£$€]?\d[\d,.]*[km]?|[a-z]+(?:'[a-z]+)?")
+_FILLER = re.compile(r"^(?:u+[hm]+|h+m+|e+r+m+|a+h+)$")
+_EXAMPLE = re.compile(r"^- User: (.*?) → Output: (YES|NO)\b")
+_ASSISTANT = re.compile(r"^Assistant: (.*)$")
+
+# Words a finished statement rarely ends with: articles, prepositions, conjunctions, subjects,
+# and the digits, number words and "dot"/"at" of numbers and addresses being spelled out, which
+# pause between parts. The examples are too few for the model to learn this, so it is checked
+# before a local YES.
+_OPEN_ENDINGS = frozenset(
+    "a an the my your our their his her this these those to of for in on at with from by"
+    " about around into and but or so because if than as is are was were am be i we they he"
+    " she i'm i'd i've we're they're it's that's there's like just"
+    " <num> oh zero one two three four five six seven eight nine ten eleven twelve twenty"
+    " thirty forty fifty sixty seventy eighty ninety hundred thousand million double triple"
+    " dot underscore dash hyphen plus".split()
+)
+
+
+@dataclass(frozen=True)
+class Example:
+    user: str
+    assistant: str
+    complete: bool
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words, with numbers and amounts as `<num>` and filler words as `<filler>`."""
+    tokens = []
+    for token in _WORD.findall(text.lower()):
+        if token[0] in "£$€" or token[0].isdigit():
+            token = "<num>"
+        elif _FILLER.match(token):
+            token = "<filler>"
+        tokens.append(token)
+    return tokens
+
+
+def features(user: str, assistant: str = "") -> List[str]:
+    """Features of a user turn given the assistant's previous prompt."""
+    words = tokenize(user)
+    if not words:
+        return ["empty"]
+    found = [f"w:{word}" for word in words]
+    found += [f"b:{first}_{second}" for first, second in zip(words, words[1:])]
+    found += [f"first:{words[0]}", f"last:{words[-1]}", f"len:{min(len(words), 5)}"]
+    end = user.rstrip()[-1:]
+    if end in (".", "?", "!"):
+        found.append(f"end:{end}")
+    # Stopping on a word of the prompt often means an option was only half repeated
+    if words[-1] in tokenize(assistant):
+        found.append("echo:last")
+    return found
+
+
+def ends_open(text: str) -> bool:
+    """Whether the text stops on a word a finished statement rarely ends with ("My name is")."""
+    words = tokenize(text)
+    return bool(words) and words[-1] in _OPEN_ENDINGS and text.rstrip()[-1:].isalnum()
+
+
+def _sigmoid(z: float) -> float:
+    return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+
+
+class CompletenessModel:
+    """Logistic regression over sparse binary features."""
+
+    def __init__(self, weights: Dict[str, float], bias: float):
+        self.weights = weights
+        self.bias = bias
+
+    def probability(self, user: str, assistant: str = "") -> float:
+        """Probability that the user turn is complete."""
+        weights = self.weights
+        z = self.bias + sum(weights.get(feature, 0.0) for feature in features(user, assistant))
+        return _sigmoid(z)
+
+    @classmethod
+    def train(
+        cls,
+        examples: Iterable[Example],
+        epochs: int = 200,
+        learning_rate: float = 0.3,
+        l2: float = 0.01,
+    ) -> "CompletenessModel":
+        """Fit with stochastic gradient descent; deterministic for the same examples."""
+        data = [(features(e.user, e.assistant), 1.0 if e.complete else 0.0) for e in examples]
+        weights: Dict[str, float] = {}
+        bias = 0.0
+        for _ in range(epochs):
+            for found, label in data:
+                error = _sigmoid(bias + sum(weights.get(f, 0.0) for f in found)) - label
+                bias -= learning_rate * error
+                for f in found:
+                    weight = weights.get(f, 0.0)
+                    weights[f] = weight - learning_rate * (error + l2 * weight)
+        return cls(weights, bias)
+
+    def to_dict(self) -> Dict:
+        return {"bias": self.bias, "weights": self.weights}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CompletenessModel":
+        return cls(dict(data["weights"]), float(data["bias"]))
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1, sort_keys=True)
+
+
+def instruction_examples(instruction: Optional[str] = None) -> List[Example]:
+    """Labelled examples of the classifier instruction, with the assistant prompt they answer."""
+    if instruction is None:
+        from bots.smart_endpointing import CLASSIFIER_SYSTEM_INSTRUCTION
+
+        instruction = CLASSIFIER_SYSTEM_INSTRUCTION
+
+    examples = []
+    assistant = ""
+    for line in instruction.splitlines():
+        line = line.strip()
+        if match := _ASSISTANT.match(line):
+            assistant = match.group(1)
+        elif match := _EXAMPLE.match(line):
+            examples.append(Example(match.group(1), assistant, match.group(2) == "YES"))
+    return examples
+
+
+def logged_examples(path: str) -> List[Example]:
+    """Examples from a log of the statement LLM's decisions (see `ENDPOINT_LOG_FILE`)."""
+    examples = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                examples.append(
+                    Example(entry["user"], entry.get("assistant", ""), bool(entry["complete"]))
+                )
+    return examples
+
+
+def decide(probability: float, confidence: float, user: str) -> Optional[bool]:
+    """The local decision on a turn with this probability of being complete, if confident."""
+    if probability >= confidence and not ends_open(user):
+        return True
+    if probability <= 1.0 - confidence:
+        return False
+    return None
+
+
+@cache
+def load_model(path: Optional[str] = None) -> CompletenessModel:
+    """The model saved at `path`, or one trained from the instruction examples; cached."""
+    if path:
+        with open(path) as f:
+            return CompletenessModel.from_dict(json.load(f))
+    return CompletenessModel.train(instruction_examples())
+
+
+@cache
+def _open_log(path: str) -> TextIO:
+    return open(path, "a", buffering=1)
+
+
+class CompletenessClassifier:
+    """Decides confident turns locally and defers the others to the statement LLM.
+
+    Args:
+        model: Local model; None defers every turn to the statement LLM.
+        confidence: Probability the model must reach for either answer to decide locally.
+        log_file: JSON lines file the statement LLM's decisions are appended to, if set.
+    """
+
+    def __init__(
+        self,
+        model: Optional[CompletenessModel],
+        confidence: float = 0.95,
+        log_file: Optional[str] = None,
+    ):
+        self._model = model
+        self._confidence = confidence
+        self._log = _open_log(log_file) if log_file else None
+        # Turn deferred to the statement LLM and when it was sent
+        self._deferred: Optional[Tuple[str, str, float]] = None
+
+    def classify(self, user: str, assistant: str = "") -> Optional[bool]:
+        """Whether the user's turn is complete, or None if the statement LLM should decide."""
+        self._deferred = None
+        if self._model is not None:
+            probability = self._model.probability(user, assistant)
+            complete = decide(probability, self._confidence, user)
+            if complete is not None:
+                return complete
+            logger.debug(f"Completeness not decided locally ({probability:.2f}), asking the LLM")
+        self._deferred = (user, assistant, time.monotonic())
+        return None
+
+    def llm_decided(self, complete: bool) -> None:
+        """Record the statement LLM's decision on the deferred turn."""
+        if self._deferred is None:
+            return
+        user, assistant, sent = self._deferred
+        self._deferred = None
+        if self._log:
+            entry = {
+                "user": user,
+                "assistant": assistant,
+                "complete": complete,
+                "llm_ms": round((time.monotonic() - sent) * 1000, 1),
+            }
+            self._log.write(json.dumps(entry) + "\n")
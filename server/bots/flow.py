@@ -1,7 +1,7 @@
 """Flow-based bot implementation using the base bot framework."""
 
 from functools import partial
-from typing import Dict
+from typing import Dict, Optional
 import sys
 import uuid
 
@@ -325,6 +325,9 @@ class FlowBot(BaseBot):
         self.navigation_coordinator = None
         self.flow_manager = None
 
+    def current_node(self) -> Optional[str]:
+        return self.flow_manager.current_node if self.flow_manager else None
+
     async def _handle_first_participant(self):
         """Handle first participant by initializing flow manager."""
         # Set up navigation coordinator
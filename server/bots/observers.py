@@ -0,0 +1,223 @@
+"""Pipeline observers reporting bot lifecycle milestones, metrics and trace spans."""
+
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from pipecat.frames.frames import (
+    BotStartedSpeakingFrame,
+    BotStoppedSpeakingFrame,
+    Frame,
+    MetricsFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+)
+from pipecat.metrics.metrics import (
+    LLMUsageMetricsData,
+    MetricsData,
+    ProcessingMetricsData,
+    TTFBMetricsData,
+    TTSUsageMetricsData,
+)
+from pipecat.observers.base_observer import BaseObserver
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from utils.tracing import KIND_CLIENT, Span, Tracer
+
+# Number of recent frames remembered to report each frame only once
+SEEN_FRAMES = 64
+
+
+class _SeenFrames:
+    """Recently seen frame IDs; observers see a frame on every hop through the pipeline."""
+
+    def __init__(self):
+        self._order: Deque[int] = deque(maxlen=SEEN_FRAMES)
+        self._ids: Set[int] = set()
+
+    def first_time(self, frame: Frame) -> bool:
+        if frame.id in self._ids:
+            return False
+        if len(self._order) == self._order.maxlen:
+            self._ids.discard(self._order[0])
+        self._order.append(frame.id)
+        self._ids.add(frame.id)
+        return True
+
+
+class FirstAudioObserver(BaseObserver):
+    """Calls `on_first_audio` once, when the bot starts sending audio for the first time."""
+
+    def __init__(self, on_first_audio: Callable[[], Awaitable[None]]):
+        self._on_first_audio = on_first_audio
+        self._seen = False
+
+    async def on_push_frame(
+        self,
+        src: FrameProcessor,
+        dst: FrameProcessor,
+        frame: Frame,
+        direction: FrameDirection,
+        timestamp: int,
+    ):
+        if not self._seen and isinstance(frame, BotStartedSpeakingFrame):
+            self._seen = True
+            await self._on_first_audio()
+
+
+class MetricsObserver(BaseObserver):
+    """Forwards the pipeline's metrics to `send` as plain dicts.
+
+    Observers see a frame on every hop through the pipeline, so each metrics frame is
+    reported once, together with the flow node the bot was in at the time. The zero
+    TTFB and processing metrics a pipeline emits on start are skipped.
+
+    Args:
+        send: Called with the flow node (or None) and the metrics of one frame.
+        current_node: Returns the bot's current flow node, if any.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Optional[str], List[Dict[str, Any]]], None],
+        current_node: Callable[[], Optional[str]],
+    ):
+        self._send = send
+        self._current_node = current_node
+        self._seen = _SeenFrames()
+
+    async def on_push_frame(
+        self,
+        src: FrameProcessor,
+        dst: FrameProcessor,
+        frame: Frame,
+        direction: FrameDirection,
+        timestamp: int,
+    ):
+        if not isinstance(frame, MetricsFrame) or not self._seen.first_time(frame):
+            return
+
+        data = [item for item in map(_serialize, frame.data) if item]
+        if data:
+            self._send(self._current_node(), data)
+
+
+class TraceObserver(BaseObserver):
+    """Records a call's conversation turns and provider requests as spans.
+
+    A turn lasts from the user starting to speak until the bot stops speaking (or the
+    user starts the next turn), and its `turn.response` child from the user stopping to
+    speak until the bot starts speaking. Provider requests are recorded from their TTFB
+    and processing metrics, which are reported as they complete, so they end when their
+    metrics frame is seen. Token and character usage is added to the turn's attributes.
+
+    Args:
+        tracer: Tracer recording the spans.
+        call: The call's span, parent of the turns.
+        current_node: Returns the bot's current flow node, if any.
+    """
+
+    def __init__(
+        self, tracer: Tracer, call: Span, current_node: Callable[[], Optional[str]] = lambda: None
+    ):
+        self._tracer = tracer
+        self._call = call
+        self._current_node = current_node
+        self._seen = _SeenFrames()
+        self._turn: Optional[Span] = None
+        self._response: Optional[Span] = None
+        self._turns = 0
+
+    async def on_push_frame(
+        self,
+        src: FrameProcessor,
+        dst: FrameProcessor,
+        frame: Frame,
+        direction: FrameDirection,
+        timestamp: int,
+    ):
+        if not isinstance(
+            frame,
+            (
+                UserStartedSpeakingFrame,
+                UserStoppedSpeakingFrame,
+                BotStartedSpeakingFrame,
+                BotStoppedSpeakingFrame,
+                MetricsFrame,
+            ),
+        ) or not self._seen.first_time(frame):
+            return
+
+        match frame:
+            case UserStartedSpeakingFrame():
+                if self._turn:
+                    self._turn.attributes["turn.interrupted"] = True
+                    self._end_turn()
+                self._turns += 1
+                self._turn = self._tracer.start_span(
+                    "turn",
+                    self._call,
+                    **{"turn.number": self._turns, "flow.node": self._current_node()},
+                )
+            case UserStoppedSpeakingFrame() if self._turn and not self._response:
+                self._response = self._tracer.start_span("turn.response", self._turn)
+            case BotStartedSpeakingFrame() if self._response:
+                self._tracer.end_span(self._response)
+            case BotStoppedSpeakingFrame() if self._turn and self._response:
+                self._end_turn()
+            case MetricsFrame():
+                for item in filter(None, map(_serialize, frame.data)):
+                    self._record_metrics(item)
+
+    def end(self) -> None:
+        """End the turn in progress when the call ends."""
+        self._end_turn()
+
+    def _end_turn(self) -> None:
+        if self._response:
+            self._tracer.end_span(self._response)
+        if self._turn:
+            self._tracer.end_span(self._turn)
+        self._turn = self._response = None
+
+    def _record_metrics(self, item: Dict[str, Any]) -> None:
+        parent = self._turn or self._call
+        if item["kind"] in ("ttfb", "processing"):
+            end_ns = time.time_ns()
+            self._tracer.record(
+                f"{item['kind']} {item['processor']}",
+                end_ns - int(item["value"] * 1e9),
+                end_ns,
+                parent,
+                KIND_CLIENT,
+                **{"provider.processor": item["processor"], "provider.model": item["model"]},
+            )
+        elif item["kind"] == "llm_usage":
+            for key in ("prompt_tokens", "completion_tokens"):
+                name = f"llm.{key}"
+                parent.attributes[name] = parent.attributes.get(name, 0) + item[key]
+        elif item["kind"] == "tts_usage":
+            parent.attributes["tts.characters"] = (
+                parent.attributes.get("tts.characters", 0) + item["characters"]
+            )
+
+
+def _serialize(metrics: MetricsData) -> Optional[Dict[str, Any]]:
+    item = {"processor": metrics.processor, "model": metrics.model}
+    match metrics:
+        case TTFBMetricsData() | ProcessingMetricsData() if not metrics.value:
+            return None
+        case TTFBMetricsData():
+            return {**item, "kind": "ttfb", "value": metrics.value}
+        case ProcessingMetricsData():
+            return {**item, "kind": "processing", "value": metrics.value}
+        case LLMUsageMetricsData():
+            return {
+                **item,
+                "kind": "llm_usage",
+                "prompt_tokens": metrics.value.prompt_tokens,
+                "completion_tokens": metrics.value.completion_tokens,
+            }
+        case TTSUsageMetricsData():
+            return {**item, "kind": "tts_usage", "characters": metrics.value}
+    return None
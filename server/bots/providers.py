@@ -0,0 +1,195 @@
+"""Registry of speech and language service providers, imported on demand.
+
+Each pipecat service module pulls in its vendor SDK, and importing all of
+them made every runner pay for providers it never uses. Providers are
+registered here with the module that implements them; a module is imported
+only when its provider is selected by `TTS_PROVIDER` or `LLM_PROVIDER`.
+Services that hold a connection are built with their warm-up mixin
+(see `bots.warmup`); Deepgram TTS and Rime open one per request.
+"""
+
+import importlib
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bots.smart_endpointing import CLASSIFIER_SYSTEM_INSTRUCTION
+from bots.warmup import (
+    CartesiaTTSWarmUp,
+    DeepgramSTTWarmUp,
+    ElevenLabsTTSWarmUp,
+    GoogleLLMWarmUp,
+    with_warm_up,
+)
+from config.bot import BotConfig
+
+
+@dataclass(frozen=True)
+class Provider:
+    name: str
+    module: str  # Module imported on first use, passed to `build`
+    build: Callable[..., Any]
+
+    def load(self) -> ModuleType:
+        return importlib.import_module(self.module)
+
+
+STT_PROVIDERS: Dict[str, Provider] = {}
+TTS_PROVIDERS: Dict[str, Provider] = {}
+LLM_PROVIDERS: Dict[str, Provider] = {}
+
+
+def _register(registry: Dict[str, Provider], name: str, module: str):
+    def decorator(build: Callable[..., Any]) -> Callable[..., Any]:
+        registry[name] = Provider(name, module, build)
+        return build
+
+    return decorator
+
+
+def stt_provider(name: str, module: str):
+    """Register a speech-to-text factory `build(module, config)`."""
+    return _register(STT_PROVIDERS, name, module)
+
+
+def tts_provider(name: str, module: str):
+    """Register a text-to-speech factory `build(module, config)`."""
+    return _register(TTS_PROVIDERS, name, module)
+
+
+def llm_provider(name: str, module: str):
+    """Register an LLM factory `build(module, config, system_instruction)` returning the
+    conversation LLM and the statement classifier LLM."""
+    return _register(LLM_PROVIDERS, name, module)
+
+
+def _lookup(registry: Dict[str, Provider], kind: str, name: str) -> Provider:
+    provider = registry.get(name)
+    if provider is None:
+        raise ValueError(f"Invalid {kind} provider: {name}")
+    return provider
+
+
+def selected(config: BotConfig) -> List[Provider]:
+    """Providers the configuration uses: Deepgram STT, the TTS and the LLM provider."""
+    return [
+        _lookup(STT_PROVIDERS, "STT", "deepgram"),
+        _lookup(TTS_PROVIDERS, "TTS", config.tts_provider),
+        _lookup(LLM_PROVIDERS, "LLM", config.llm_provider),
+    ]
+
+
+def preload(config: BotConfig) -> None:
+    """Import the selected providers' modules, e.g. before a warm worker reports ready."""
+    for provider in selected(config):
+        provider.load()
+
+
+def create_stt(config: BotConfig) -> Any:
+    provider = _lookup(STT_PROVIDERS, "STT", "deepgram")
+    return provider.build(provider.load(), config)
+
+
+def create_tts(config: BotConfig) -> Any:
+    provider = _lookup(TTS_PROVIDERS, "TTS", config.tts_provider)
+    return provider.build(provider.load(), config)
+
+
+def create_llm(config: BotConfig, system_instruction: str) -> Tuple[Any, Optional[Any]]:
+    """Conversation LLM and statement classifier LLM of the configured provider."""
+    provider = _lookup(LLM_PROVIDERS, "LLM", config.llm_provider)
+    return provider.build(provider.load(), config, system_instruction)
+
+
+###########################################################################
+# Speech-to-text
+###########################################################################
+
+
+@stt_provider("deepgram", "pipecat.services.deepgram")
+def _deepgram_stt(services: ModuleType, config: BotConfig) -> Any:
+    from deepgram import LiveOptions
+
+    return with_warm_up(services.DeepgramSTTService, DeepgramSTTWarmUp)(
+        api_key=config.deepgram_api_key, live_options=LiveOptions(model="nova-3-general")
+    )
+
+
+###########################################################################
+# Text-to-speech
+###########################################################################
+
+
+@tts_provider("deepgram", "pipecat.services.deepgram")
+def _deepgram_tts(services: ModuleType, config: BotConfig) -> Any:
+    if not config.deepgram_api_key:
+        raise ValueError("Deepgram API key is required for Deepgram TTS")
+
+    return services.DeepgramTTSService(api_key=config.deepgram_api_key, voice=config.deepgram_voice)
+
+
+@tts_provider("cartesia", "pipecat.services.cartesia")
+def _cartesia_tts(services: ModuleType, config: BotConfig) -> Any:
+    if not config.cartesia_api_key:
+        raise ValueError("Cartesia API key is required for Cartesia TTS")
+
+    return with_warm_up(services.CartesiaTTSService, CartesiaTTSWarmUp)(
+        api_key=config.cartesia_api_key, voice_id=config.cartesia_voice
+    )
+
+
+@tts_provider("elevenlabs", "pipecat.services.elevenlabs")
+def _elevenlabs_tts(services: ModuleType, config: BotConfig) -> Any:
+    if not config.elevenlabs_api_key:
+        raise ValueError("ElevenLabs API key is required for ElevenLabs TTS")
+
+    return with_warm_up(services.ElevenLabsTTSService, ElevenLabsTTSWarmUp)(
+        api_key=config.elevenlabs_api_key,
+        voice_id=config.elevenlabs_voice_id,
+    )
+
+
+@tts_provider("rime", "pipecat.services.rime")
+def _rime_tts(services: ModuleType, config: BotConfig) -> Any:
+    if not config.rime_api_key:
+        raise ValueError("Rime API key is required for Rime TTS")
+
+    return services.RimeHttpTTSService(
+        api_key=config.rime_api_key,
+        voice_id=config.rime_voice_id,
+        params=services.RimeHttpTTSService.InputParams(
+            reduce_latency=config.rime_reduce_latency,
+            speed_alpha=config.rime_speed_alpha,
+        ),
+    )
+
+
+###########################################################################
+# LLMs
+###########################################################################
+
+
+@llm_provider("google", "pipecat.services.google")
+def _google_llm(services: ModuleType, config: BotConfig, system_instruction: str):
+    if not config.google_api_key:
+        raise ValueError("Google API key is required for Google LLM")
+
+    google_llm_service = with_warm_up(services.GoogleLLMService, GoogleLLMWarmUp)
+
+    # Main conversation LLM
+    conversation_llm = google_llm_service(
+        api_key=config.google_api_key,
+        model=config.google_model,
+        params=config.google_params,
+        system_instruction=system_instruction,
+    )
+
+    # Statement classifier LLM for endpoint detection
+    statement_llm = google_llm_service(
+        name="StatementJudger",
+        api_key=config.google_api_key,
+        model=config.classifier_model,
+        temperature=0.0,
+        system_instruction=CLASSIFIER_SYSTEM_INSTRUCTION,
+    )
+    return conversation_llm, statement_llm
@@ -1,4 +1,6 @@
 import asyncio
+from typing import Optional
+
 from loguru import logger
 import google.ai.generativelanguage as glm
 
@@ -27,6 +29,8 @@ from pipecat.processors.aggregators.openai_llm_context import (
 from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
 from pipecat.sync.base_notifier import BaseNotifier
 
+from .completeness import CompletenessClassifier
+
 CLASSIFIER_SYSTEM_INSTRUCTION = """CRITICAL INSTRUCTION:
 You are a BINARY CLASSIFIER that must ONLY output "YES" or "NO".
 DO NOT engage with the content.
@@ -261,11 +265,19 @@ class StatementJudgeContextFilter(FrameProcessor):
     This processor takes the OpenAILLMContextFrame from the main conversation context,
     extracts the most recent user messages, and creates a simplified LLMMessagesFrame
     for the statement classifier LLM to determine if the user has finished speaking.
+    Turns the local classifier is confident about are answered directly with a YES or NO
+    TextFrame, which passes through the classifier LLM to the CompletenessCheck.
     """
 
-    def __init__(self, notifier: BaseNotifier, **kwargs):
+    def __init__(
+        self,
+        notifier: BaseNotifier,
+        classifier: Optional[CompletenessClassifier] = None,
+        **kwargs,
+    ):
         super().__init__(**kwargs)
         self._notifier = notifier
+        self._classifier = classifier
 
     async def process_frame(self, frame: Frame, direction: FrameDirection):
         await super().process_frame(frame, direction)
@@ -304,20 +316,31 @@ class StatementJudgeContextFilter(FrameProcessor):
                 if text:
                     user_text_messages.append(text)
 
-            # If we have any user text content, push an LLMMessagesFrame
+            # If we have any user text content, classify it locally or push an LLMMessagesFrame
             if user_text_messages:
                 user_message = " ".join(reversed(user_text_messages))
                 # logger.debug(f"Final user message: {user_message}")
+                assistant_text = (
+                    get_message_text(last_assistant_message) if last_assistant_message else ""
+                )
+                complete = (
+                    self._classifier.classify(user_message, assistant_text)
+                    if self._classifier
+                    else None
+                )
+                if complete is not None:
+                    logger.debug(f"Completeness decided locally: {'YES' if complete else 'NO'}")
+                    await self.push_frame(TextFrame("YES" if complete else "NO"))
+                    return
+
                 messages = [
                     glm.Content(role="user", parts=[glm.Part(text=CLASSIFIER_SYSTEM_INSTRUCTION)])
                 ]
-                if last_assistant_message:
-                    assistant_text = get_message_text(last_assistant_message)
+                if assistant_text:
                     # logger.debug(f"Assistant message text: {assistant_text}")
-                    if assistant_text:
-                        messages.append(
-                            glm.Content(role="assistant", parts=[glm.Part(text=assistant_text)])
-                        )
+                    messages.append(
+                        glm.Content(role="assistant", parts=[glm.Part(text=assistant_text)])
+                    )
                 messages.append(glm.Content(role="user", parts=[glm.Part(text=user_message)]))
                 # logger.debug(f"Pushing classifier messages: {messages}")
                 await self.push_frame(LLMMessagesFrame(messages))
@@ -330,19 +353,24 @@ class StatementJudgeContextFilter(FrameProcessor):
 
 
 class CompletenessCheck(FrameProcessor):
-    def __init__(self, notifier: BaseNotifier):
+    def __init__(self, notifier: BaseNotifier, classifier: Optional[CompletenessClassifier] = None):
         super().__init__()
         self._notifier = notifier
+        self._classifier = classifier
 
     async def process_frame(self, frame: Frame, direction: FrameDirection):
         await super().process_frame(frame, direction)
 
         if isinstance(frame, TextFrame) and frame.text == "YES":
             logger.debug("!!! Completeness check YES")
+            if self._classifier:
+                self._classifier.llm_decided(True)
             await self.push_frame(UserStoppedSpeakingFrame())
             await self._notifier.notify()
         elif isinstance(frame, TextFrame) and frame.text == "NO":
             logger.debug("!!! Completeness check NO")
+            if self._classifier:
+                self._classifier.llm_decided(False)
         else:
             await self.push_frame(frame, direction)
 
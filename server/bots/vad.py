@@ -0,0 +1,58 @@
+"""Silero VAD analyzer sharing one ONNX inference session per process."""
+
+import threading
+from typing import Optional
+
+import numpy as np
+from pipecat.audio.vad.silero import SileroOnnxModel, SileroVADAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
+
+
+class _SessionState(SileroOnnxModel):
+    """Per-call recurrent state running on a shared inference session."""
+
+    def __init__(self, session):
+        self.session = session
+        self.reset_states()
+        self.sample_rates = [8000, 16000]
+
+
+class SharedSileroVADAnalyzer(SileroVADAnalyzer):
+    """Silero VAD analyzer that loads the model once per process.
+
+    The model is loaded on first use, or ahead of it with `load` (which bots
+    run in a thread while their transport joins). The first load creates the
+    ONNX Runtime session and runs one inference on it; later instances only
+    allocate their own recurrent state and run on the same session, which is
+    safe to use from several threads at once. Bots hosted in one engine
+    process therefore share a single copy of the model.
+    """
+
+    _session = None
+    _lock = threading.Lock()
+
+    def __init__(self, *, sample_rate: Optional[int] = None, params: VADParams = VADParams()):
+        VADAnalyzer.__init__(self, sample_rate=sample_rate, params=params)
+        self._model: Optional[SileroOnnxModel] = None
+        self._last_reset_time = 0
+
+    @classmethod
+    def load_session(cls):
+        """Return the process's inference session, loading the model if needed."""
+        with cls._lock:
+            if cls._session is None:
+                session = SileroVADAnalyzer()._model.session
+                # ONNX Runtime allocates lazily, so the first inference is much slower than the rest
+                _SessionState(session)(np.zeros(512, dtype=np.float32), 16000)
+                cls._session = session
+            return cls._session
+
+    def load(self) -> None:
+        """Load the model and allocate this analyzer's state; blocks, so run it in a thread."""
+        if self._model is None:
+            self._model = _SessionState(self.load_session())
+
+    def voice_confidence(self, buffer) -> float:
+        # Audio is analysed in the transport's executor, so a late load stays off the event loop
+        self.load()
+        return super().voice_confidence(buffer)
@@ -0,0 +1,128 @@
+"""Service warm-up ahead of the pipeline start.
+
+pipecat services open their connections when the pipeline's StartFrame
+reaches them, which is after the Daily transport has joined the room, so a
+participant joining right away waits for the STT and TTS handshakes before
+the greeting. The mixins here let a bot open those connections concurrently
+with the join: `warm_up` starts connecting in the background, and when the
+service starts it adopts the open connection instead of connecting again.
+A failed or mismatched warm-up falls back to the service's own connect.
+
+Mixins are applied with `with_warm_up`, which keeps the service's class name
+so processor names in logs and metrics stay unchanged.
+"""
+
+import asyncio
+from functools import cache
+from typing import Any, Optional
+
+from loguru import logger
+from pipecat.pipeline.task import PipelineParams
+
+# Seconds after which priming the LLM client is given up
+PRIME_TIMEOUT_SECS = 5.0
+
+
+@cache
+def with_warm_up(service_class: type, mixin: type) -> type:
+    """Subclass of `service_class` with the warm-up of `mixin`."""
+    return type(service_class.__name__, (mixin, service_class), {})
+
+
+class ServiceWarmUp:
+    """Base of the warm-up mixins."""
+
+    _warm_up: Optional[asyncio.Task] = None
+    _warm_up_taken = False
+
+    def warm_up(self, params: PipelineParams) -> asyncio.Task:
+        """Start connecting with the pipeline's audio settings; returns the connecting task."""
+        if self._warm_up_taken:
+            raise RuntimeError(f"{self} has already started")
+        self._warm_up = asyncio.create_task(self._open(params))
+        return self._warm_up
+
+    async def _open(self, params: PipelineParams) -> Any:
+        """Open the connection and return the settings it was opened with."""
+        raise NotImplementedError
+
+    async def _take_warm_up(self, settings: Any) -> bool:
+        """Wait for a warm-up in progress; whether it opened a connection for `settings`."""
+        self._warm_up_taken = True
+        task, self._warm_up = self._warm_up, None
+        if task is None:
+            return False
+        await asyncio.wait({task})
+        if task.cancelled() or task.exception():
+            return False
+        if task.result() != settings:
+            logger.debug(f"{self}: warmed-up connection does not match, connecting again")
+            return False
+        return True
+
+
+class DeepgramSTTWarmUp(ServiceWarmUp):
+    """Opens the Deepgram live transcription websocket."""
+
+    async def _open(self, params: PipelineParams) -> Any:
+        self._settings["sample_rate"] = self._init_sample_rate or params.audio_in_sample_rate
+        if not await self._connection.start(self._settings):
+            raise ConnectionError("Unable to connect to Deepgram")
+        return dict(self._settings)
+
+    async def _connect(self):
+        if await self._take_warm_up(self._settings) and self._connection.is_connected:
+            logger.debug(f"{self}: using warmed-up Deepgram connection")
+            return
+        await self._disconnect()
+        await super()._connect()
+
+
+class WebsocketTTSWarmUp(ServiceWarmUp):
+    """Opens the websocket of a streaming TTS service (Cartesia, ElevenLabs)."""
+
+    def _set_output_sample_rate(self, sample_rate: int) -> None:
+        """Apply the sample rate to the settings the websocket is opened with, as `start` does."""
+        raise NotImplementedError
+
+    async def _open(self, params: PipelineParams) -> Any:
+        sample_rate = self._init_sample_rate or params.audio_out_sample_rate
+        self._set_output_sample_rate(sample_rate)
+        await super()._connect_websocket()
+        if not self._websocket:
+            raise ConnectionError(f"Unable to connect {self}")
+        return sample_rate
+
+    async def _connect_websocket(self):
+        if await self._take_warm_up(self.sample_rate) and self._websocket:
+            logger.debug(f"{self}: using warmed-up websocket")
+            return
+        if self._websocket:
+            await super()._disconnect_websocket()
+        await super()._connect_websocket()
+
+
+class CartesiaTTSWarmUp(WebsocketTTSWarmUp):
+    def _set_output_sample_rate(self, sample_rate: int) -> None:
+        self._settings["output_format"]["sample_rate"] = sample_rate
+
+
+class ElevenLabsTTSWarmUp(WebsocketTTSWarmUp):
+    def _set_output_sample_rate(self, sample_rate: int) -> None:
+        from pipecat.services.elevenlabs import output_format_from_sample_rate
+
+        self._output_format = output_format_from_sample_rate(sample_rate)
+
+
+class GoogleLLMWarmUp(ServiceWarmUp):
+    """Primes the Gemini client's channel with a token count, which is not billed.
+
+    The client is shared by every model in the process, so there is no connection to adopt: the
+    first generation simply finds the channel open.
+    """
+
+    async def _open(self, params: PipelineParams) -> Any:
+        # No retries: a slow or failing prime must not hold up the call's warm-up
+        await self._client.count_tokens_async(
+            "Hello", request_options={"timeout": PRIME_TIMEOUT_SECS, "retry": None}
+        )
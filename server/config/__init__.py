@@ -2,12 +2,13 @@
 
 This package manages application-wide configuration through:
 - Environment variable management
-- Type-safe configuration classes
+- Type-safe configuration classes and bot profiles
 - Validation of required settings
 - Default value handling
 """
 
 from .bot import BotConfig
+from .profiles import BotProfile
 from .server import ServerConfig
 
-__all__ = ["BotConfig", "ServerConfig"]
+__all__ = ["BotConfig", "BotProfile", "ServerConfig"]
@@ -1,10 +1,25 @@
-"""Bot configuration management module."""
+"""Bot configuration management module.
+
+A `BotConfig` is an immutable snapshot: the environment is read once when it
+is created, and the conversation settings come from a typed `BotProfile`.
+Service classes are only imported where their parameters are built, so that
+importing the configuration does not load every provider's SDK.
+"""
+
+from __future__ import annotations
 
 import os
-from typing import TypedDict, Literal, NotRequired
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, TypedDict, NotRequired, Optional
 from dotenv import load_dotenv
-from pipecat.services.google import GoogleLLMService
-from pipecat.services.openai import BaseOpenAILLMService
+
+from .profiles import BotProfile, BotType, is_truthy
+
+if TYPE_CHECKING:
+    from pipecat.services.google import GoogleLLMService
+    from pipecat.services.openai import BaseOpenAILLMService
+
+__all__ = ["BotConfig", "BotType", "DailyConfig", "call_config", "set_call_config"]
 
 
 class DailyConfig(TypedDict):
@@ -13,11 +28,51 @@ class DailyConfig(TypedDict):
     room_url: NotRequired[str]
 
 
-BotType = Literal["simple", "flow"]
+# Configuration of the call running in the current asyncio task and the tasks it started
+_call_config: ContextVar[Optional[BotConfig]] = ContextVar("call_config", default=None)
+
+
+def set_call_config(config: BotConfig) -> None:
+    """Make `config` the configuration of the call running in the current task."""
+    _call_config.set(config)
+
+
+def call_config() -> Optional[BotConfig]:
+    """Configuration of the call running in the current task, if one was set."""
+    return _call_config.get()
 
 
 class BotConfig:
-    def __init__(self):
+    """Process settings read from the environment, combined with a bot profile.
+
+    Args:
+        profile: The call's settings (default: the profile described by the environment).
+        loop_policy: Event loop implementation, overriding LOOP_POLICY.
+        loop_monitor: Whether to monitor the event loop, overriding LOOP_MONITOR.
+        loop_slow_callback_ms: Slow callback threshold, overriding LOOP_SLOW_CALLBACK_MS.
+    """
+
+    __slots__ = (
+        "_profile",
+        "_daily",
+        "_api_keys",
+        "_traces_file",
+        "_otlp_endpoint",
+        "_loop_policy",
+        "_loop_monitor",
+        "_loop_slow_callback_ms",
+        "_endpoint_model_file",
+        "_endpoint_log_file",
+    )
+
+    def __init__(
+        self,
+        profile: Optional[BotProfile] = None,
+        *,
+        loop_policy: Optional[str] = None,
+        loop_monitor: Optional[bool] = None,
+        loop_slow_callback_ms: Optional[float] = None,
+    ):
         load_dotenv()
 
         # Validate required vars
@@ -31,194 +86,195 @@ class BotConfig:
         if missing:
             raise ValueError(f"Missing required env vars: {', '.join(missing)}")
 
-        self.daily: DailyConfig = {
+        self._daily: DailyConfig = {
             "api_key": required["DAILY_API_KEY"],
             "api_url": os.getenv("DAILY_API_URL", "https://api.daily.co/v1"),
         }
+        self._api_keys = {
+            name: os.getenv(f"{name.upper()}_API_KEY")
+            for name in ("google", "openai", "deepgram", "cartesia", "elevenlabs", "rime")
+        }
+        self._traces_file = os.getenv("TRACES_FILE") or None
+        self._otlp_endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT") or None
+
+        loop_policy = (loop_policy or os.getenv("LOOP_POLICY", "asyncio")).lower()
+        if loop_policy not in ("asyncio", "uvloop"):
+            raise ValueError(f"Invalid loop policy: {loop_policy}")
+        self._loop_policy = loop_policy
+        self._loop_monitor = (
+            is_truthy(os.getenv("LOOP_MONITOR", "false")) if loop_monitor is None else loop_monitor
+        )
+        self._loop_slow_callback_ms = float(
+            os.getenv("LOOP_SLOW_CALLBACK_MS", 50)
+            if loop_slow_callback_ms is None
+            else loop_slow_callback_ms
+        )
 
-        # Bot configuration
-        self._bot_type: BotType = os.getenv("BOT_TYPE", "flow")
-        if self._bot_type not in ("simple", "flow"):
-            self._bot_type = "flow"  # Default to flow bot if invalid value
+        self._endpoint_model_file = os.getenv("ENDPOINT_MODEL_FILE") or None
+        self._endpoint_log_file = os.getenv("ENDPOINT_LOG_FILE") or None
+
+        self._profile = profile or BotProfile.from_env()
+
+    def with_profile(self, profile: BotProfile) -> BotConfig:
+        """The same process settings with another profile, without reading the environment."""
+        config = object.__new__(BotConfig)
+        for name in self.__slots__:
+            setattr(config, name, getattr(self, name))
+        config._profile = profile
+        return config
 
     def __repr__(self) -> str:
-        return f"BotConfig(bot_type={self.bot_type}, bot_name={self.bot_name}, llm_provider={self.llm_provider}, google_model={self.google_model}, google_params={self.google_params}, openai_model={self.openai_model}, openai_params={self.openai_params}, tts_provider={self.tts_provider}, deepgram_voice={self.deepgram_voice}, cartesia_voice={self.cartesia_voice}, elevenlabs_voice_id={self.elevenlabs_voice_id}, rime_voice_id={self.rime_voice_id}, rime_reduce_latency={self.rime_reduce_latency}, rime_speed_alpha={self.rime_speed_alpha}, enable_stt_mute_filter={self.enable_stt_mute_filter}, classifier_model={self.classifier_model})"
-
-    def _is_truthy(self, value: str) -> bool:
-        return value.lower() in (
-            "true",
-            "1",
-            "t",
-            "yes",
-            "y",
-            "on",
-            "enable",
-            "enabled",
+        return (
+            f"BotConfig({self._profile!r}, loop_policy={self.loop_policy}, "
+            f"loop_monitor={self.loop_monitor})"
         )
 
+    @property
+    def profile(self) -> BotProfile:
+        return self._profile
+
+    @property
+    def daily(self) -> DailyConfig:
+        return self._daily.copy()
+
     ###########################################################################
     # API keys
     ###########################################################################
 
     @property
     def google_api_key(self) -> str:
-        return os.getenv("GOOGLE_API_KEY")
+        return self._api_keys["google"]
 
     @property
     def openai_api_key(self) -> str:
-        return os.getenv("OPENAI_API_KEY")
+        return self._api_keys["openai"]
 
     @property
     def deepgram_api_key(self) -> str:
-        return os.getenv("DEEPGRAM_API_KEY")
+        return self._api_keys["deepgram"]
 
     @property
     def cartesia_api_key(self) -> str:
-        return os.getenv("CARTESIA_API_KEY")
+        return self._api_keys["cartesia"]
 
     @property
     def elevenlabs_api_key(self) -> str:
-        return os.getenv("ELEVENLABS_API_KEY")
+        return self._api_keys["elevenlabs"]
 
     @property
     def rime_api_key(self) -> str:
-        return os.getenv("RIME_API_KEY")
+        return self._api_keys["rime"]
 
     ###########################################################################
-    # Bot configuration
+    # Tracing
     ###########################################################################
 
     @property
-    def bot_type(self) -> BotType:
-        return self._bot_type
-
-    @bot_type.setter
-    def bot_type(self, value: BotType):
-        self._bot_type = value
-        os.environ["BOT_TYPE"] = value
+    def traces_file(self) -> Optional[str]:
+        """File the call's spans are appended to as OTLP/JSON lines."""
+        return self._traces_file
 
     @property
-    def bot_name(self) -> str:
-        return os.getenv("BOT_NAME", "Marissa")
+    def otlp_endpoint(self) -> Optional[str]:
+        """OTLP/HTTP collector the call's spans are posted to."""
+        return self._otlp_endpoint
+
+    ###########################################################################
+    # Bot configuration (from the profile)
+    ###########################################################################
 
-    @bot_name.setter
-    def bot_name(self, value: str):
-        os.environ["BOT_NAME"] = value
+    @property
+    def profile_name(self) -> str:
+        return self._profile.name
 
     @property
-    def llm_provider(self) -> str:
-        return os.getenv("LLM_PROVIDER", "google").lower()
+    def bot_type(self) -> BotType:
+        return self._profile.bot_type
 
-    @llm_provider.setter
-    def llm_provider(self, value: str):
-        value = value.lower()
-        if value not in ("google", "openai"):
-            raise ValueError(f"Invalid LLM provider: {value}")
+    @property
+    def bot_name(self) -> str:
+        return self._profile.bot_name
 
-        os.environ["LLM_PROVIDER"] = value
+    @property
+    def llm_provider(self) -> str:
+        return self._profile.llm_provider
 
     @property
     def google_model(self) -> str:
         """Model used for conversation."""
-        return os.getenv("GOOGLE_MODEL", "gemini-2.0-flash-001")
-
-    @google_model.setter
-    def google_model(self, value: str):
-        os.environ["GOOGLE_MODEL"] = value
+        return self._profile.google_model
 
     @property
     def google_params(self) -> GoogleLLMService.InputParams:
-        temperature = os.getenv("GOOGLE_TEMPERATURE", 1.0)
-        return GoogleLLMService.InputParams(temperature=temperature)
+        from pipecat.services.google import GoogleLLMService
 
-    @google_params.setter
-    def google_params(self, value: GoogleLLMService.InputParams):
-        os.environ["GOOGLE_TEMPERATURE"] = str(value.temperature)
+        return GoogleLLMService.InputParams(temperature=self._profile.google_temperature)
 
     @property
     def openai_model(self) -> str:
-        return os.getenv("OPENAI_MODEL", "gpt-4o")
-
-    @openai_model.setter
-    def openai_model(self, value: str):
-        os.environ["OPENAI_MODEL"] = value
+        return self._profile.openai_model
 
     @property
     def openai_params(self) -> BaseOpenAILLMService.InputParams:
-        temperature = os.getenv("OPENAI_TEMPERATURE", 0.2)
-        return BaseOpenAILLMService.InputParams(temperature=temperature)
+        from pipecat.services.openai import BaseOpenAILLMService
 
-    @openai_params.setter
-    def openai_params(self, value: BaseOpenAILLMService.InputParams):
-        os.environ["OPENAI_TEMPERATURE"] = str(value.temperature)
+        return BaseOpenAILLMService.InputParams(temperature=self._profile.openai_temperature)
 
     @property
     def tts_provider(self) -> str:
-        return os.getenv("TTS_PROVIDER", "deepgram").lower()
-
-    @tts_provider.setter
-    def tts_provider(self, value: str):
-        value = value.lower()
-        if value not in ("deepgram", "cartesia", "elevenlabs", "rime"):
-            raise ValueError(f"Invalid TTS provider: {value}")
-
-        os.environ["TTS_PROVIDER"] = value
+        return self._profile.tts_provider
 
     @property
     def deepgram_voice(self) -> str:
-        return os.getenv("DEEPGRAM_VOICE", "aura-athena-en")
-
-    @deepgram_voice.setter
-    def deepgram_voice(self, value: str):
-        os.environ["DEEPGRAM_VOICE"] = value
+        return self._profile.deepgram_voice
 
     @property
     def cartesia_voice(self) -> str:
-        return os.getenv("CARTESIA_VOICE", "79a125e8-cd45-4c13-8a67-188112f4dd22")
-
-    @cartesia_voice.setter
-    def cartesia_voice(self, value: str):
-        os.environ["CARTESIA_VOICE"] = value
+        return self._profile.cartesia_voice
 
     @property
     def elevenlabs_voice_id(self) -> str:
-        return os.getenv("ELEVENLABS_VOICE_ID", "JBFqnCBsd6RMkjVDRZzb")
-
-    @elevenlabs_voice_id.setter
-    def elevenlabs_voice_id(self, value: str):
-        os.environ["ELEVENLABS_VOICE_ID"] = value
+        return self._profile.elevenlabs_voice_id
 
     @property
     def rime_voice_id(self) -> str:
-        return os.getenv("RIME_VOICE_ID", "marissa")
-
-    @rime_voice_id.setter
-    def rime_voice_id(self, value: str):
-        os.environ["RIME_VOICE_ID"] = value
+        return self._profile.rime_voice_id
 
     @property
     def rime_reduce_latency(self) -> bool:
-        return self._is_truthy(os.getenv("RIME_REDUCE_LATENCY", "false"))
-
-    @rime_reduce_latency.setter
-    def rime_reduce_latency(self, value: bool):
-        os.environ["RIME_REDUCE_LATENCY"] = str(value)
+        return self._profile.rime_reduce_latency
 
     @property
     def rime_speed_alpha(self) -> float:
-        return float(os.getenv("RIME_SPEED_ALPHA", 1.0))
-
-    @rime_speed_alpha.setter
-    def rime_speed_alpha(self, value: float):
-        os.environ["RIME_SPEED_ALPHA"] = str(value)
+        return self._profile.rime_speed_alpha
 
     @property
     def enable_stt_mute_filter(self) -> bool:
-        return self._is_truthy(os.getenv("ENABLE_STT_MUTE_FILTER", "false"))
+        return self._profile.enable_stt_mute_filter
 
-    @enable_stt_mute_filter.setter
-    def enable_stt_mute_filter(self, value: bool):
-        os.environ["ENABLE_STT_MUTE_FILTER"] = str(value)
+    @property
+    def warm_up(self) -> bool:
+        """Open the service connections while the transport joins the room."""
+        return self._profile.warm_up
+
+    ###########################################################################
+    # Event Loop Configuration
+    ###########################################################################
+
+    @property
+    def loop_policy(self) -> str:
+        """Event loop implementation of the runner: "asyncio" or "uvloop"."""
+        return self._loop_policy
+
+    @property
+    def loop_monitor(self) -> bool:
+        """Report event-loop lag and slow callbacks over the metrics channel."""
+        return self._loop_monitor
+
+    @property
+    def loop_slow_callback_ms(self) -> float:
+        """Milliseconds a callback may block the event loop before the monitor reports it."""
+        return self._loop_slow_callback_ms
 
     ###########################################################################
     # Smart Endpointing Configuration
@@ -227,8 +283,24 @@ class BotConfig:
     @property
     def classifier_model(self) -> str:
         """Model used for classifying speech completeness."""
-        return os.getenv("CLASSIFIER_MODEL", "gemini-2.0-flash-001")
+        return self._profile.classifier_model
 
-    @classifier_model.setter
-    def classifier_model(self, value: str):
-        os.environ["CLASSIFIER_MODEL"] = value
+    @property
+    def endpoint_classifier(self) -> str:
+        """Who decides confident turns: "local" (the local classifier) or "llm" (always the model)."""
+        return self._profile.endpoint_classifier
+
+    @property
+    def endpoint_confidence(self) -> float:
+        """Probability the local classifier must reach to decide a turn itself."""
+        return self._profile.endpoint_confidence
+
+    @property
+    def endpoint_model_file(self) -> Optional[str]:
+        """Local classifier saved by tools/endpointing_report.py (default: trained at start)."""
+        return self._endpoint_model_file
+
+    @property
+    def endpoint_log_file(self) -> Optional[str]:
+        """File the classifier model's decisions are appended to, as training examples."""
+        return self._endpoint_log_file
@@ -0,0 +1,158 @@
+"""Typed bot profiles: the per-call settings of a bot.
+
+A profile holds what may differ between calls served by the same runner
+process (bot type and name, models, voices, TTS and LLM provider), while API
+keys, tracing and event-loop settings stay per process in `BotConfig`.
+The process's default profile is read from the environment (and runner CLI
+flags) once; named profiles are overrides on top of it, loaded by the server
+from `BOT_PROFILES_FILE` and sent to runners as JSON with each call.
+
+Example profiles file:
+
+    {
+        "cartesia": {"tts_provider": "cartesia", "bot_name": "Sam"},
+        "lite": {"google_model": "gemini-2.0-flash-lite-001", "google_temperature": 0.7}
+    }
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass, field, fields, replace
+from typing import Any, Dict, Literal, Optional
+
+from dotenv import load_dotenv
+
+BotType = Literal["simple", "flow"]
+
+DEFAULT_PROFILE = "default"
+
+# Allowed values of the fields that select code paths
+CHOICES = {
+    "bot_type": ("simple", "flow"),
+    # Smart endpointing only works with Google yet, so no other LLM provider is registered
+    "llm_provider": ("google",),
+    "tts_provider": ("deepgram", "cartesia", "elevenlabs", "rime"),
+    "endpoint_classifier": ("local", "llm"),
+}
+
+
+def _env(name: str) -> Dict[str, str]:
+    return {"env": name}
+
+
+def is_truthy(value: str) -> bool:
+    return value.lower() in ("true", "1", "t", "yes", "y", "on", "enable", "enabled")
+
+
+@dataclass(frozen=True)
+class BotProfile:
+    """Settings of one call; every field but `name` has an environment variable."""
+
+    name: str = DEFAULT_PROFILE
+    bot_type: BotType = field(default="flow", metadata=_env("BOT_TYPE"))
+    bot_name: str = field(default="Marissa", metadata=_env("BOT_NAME"))
+    llm_provider: str = field(default="google", metadata=_env("LLM_PROVIDER"))
+    google_model: str = field(default="gemini-2.0-flash-001", metadata=_env("GOOGLE_MODEL"))
+    google_temperature: float = field(default=1.0, metadata=_env("GOOGLE_TEMPERATURE"))
+    openai_model: str = field(default="gpt-4o", metadata=_env("OPENAI_MODEL"))
+    openai_temperature: float = field(default=0.2, metadata=_env("OPENAI_TEMPERATURE"))
+    tts_provider: str = field(default="deepgram", metadata=_env("TTS_PROVIDER"))
+    deepgram_voice: str = field(default="aura-athena-en", metadata=_env("DEEPGRAM_VOICE"))
+    cartesia_voice: str = field(
+        default="79a125e8-cd45-4c13-8a67-188112f4dd22", metadata=_env("CARTESIA_VOICE")
+    )
+    elevenlabs_voice_id: str = field(
+        default="JBFqnCBsd6RMkjVDRZzb", metadata=_env("ELEVENLABS_VOICE_ID")
+    )
+    rime_voice_id: str = field(default="marissa", metadata=_env("RIME_VOICE_ID"))
+    rime_reduce_latency: bool = field(default=False, metadata=_env("RIME_REDUCE_LATENCY"))
+    rime_speed_alpha: float = field(default=1.0, metadata=_env("RIME_SPEED_ALPHA"))
+    enable_stt_mute_filter: bool = field(default=False, metadata=_env("ENABLE_STT_MUTE_FILTER"))
+    # Open the service connections while the transport joins the room
+    warm_up: bool = field(default=True, metadata=_env("WARM_UP_SERVICES"))
+    # Model used for classifying speech completeness
+    classifier_model: str = field(default="gemini-2.0-flash-001", metadata=_env("CLASSIFIER_MODEL"))
+    # "llm" always asks the classifier LLM, "local" decides confident turns without it; only
+    # use "local" with a model trained on logged turns (ENDPOINT_MODEL_FILE) and validated
+    endpoint_classifier: str = field(default="llm", metadata=_env("ENDPOINT_CLASSIFIER"))
+    # Probability the local classifier must reach to decide a turn itself
+    endpoint_confidence: float = field(default=0.95, metadata=_env("ENDPOINT_CONFIDENCE"))
+
+    def __post_init__(self):
+        for name, choices in CHOICES.items():
+            value = getattr(self, name).lower()
+            if value not in choices:
+                raise ValueError(f"Invalid {name.replace('_', ' ')}: {value}")
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def from_env(cls) -> "BotProfile":
+        """The profile described by the environment variables, with defaults for the rest."""
+        load_dotenv()
+        values = {}
+        for f in fields(cls):
+            value = os.getenv(f.metadata.get("env", ""))
+            if value is not None:
+                values[f.name] = value
+        # An unknown bot type has always meant the flow bot
+        if values.get("bot_type", "flow").lower() not in CHOICES["bot_type"]:
+            del values["bot_type"]
+        return cls().replace(**values)
+
+    def replace(self, **overrides: Any) -> "BotProfile":
+        """Copy with `overrides` applied; strings are parsed as the fields' types.
+
+        Raises:
+            ValueError: If a field is unknown or a value is invalid.
+        """
+        types = {f.name: f.type for f in fields(self)}
+        unknown = set(overrides) - set(types)
+        if unknown:
+            raise ValueError(f"Unknown profile settings: {', '.join(sorted(unknown))}")
+
+        values = {}
+        for name, value in overrides.items():
+            if types[name] is bool and isinstance(value, str):
+                value = is_truthy(value)
+            elif types[name] is float:
+                value = float(value)
+            elif types[name] is not bool:
+                value = str(value)
+            if not isinstance(value, (str, float, bool)):
+                raise ValueError(f"Invalid value for {name}: {value!r}")
+            values[name] = value
+        return replace(self, **values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def load_profiles(path: Optional[str], base: BotProfile) -> Dict[str, Dict[str, Any]]:
+    """Load the named profiles of a profiles file and validate them against `base`.
+
+    Returns:
+        The payload sent to runners for each profile name: the profile's overrides and its name.
+        The default profile, without overrides, is always included.
+
+    Raises:
+        ValueError: If the file is not a JSON object of objects or a profile is invalid.
+    """
+    profiles: Dict[str, Dict[str, Any]] = {DEFAULT_PROFILE: {"name": DEFAULT_PROFILE}}
+    if not path:
+        return profiles
+
+    with open(path) as f:
+        entries = json.load(f)
+    if not isinstance(entries, dict):
+        raise ValueError(f"{path} must contain a JSON object of profiles")
+
+    for name, overrides in entries.items():
+        if not isinstance(overrides, dict):
+            raise ValueError(f"Profile {name!r} in {path} must be a JSON object")
+        payload = {**overrides, "name": name}
+        try:
+            base.replace(**payload)
+        except ValueError as e:
+            raise ValueError(f"Invalid profile {name!r} in {path}: {e}") from None
+        profiles[name] = payload
+    return profiles
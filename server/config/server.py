@@ -12,14 +12,149 @@ class ServerConfig:
         self.host: str = os.getenv("HOST", "0.0.0.0")
         self.port: int = int(os.getenv("FAST_API_PORT", "7860"))
         self.reload: bool = os.getenv("RELOAD", "false").lower() == "true"
+        # Uvicorn worker processes; more than one shares bot state through the ledger
+        self.workers: int = int(os.getenv("WORKERS", "1"))
 
         # Daily API settings
         self.daily_api_key: str = os.getenv("DAILY_API_KEY")
         self.daily_api_url: str = os.getenv("DAILY_API_URL", "https://api.daily.co/v1")
+        self.daily_local_tokens: bool = os.getenv("DAILY_LOCAL_TOKENS", "false").lower() == "true"
+        self.daily_domain_id: str | None = os.getenv("DAILY_DOMAIN_ID")
+        self.token_cache_size: int = int(os.getenv("TOKEN_CACHE_SIZE", "256"))
+        # Daily REST API pacing: DAILY_RATE_LIMIT requests/s in bursts of up to DAILY_RATE_BURST,
+        # at most DAILY_MAX_IN_FLIGHT at once; 429s are retried up to DAILY_MAX_RETRIES times
+        self.daily_rate_limit: float = float(os.getenv("DAILY_RATE_LIMIT", "5"))
+        self.daily_rate_burst: int = int(os.getenv("DAILY_RATE_BURST", "10"))
+        self.daily_max_in_flight: int = int(os.getenv("DAILY_MAX_IN_FLIGHT", "8"))
+        self.daily_max_retries: int = int(os.getenv("DAILY_MAX_RETRIES", "3"))
+
+        # Room pool settings
+        self.room_pool_size: int = int(os.getenv("ROOM_POOL_SIZE", "0"))
+        self.room_ttl: float = float(os.getenv("ROOM_TTL_SECS", "3600"))
+        self.room_min_remaining: float = float(os.getenv("ROOM_MIN_REMAINING_SECS", "900"))
+        self.room_recycle: bool = os.getenv("ROOM_RECYCLE", "false").lower() == "true"
+        self.room_max_uses: int = int(os.getenv("ROOM_MAX_USES", "5"))
+        # Tokens for calls in recycled rooms expire (and eject) after ROOM_CALL_TTL_SECS
+        self.room_call_ttl: float = float(os.getenv("ROOM_CALL_TTL_SECS", "900"))
+        self.room_release_concurrency: int = int(os.getenv("ROOM_RELEASE_CONCURRENCY", "8"))
+
+        # Ledger of bots and rooms surviving restarts (empty LEDGER_PATH disables it); orphaned
+        # rooms are deleted ROOM_GC_BATCH at a time, at most once per ROOM_GC_INTERVAL_SECS
+        self.ledger_path: str = os.getenv("LEDGER_PATH", "ledger.db")
+        self.room_gc_batch: int = int(os.getenv("ROOM_GC_BATCH", "5"))
+        self.room_gc_interval: float = float(os.getenv("ROOM_GC_INTERVAL_SECS", "1"))
 
         # Bot settings
         self.max_bots_per_room: int = int(os.getenv("MAX_BOTS_PER_ROOM", "1"))
+        self.warm_workers: int = int(os.getenv("WARM_WORKERS", "0"))
+        self.spawn_threads: int = int(os.getenv("SPAWN_THREADS", "4"))
+        # Per-bot resource isolation: pin each runner to one core (of BOT_CPUS, e.g. "2-7",
+        # default all) and, with cgroup v2, cap memory and CPU per bot (0 disables a limit)
+        self.bot_cpu_pinning: bool = os.getenv("BOT_CPU_PINNING", "false").lower() == "true"
+        self.bot_cpus: str = os.getenv("BOT_CPUS", "")
+        self.bot_memory_max_mb: float = float(os.getenv("BOT_MEMORY_MAX_MB", "0"))
+        self.bot_cpu_quota: float = float(os.getenv("BOT_CPU_QUOTA", "0"))
+        # Runner script started for bots, relative to the server directory
+        self.bot_runner: str = os.getenv("BOT_RUNNER", "runner.py")
+        self.bot_engines: int = int(os.getenv("BOT_ENGINES", "0"))
+        self.engine_max_calls: int = int(os.getenv("ENGINE_MAX_CALLS", "10"))
+        # Named bot profiles selectable per connect, as a JSON object of profile overrides
+        self.bot_profiles_file: str = os.getenv("BOT_PROFILES_FILE", "")
+
+        # Admission control settings (MAX_BOTS=0 derives the limit from the per-bot budget)
+        self.max_bots: int = int(os.getenv("MAX_BOTS", "0"))
+        self.bot_cpu_budget: float = float(os.getenv("BOT_CPU_BUDGET", "0.5"))
+        self.bot_memory_mb: float = float(os.getenv("BOT_MEMORY_MB", "400"))
+        self.max_cpu_utilization: float = float(os.getenv("MAX_CPU_UTILIZATION", "0.85"))
+        self.admission_queue_timeout: float = float(os.getenv("ADMISSION_QUEUE_SECS", "2"))
+        self.admission_max_queue: int = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+        self.admission_retry_after: int = int(os.getenv("ADMISSION_RETRY_AFTER_SECS", "5"))
+
+        # Per-client connect limits (token buckets): CONNECT_RATE_LIMIT connects/s per IP address
+        # in bursts of CONNECT_BURST (0, the default, disables); clients sending one of
+        # CONNECT_API_KEYS as X-API-Key get a bucket per key instead, with
+        # CONNECT_KEY_RATE_LIMIT/CONNECT_KEY_BURST. Client addresses come from X-Forwarded-For
+        # when the peer is one of the trusted proxies in FORWARDED_ALLOW_IPS (uvicorn's setting)
+        self.connect_rate_limit: float = float(os.getenv("CONNECT_RATE_LIMIT", "0"))
+        self.forwarded_allow_ips: str = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+        self.connect_burst: int = int(os.getenv("CONNECT_BURST", "5"))
+        self.connect_api_keys: list[str] = [
+            key.strip() for key in os.getenv("CONNECT_API_KEYS", "").split(",") if key.strip()
+        ]
+        self.connect_key_rate_limit: float = float(os.getenv("CONNECT_KEY_RATE_LIMIT", "5"))
+        self.connect_key_burst: int = int(os.getenv("CONNECT_KEY_BURST", "20"))
+        self.connect_max_clients: int = int(os.getenv("CONNECT_MAX_CLIENTS", "100000"))
+
+        # Readiness probes: the Daily API, Deepgram and the TTS_PROVIDER and LLM_PROVIDER in use
+        # are probed every HEALTH_PROBE_INTERVAL_SECS (HEALTH_PROBES overrides the list, empty
+        # disables probing; HEALTH_PROBE_URLS="name=url,..." points probes elsewhere). A provider
+        # is degraded when the mean of its last HEALTH_PROBE_WINDOW latencies exceeds
+        # HEALTH_MAX_LATENCY_MS or HEALTH_MAX_FAILURES probes in a row failed
+        self.tts_provider: str = os.getenv("TTS_PROVIDER", "deepgram").lower()
+        self.llm_provider: str = os.getenv("LLM_PROVIDER", "google").lower()
+        probes = os.getenv("HEALTH_PROBES")
+        self.health_probes: list[str] = (
+            list(dict.fromkeys(["daily", "deepgram", self.tts_provider, self.llm_provider]))
+            if probes is None
+            else [name.strip().lower() for name in probes.split(",") if name.strip()]
+        )
+        self.health_probe_urls: dict[str, str] = dict(
+            entry.strip().split("=", 1)
+            for entry in os.getenv("HEALTH_PROBE_URLS", "").split(",")
+            if "=" in entry
+        )
+        self.health_probe_interval: float = float(os.getenv("HEALTH_PROBE_INTERVAL_SECS", "15"))
+        self.health_probe_timeout: float = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECS", "5"))
+        self.health_probe_window: int = int(os.getenv("HEALTH_PROBE_WINDOW", "5"))
+        self.health_max_latency_ms: float = float(os.getenv("HEALTH_MAX_LATENCY_MS", "2000"))
+        self.health_max_failures: int = int(os.getenv("HEALTH_MAX_FAILURES", "3"))
+
+        # Tracing: spans of every connect and of the bots' calls are written as OTLP/JSON lines
+        # to TRACES_FILE and/or posted to the OTLP/HTTP collector at OTEL_EXPORTER_OTLP_ENDPOINT
+        self.traces_file: str | None = os.getenv("TRACES_FILE") or None
+        self.otlp_endpoint: str | None = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT") or None
+
+        # Multi-host settings: "local" runs bots on this host, "dispatcher" places them on
+        # worker agents (agent.py), which report to DISPATCHER_URL
+        self.dispatch_mode: str = os.getenv("DISPATCH_MODE", "local")
+        self.agent_api_key: str | None = os.getenv("AGENT_API_KEY")
+        self.agent_report_interval: float = float(os.getenv("AGENT_REPORT_SECS", "2"))
+        self.agent_timeout: float = float(os.getenv("AGENT_TIMEOUT_SECS", "6"))
+        self.agent_spawn_timeout: float = float(os.getenv("AGENT_SPAWN_TIMEOUT_SECS", "10"))
+        self.agent_down_grace: float = float(os.getenv("AGENT_DOWN_GRACE_SECS", "60"))
+        self.dispatcher_url: str | None = os.getenv("DISPATCHER_URL")
+        self.agent_url: str | None = os.getenv("AGENT_URL")
+        self.agent_id: str | None = os.getenv("AGENT_ID")
+
+        # Drain settings: SIGUSR1 or POST /admin/drain stops new connects and waits up to
+        # DRAIN_TIMEOUT_SECS for running bots before stopping them and shutting down
+        self.drain_timeout: float = float(os.getenv("DRAIN_TIMEOUT_SECS", "600"))
+        self.drain_stop_grace: float = float(os.getenv("DRAIN_STOP_GRACE_SECS", "10"))
+        self.admin_api_key: str | None = os.getenv("ADMIN_API_KEY")
 
         # Validate required settings
         if not self.daily_api_key:
             raise ValueError("DAILY_API_KEY environment variable must be set")
+        if self.dispatch_mode not in ("local", "dispatcher"):
+            raise ValueError("DISPATCH_MODE must be 'local' or 'dispatcher'")
+        if self.dispatch_mode == "dispatcher" and not self.agent_api_key:
+            # Agents receive room URLs and owner tokens and start paid bots on request
+            raise ValueError("DISPATCH_MODE=dispatcher requires AGENT_API_KEY")
+        self.validate_workers()
+
+    def validate_workers(self) -> None:
+        """Check that the settings allow WORKERS > 1 (also after command line overrides)."""
+        if self.workers <= 1:
+            return
+        if not self.ledger_path:
+            raise ValueError("WORKERS > 1 requires LEDGER_PATH, which holds the shared bot state")
+        if self.dispatch_mode != "local":
+            raise ValueError("WORKERS > 1 is only supported with DISPATCH_MODE=local")
+        if self.reload:
+            raise ValueError("WORKERS > 1 cannot be combined with RELOAD")
+        # Each worker would place bots on cores and set up cgroups without seeing the others
+        if self.bot_cpu_pinning or self.bot_memory_max_mb or self.bot_cpu_quota:
+            raise ValueError(
+                "WORKERS > 1 cannot be combined with BOT_CPU_PINNING, BOT_MEMORY_MAX_MB "
+                "or BOT_CPU_QUOTA"
+            )
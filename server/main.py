@@ -6,17 +6,27 @@ and lifecycle management. It relies on environment variables for configuration
 (e.g., HOST, FAST_API_PORT) and uses run_helpers.py for bot startup.
 """
 
+import json
 import os
+import signal
+import sqlite3
 import subprocess
 import sys
+import time
 import asyncio
+import contextlib
 from contextlib import asynccontextmanager
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import aiohttp
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    RedirectResponse,
+    StreamingResponse,
+)
 from loguru import logger
 
 from pipecat.transports.services.helpers.daily_rest import (
@@ -24,15 +34,187 @@ from pipecat.transports.services.helpers.daily_rest import (
     DailyRoomParams,
 )
 
+from config.profiles import DEFAULT_PROFILE, BotProfile, load_profiles
 from config.server import ServerConfig
+from utils.access import check_admin, check_agent_key
+from utils.admission import AdmissionController, AdmissionRejected
+from utils.client_limits import ClientRateLimiter, ClientRateLimitMiddleware
+from utils.daily_client import PRIORITY_CONNECT, DailyClient, RateLimitedSession, RateLimiter
+from utils.dispatcher import Dispatcher
+from utils.drain import DrainController, stop_processes
+from utils.engine_pool import EnginePool
+from utils.events import RUNNER_EVENTS, EventBus
+from utils.health import HealthMonitor, provider_probes
+from utils.ipc import read_messages
+from utils.ledger import (
+    INSTANCE_HEARTBEAT_SECS,
+    SHARED_STATE_REFRESH_SECS,
+    Ledger,
+    RoomGarbageCollector,
+    is_runner_process,
+)
+from utils.metrics import (
+    MetricsCollector,
+    admission_metrics,
+    daily_api_metrics,
+    format_metric,
+    health_metrics,
+    process_metrics,
+    registry_metrics,
+    render_exposition,
+)
+from utils.meeting_tokens import LocalTokenDailyRESTHelper
+from utils.reaper import ProcessReaper
+from utils.resources import ResourceLimiter, parse_cpu_list
+from utils.registry import BotRecord, BotRegistry
+from utils.room_pool import RoomPool
+from utils.spawner import BotSpawner
+from utils.tracing import KIND_CLIENT, KIND_SERVER, create_tracer
+from utils.worker_pool import WorkerPool
 
 # Server configuration
 server_config = ServerConfig()
+bot_args: list[str] = []
+
+
+def parse_server_args():
+    """Parse server-specific arguments and store remaining args for bot processes"""
+    import argparse
+
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--host", help="Server host")
+    parser.add_argument("--port", type=int, help="Server port")
+    parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
+    parser.add_argument("--workers", type=int, help="Uvicorn worker processes")
+
+    # Parse known server args and keep remaining for bots
+    server_args, remaining_args = parser.parse_known_args()
+
+    # Update server config with parsed args
+    global server_config
+    if server_args.host:
+        server_config.host = server_args.host
+    if server_args.port:
+        server_config.port = server_args.port
+    if server_args.reload:
+        server_config.reload = server_args.reload
+    if server_args.workers:
+        server_config.workers = server_args.workers
+    server_config.validate_workers()
+
+    global bot_args
+    bot_args = remaining_args
+
+
+# Call this before creating the runtime state, which depends on --workers
+parse_server_args()
+
 
 # Runtime state
-bot_procs: Dict[int, tuple] = {}  # Track bot processes: {pid: (process, room_url)}
-daily_helpers: Dict[str, DailyRESTHelper] = {}  # Store Daily API helpers (initialized in lifespan)
-bot_args: list[str] = []
+# Track bot processes with per-room and per-state indexes; workers allocate disjoint synthetic IDs
+bot_registry = BotRegistry(id_block=os.getpid() if server_config.workers > 1 else 0)
+pipeline_metrics = MetricsCollector()  # Pipeline metrics of all bots, served on /metrics
+daily_helpers: Dict[str, DailyClient] = {}  # Store Daily API clients (initialized in lifespan)
+remote_bots: Dict[Tuple[str, int], int] = {}  # (agent_id, pid) -> bot_id in dispatcher mode
+# Profile payloads sent to runners by profile name; an invalid BOT_PROFILES_FILE fails startup
+bot_profiles = load_profiles(server_config.bot_profiles_file, BotProfile.from_env())
+
+# Durable record of bots and rooms, reconciled on startup; None if LEDGER_PATH is empty
+ledger = Ledger(server_config.ledger_path) if server_config.ledger_path else None
+# With several uvicorn workers, bot counts and lookups span all workers through the ledger
+shared_state = ledger if server_config.workers > 1 else None
+# Lifecycle events streamed to /events subscribers; shared through the ledger between workers
+event_bus = EventBus(
+    on_publish=(
+        (lambda message: shared_state.submit(shared_state.event_published, message))
+        if shared_state
+        else None
+    )
+)
+
+
+def per_worker(count: int) -> int:
+    """Share of a host-wide pool size for each uvicorn worker, rounded up."""
+    return -(-count // server_config.workers)
+
+
+# Paces Daily REST requests by priority and backs off on 429s; workers split the rate
+daily_limiter = RateLimiter(
+    rate=server_config.daily_rate_limit / server_config.workers,
+    burst=per_worker(server_config.daily_rate_burst),
+    max_in_flight=per_worker(server_config.daily_max_in_flight),
+)
+
+# Per-IP and per-API-key connect limits. They apply in full in every worker: a keep-alive client
+# stays on one worker, so splitting them would cut its limit to a fraction. A client spreading
+# its connects over N workers may get up to N times the limit.
+client_limiter = ClientRateLimiter(
+    rate=server_config.connect_rate_limit,
+    burst=server_config.connect_burst,
+    api_keys=server_config.connect_api_keys,
+    key_rate=server_config.connect_key_rate_limit,
+    key_burst=server_config.connect_key_burst,
+    max_clients=server_config.connect_max_clients,
+)
+
+# Pre-provisioned rooms and tokens; started in lifespan when ROOM_POOL_SIZE > 0
+room_pool = RoomPool(
+    size=per_worker(server_config.room_pool_size),
+    room_ttl=server_config.room_ttl,
+    min_remaining=server_config.room_min_remaining,
+    recycle=server_config.room_recycle,
+    max_uses=server_config.room_max_uses,
+    call_ttl=server_config.room_call_ttl,
+    ledger=ledger,
+)
+
+# Host-level budget for concurrent bots; connects beyond it queue briefly, then get a 429
+admission = AdmissionController(
+    # This worker's bots, plus those of the other workers as of the last ledger refresh
+    active_count=lambda: (
+        bot_registry.active_count + (shared_state.others_active if shared_state else 0)
+    ),
+    max_bots=server_config.max_bots,
+    cpu_per_bot=server_config.bot_cpu_budget,
+    memory_per_bot_mb=server_config.bot_memory_mb,
+    max_cpu_utilization=server_config.max_cpu_utilization,
+    queue_timeout=server_config.admission_queue_timeout,
+    max_queue=server_config.admission_max_queue,
+    retry_after=server_config.admission_retry_after,
+)
+
+# CPU pinning and cgroup limits for bot runners, and their resource usage
+resource_limiter = ResourceLimiter(
+    pin_cpus=server_config.bot_cpu_pinning,
+    cpus=parse_cpu_list(server_config.bot_cpus),
+    memory_max_mb=server_config.bot_memory_max_mb,
+    cpu_quota=server_config.bot_cpu_quota,
+)
+
+# Spans of every connect, continued by the bot runners; exported if TRACES_FILE or
+# OTEL_EXPORTER_OTLP_ENDPOINT is set
+tracer = create_tracer(
+    "lead-qualifier-server",
+    traces_file=server_config.traces_file,
+    otlp_endpoint=server_config.otlp_endpoint,
+    **{"process.pid": os.getpid()},
+)
+
+# Rolling latency of the upstream providers, for /readyz; started in lifespan
+health_monitor = HealthMonitor(
+    provider_probes(
+        server_config.health_probes,
+        daily_api_url=server_config.daily_api_url,
+        daily_api_key=server_config.daily_api_key,
+        env=os.environ,
+        urls=server_config.health_probe_urls,
+    ),
+    interval=server_config.health_probe_interval,
+    timeout=server_config.health_probe_timeout,
+    window=server_config.health_probe_window,
+    max_latency=server_config.health_max_latency_ms / 1000,
+    max_failures=server_config.health_max_failures,
+)
 
 # Configure loguru (removing default handler and adding our custom handler)
 logger.remove()
@@ -51,51 +233,296 @@ logger.add(
 async def lifespan(app: FastAPI):
     """
     FastAPI lifespan manager that handles startup and shutdown tasks.
-    It initializes the DailyRESTHelper and starts a background cleanup task.
+    It initializes the rate-limited Daily client (signing meeting tokens locally if configured)
+    reconciles the ledger left by dead instances and starts the room and worker pools.
+    SIGUSR1 starts a drain; on shutdown running bots are stopped and their rooms released.
     """
     aiohttp_session = aiohttp.ClientSession()
-    daily_helpers["rest"] = DailyRESTHelper(
-        daily_api_key=server_config.daily_api_key,
-        daily_api_url=server_config.daily_api_url,
-        aiohttp_session=aiohttp_session,
+    daily_session = RateLimitedSession(
+        aiohttp_session, daily_limiter, max_retries=server_config.daily_max_retries
     )
-
-    cleanup_task = asyncio.create_task(cleanup_finished_processes())
+    if server_config.daily_local_tokens:
+        helper = LocalTokenDailyRESTHelper(
+            daily_api_key=server_config.daily_api_key,
+            daily_api_url=server_config.daily_api_url,
+            aiohttp_session=daily_session,
+            domain_id=server_config.daily_domain_id,
+            cache_size=server_config.token_cache_size,
+        )
+    else:
+        helper = DailyRESTHelper(
+            daily_api_key=server_config.daily_api_key,
+            daily_api_url=server_config.daily_api_url,
+            aiohttp_session=daily_session,
+        )
+    daily_helpers["rest"] = DailyClient(helper, daily_limiter)
+
+    ledger_task = None
+    if ledger:
+        await ledger.run(ledger.register)
+        runner = os.path.basename(server_config.bot_runner)
+        stop_leftover_bots(await ledger.run(ledger.reconcile, runner))
+        room_gc.start()
+        ledger_task = asyncio.create_task(maintain_ledger())
+    await room_pool.start(daily_helpers["rest"])
+    health_monitor.start(aiohttp_session)
+    if server_config.dispatch_mode == "dispatcher":
+        dispatcher.start(aiohttp_session)
+    else:
+        await engine_pool.start()
+        await worker_pool.start()
+    if hasattr(signal, "SIGUSR1"):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, begin_drain, "SIGUSR1")
     try:
         yield
     finally:
-        cleanup_task.cancel()
-        try:
-            await cleanup_task
-        except asyncio.CancelledError:
-            pass
+        await stop_bots()
+        await health_monitor.stop()
+        await dispatcher.stop()
+        await engine_pool.stop()
+        await worker_pool.stop()
+        await reaper.stop()
+        await room_pool.stop()
+        await room_gc.stop()
+        if ledger_task:
+            ledger_task.cancel()
+        if ledger:
+            ledger.close()
+        spawner.shutdown()
         await aiohttp_session.close()
+        tracer.shutdown()
 
 
-async def cleanup_finished_processes() -> None:
+async def handle_bot_exit(proc: subprocess.Popen) -> None:
     """
-    Background task to clean up finished bot processes and delete their Daily rooms.
+    Called by the reaper as soon as a bot process exits.
     """
-    while True:
+    await finish_bot(proc.pid, proc.returncode)
+
+
+def handle_bot_message(bot_id: Optional[int], message: Dict[str, Any]) -> None:
+    """
+    Publish lifecycle milestones a bot reports over its channel.
+    """
+    if message.get("type") in RUNNER_EVENTS:
+        event_bus.publish(message["type"], bot_id)
+    elif message.get("type") == "metrics":
+        pipeline_metrics.record(message)
+
+
+def handle_remote_bot_message(agent_id: str, pid: int, message: Dict[str, Any]) -> None:
+    """
+    Called by the dispatcher with channel messages of bots on worker agents.
+    """
+    bot_id = remote_bots.get((agent_id, pid))
+    if bot_id is not None:
+        handle_bot_message(bot_id, message)
+
+
+async def read_bot_channel(bot_id: int, proc: subprocess.Popen) -> None:
+    """
+    Drain a bot process's channel for its whole life.
+    """
+    async for message in read_messages(proc.stdout):
+        handle_bot_message(bot_id, message)
+
+
+def bot_spawned(record: BotRecord) -> None:
+    if ledger:
+        ledger.submit(ledger.bot_started, record)
+    event_bus.publish(
+        "spawned", record.bot_id, pid=record.pid, room_url=record.room_url, host=record.host
+    )
+
+
+async def handle_remote_bot_exit(agent_id: str, pid: int, exit_code: Optional[int]) -> None:
+    """
+    Called by the dispatcher when a bot on a worker agent exits or is lost.
+    """
+    bot_id = remote_bots.pop((agent_id, pid), None)
+    if bot_id is not None:
+        await finish_bot(bot_id, exit_code)
+
+
+async def finish_bot(bot_id: int, exit_code: Optional[int]) -> None:
+    """
+    Mark a bot as finished and release its Daily room.
+    """
+    record = bot_registry.finish(bot_id, exit_code)
+    if not record:
+        return
+    if ledger:
+        ledger.submit(ledger.bot_finished, record)
+    admission.notify()
+    drain.notify()
+    event_bus.publish("finished", bot_id, exit_code=exit_code, status=record.state)
+    logger.info(
+        f"Cleaning up finished bot {bot_id} (exit code {exit_code}) for room {record.room_url}"
+    )
+    await release_room(record.room_url, bot_id)
+
+
+async def release_room(room_url: str, bot_id: Optional[int] = None) -> None:
+    """
+    Recycle or delete a room, publishing the outcome as an event of the bot that used it.
+    """
+    async with room_release_semaphore:
         try:
-            for pid in list(bot_procs.keys()):
-                proc, room_url = bot_procs[pid]
-                if proc.poll() is not None:
-                    logger.info(f"Cleaning up finished bot process {pid} for room {room_url}")
-                    try:
-                        await daily_helpers["rest"].delete_room_by_url(room_url)
-                        logger.success(f"Successfully deleted room {room_url}")
-                    except Exception as e:
-                        logger.error(f"Failed to delete room {room_url}: {str(e)}")
-                    del bot_procs[pid]
+            outcome = await room_pool.release(room_url)
         except Exception as e:
-            logger.error(f"Error during cleanup: {str(e)}")
-        await asyncio.sleep(5)
+            logger.error(f"Failed to release room {room_url}: {str(e)}")
+            if ledger:
+                ledger.submit(ledger.room_orphaned, room_url)
+                room_gc.notify()
+            if bot_id is not None:
+                event_bus.publish("room_release_failed", bot_id, room_url=room_url, error=str(e))
+            return
+    if ledger and outcome == "deleted":
+        ledger.submit(ledger.room_deleted, room_url)
+    if bot_id is not None:
+        event_bus.publish(f"room_{outcome}", bot_id, room_url=room_url)
+
+
+def stop_leftover_bots(pids: List[int]) -> None:
+    """
+    Terminate bot processes an earlier server instance left running, killing them after
+    DRAIN_STOP_GRACE_SECS. They are not our children, so they cannot be reaped or waited on.
+    """
+    runner = os.path.basename(server_config.bot_runner)
+    for pid in pids:
+        logger.warning(f"Terminating leftover bot process {pid}")
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(pid, signal.SIGTERM)
+
+    def kill_survivors():
+        for pid in pids:
+            if is_runner_process(pid, runner):
+                with contextlib.suppress(ProcessLookupError):
+                    os.kill(pid, signal.SIGKILL)
+
+    if pids:
+        asyncio.get_running_loop().call_later(server_config.drain_stop_grace, kill_survivors)
+
+
+async def maintain_ledger() -> None:
+    """
+    Refresh this instance's heartbeat, take over instances that died (e.g. a crashed
+    worker), join drains started through another worker and refresh the bot count of
+    the other workers that admission uses.
+    """
+    runner = os.path.basename(server_config.bot_runner)
+    next_heartbeat = time.monotonic() + INSTANCE_HEARTBEAT_SECS
+    while True:
+        await asyncio.sleep(SHARED_STATE_REFRESH_SECS if shared_state else INSTANCE_HEARTBEAT_SECS)
+        try:
+            if shared_state:
+                others_active = shared_state.others_active
+                await shared_state.run(shared_state.refresh_others)
+                if shared_state.others_active < others_active:
+                    admission.notify()
+                await follow_drain()
+            if time.monotonic() >= next_heartbeat:
+                next_heartbeat = time.monotonic() + INSTANCE_HEARTBEAT_SECS
+                await ledger.run(ledger.heartbeat)
+                stop_leftover_bots(await ledger.run(ledger.reconcile, runner))
+        except sqlite3.Error as e:
+            logger.error(f"Ledger maintenance failed: {e}")
+
+
+async def stop_bots() -> None:
+    """
+    Stop the bots still running and release their rooms.
+    """
+    records = bot_registry.active()
+    if not records:
+        return
+    logger.warning(f"Stopping {len(records)} running bots")
+    await stop_processes(
+        [record.proc for record in records if record.proc], server_config.drain_stop_grace
+    )
+    # Bots without a local process (engine calls, bots on worker agents) leave with their room
+    await asyncio.gather(*(finish_bot(record.bot_id, None) for record in bot_registry.active()))
+
+
+def begin_drain(reason: str) -> None:
+    """
+    Start draining, and have the other workers drain too.
+    """
+    if drain.begin(reason) and shared_state:
+        shared_state.submit(shared_state.request_drain, reason)
+
+
+async def follow_drain() -> None:
+    """
+    Join a drain that was started through another worker.
+    """
+    if shared_state and not drain.draining:
+        reason = await shared_state.run(shared_state.drain_requested)
+        if reason:
+            drain.begin(reason)
+
+
+async def drained(timed_out: bool) -> None:
+    """
+    Shut the server down once a drain completes.
+    """
+    await stop_bots()
+    event_bus.close()
+    if shared_state:
+        if not await shared_state.run(shared_state.instance_drained):
+            logger.info("Drain complete, waiting for the other workers")
+            return
+        # Uvicorn replaces workers that exit, so the last worker to drain stops the parent
+        logger.info("All workers drained, shutting down")
+        os.kill(os.getppid(), signal.SIGTERM)
+        return
+    logger.info("Drain complete, shutting down")
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+# Stops new connects while running bots finish; started by SIGUSR1 or POST /admin/drain
+drain = DrainController(
+    active_count=lambda: bot_registry.active_count,
+    timeout=server_config.drain_timeout,
+    on_drained=drained,
+)
+
+# Deletes rooms orphaned by failed releases or by an earlier instance, a batch at a time
+room_gc = RoomGarbageCollector(
+    ledger,
+    delete=lambda room_url: daily_helpers["rest"].delete_room_by_url(room_url),
+    batch_size=server_config.room_gc_batch,
+    interval=server_config.room_gc_interval,
+)
+
+# Observes bot process exits as events and dispatches room cleanup immediately
+reaper = ProcessReaper(on_exit=handle_bot_exit)
+room_release_semaphore = asyncio.Semaphore(server_config.room_release_concurrency)
+
+# Places bots on worker agents; started in lifespan when DISPATCH_MODE=dispatcher
+dispatcher = Dispatcher(
+    on_exit=handle_remote_bot_exit,
+    report_timeout=server_config.agent_timeout,
+    spawn_timeout=server_config.agent_spawn_timeout,
+    retry_after=server_config.admission_retry_after,
+    api_key=server_config.agent_api_key,
+    on_event=handle_remote_bot_message,
+    down_grace=server_config.agent_down_grace,
+)
+channel_readers: Set[asyncio.Task] = set()
 
 
 # Create the FastAPI app with the lifespan context
 app: FastAPI = FastAPI(lifespan=lifespan)
 
+# Reject connects over a client's rate limit before any room or bot is created. Added before
+# CORS so that rejections still carry CORS headers
+app.add_middleware(
+    ClientRateLimitMiddleware,
+    limiter=client_limiter,
+    routes=[("GET", "/"), ("POST", "/connect")],
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -108,137 +535,474 @@ app.add_middleware(
 
 async def create_room_and_token() -> tuple[str, str]:
     """
-    Create a Daily room and get an access token.
+    Take a pre-provisioned room from the pool, or create a Daily room and get an access token.
     """
-    room = await daily_helpers["rest"].create_room(DailyRoomParams())
+    pooled = await room_pool.acquire()
+    if pooled:
+        return pooled
+    if room_pool.enabled:
+        logger.warning("Room pool empty, creating room on demand")
+
+    with tracer.span("daily.create_room", kind=KIND_CLIENT):
+        room = await daily_helpers["rest"].create_room(DailyRoomParams(), priority=PRIORITY_CONNECT)
     if not room.url:
         raise HTTPException(status_code=500, detail="Failed to create room")
-    token = await daily_helpers["rest"].get_token(room.url)
+    if ledger:
+        ledger.submit(ledger.room_created, room.url)
+    with tracer.span("daily.get_token", kind=KIND_CLIENT):
+        token = await daily_helpers["rest"].get_token(room.url, priority=PRIORITY_CONNECT)
     if not token:
         raise HTTPException(status_code=500, detail=f"Failed to get token for room: {room.url}")
     return room.url, token
 
 
-def parse_server_args():
-    """Parse server-specific arguments and store remaining args for bot processes"""
-    import argparse
+# Starts runner.py processes on a dedicated thread pool, off the event loop
+spawner = BotSpawner(
+    server_dir=os.path.dirname(os.path.abspath(__file__)),
+    bot_args=bot_args,
+    threads=server_config.spawn_threads,
+    runner=server_config.bot_runner,
+    limiter=resource_limiter,
+)
 
-    parser = argparse.ArgumentParser(add_help=False)
-    parser.add_argument("--host", help="Server host")
-    parser.add_argument("--port", type=int, help="Server port")
-    parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
 
-    # Parse known server args and keep remaining for bots
-    server_args, remaining_args = parser.parse_known_args()
+# Warm runners waiting for a room; started in lifespan when WARM_WORKERS > 0
+worker_pool = WorkerPool(
+    size=per_worker(server_config.warm_workers),
+    spawn=lambda: spawner.spawn("--worker", stdin=subprocess.PIPE, stdout=subprocess.PIPE),
+    on_message=handle_bot_message,
+)
 
-    # Update server config with parsed args
-    global server_config
-    if server_args.host:
-        server_config.host = server_args.host
-    if server_args.port:
-        server_config.port = server_args.port
-    if server_args.reload:
-        server_config.reload = server_args.reload
 
-    global bot_args
-    bot_args = remaining_args
+# Engine processes hosting many calls each; started in lifespan when BOT_ENGINES > 0
+engine_pool = EnginePool(
+    size=per_worker(server_config.bot_engines),
+    max_calls=server_config.engine_max_calls,
+    spawn=lambda: spawner.spawn(
+        "--engine",
+        slots=server_config.engine_max_calls,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    ),
+    on_call_exit=finish_bot,
+    on_message=handle_bot_message,
+)
 
 
-# Call this before starting the app
-parse_server_args()
+async def start_bot_process(
+    room_url: str, token: str, traceparent: str, profile: Dict[str, Any]
+) -> int:
+    """Start a bot for the room on an engine, a warm worker or a new process.
 
+    The bot's spans continue the trace context `traceparent`, and it runs with the profile
+    payload `profile`.
 
-async def start_bot_process(room_url: str, token: str) -> int:
-    """Start a bot subprocess with forwarded CLI arguments"""
+    Returns:
+        The bot's ID: its process id, or a synthetic ID for bots on engines or worker agents
+    """
     # Check room capacity
-    num_bots_in_room = sum(
-        1 for proc, url in bot_procs.values() if url == room_url and proc.poll() is None
-    )
-    if num_bots_in_room >= server_config.max_bots_per_room:
+    if shared_state:
+        in_room = await shared_state.run(shared_state.count_in_room, room_url)
+    else:
+        in_room = bot_registry.count_in_room(room_url)
+    if in_room >= server_config.max_bots_per_room:
         raise HTTPException(
             status_code=429,
             detail=f"Room {room_url} at capacity ({server_config.max_bots_per_room} bots)",
         )
+    if server_config.dispatch_mode == "dispatcher":
+        return await start_remote_bot(room_url, token, traceparent, profile)
 
-    try:
-        server_dir = os.path.dirname(os.path.abspath(__file__))
-        run_helpers_path = os.path.join(server_dir, "runner.py")
-
-        # Build command with forwarded arguments
-        cmd = [
-            sys.executable,
-            run_helpers_path,
-            "-u",
-            room_url,
-            "-t",
-            token,
-            *bot_args,  # Forward stored CLI arguments
-        ]
-
-        # Set up environment with proper Python path
-        env = os.environ.copy()
-        env["PYTHONPATH"] = server_dir  # Set server directory as Python path
+    if engine_pool.enabled:
+        bot_id = bot_registry.next_bot_id()
+        pid = engine_pool.assign(bot_id, room_url, token, traceparent, profile)
+        if pid is not None:
+            bot_spawned(bot_registry.add(pid, room_url, bot_id=bot_id))
+            return bot_id
+        logger.warning("All engines are full, starting bot as a separate process")
 
-        proc = subprocess.Popen(
-            cmd,
-            bufsize=1,
-            cwd=server_dir,  # Run from server directory
-            env=env,
-        )
-        bot_procs[proc.pid] = (proc, room_url)
+    try:
+        proc = worker_pool.acquire(room_url, token, traceparent, profile)
+        if proc is None:
+            if worker_pool.enabled:
+                logger.warning("No warm worker available, starting bot from scratch")
+            proc = await spawner.spawn(
+                "-u",
+                room_url,
+                "-t",
+                token,
+                "--traceparent",
+                traceparent,
+                "--profile",
+                json.dumps(profile),
+                stdout=subprocess.PIPE,
+            )
+            reader = asyncio.create_task(read_bot_channel(proc.pid, proc))
+            channel_readers.add(reader)
+            reader.add_done_callback(channel_readers.discard)
+        bot_spawned(bot_registry.add(proc.pid, room_url, proc))
+        reaper.watch(proc)
         return proc.pid
     except Exception as e:
         logger.error(f"Bot startup failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to start bot process: {e}")
 
 
+async def start_remote_bot(
+    room_url: str, token: str, traceparent: str, profile: Dict[str, Any]
+) -> int:
+    """Start a bot for the room on the worker agent with the most free capacity"""
+    try:
+        agent_id, pid = await dispatcher.place(room_url, token, traceparent, profile)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
+
+    record = bot_registry.add(pid, room_url, bot_id=bot_registry.next_bot_id(), host=agent_id)
+    remote_bots[(agent_id, pid)] = record.bot_id
+    bot_spawned(record)
+    logger.info(f"Bot {record.bot_id} started as process {pid} on worker agent {agent_id}")
+    return record.bot_id
+
+
+def check_not_draining() -> None:
+    # Drains started through another worker are joined by maintain_ledger
+    if drain.draining:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is draining",
+            headers={"Retry-After": str(server_config.admission_retry_after)},
+        )
+
+
+def get_profile(name: Optional[str]) -> Dict[str, Any]:
+    """Payload of the named bot profile (default: the runners' own configuration)."""
+    profile = bot_profiles.get(name or DEFAULT_PROFILE)
+    if profile is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown profile {name!r}, expected one of: {', '.join(bot_profiles)}",
+        )
+    return profile
+
+
+async def launch_bot(
+    request: Request, profile_name: Optional[str] = None
+) -> Tuple[str, str, int, str]:
+    """Admit, provision a room for and start a new bot with the named profile, in a trace
+    continuing the request's `traceparent` header if it has one.
+
+    Returns:
+        Tuple of room_url, token, the bot's ID and the trace ID
+    """
+    profile = get_profile(profile_name)
+    with tracer.span(
+        "connect",
+        request.headers.get("traceparent"),
+        KIND_SERVER,
+        **{"http.route": request.url.path, "bot.profile": profile["name"]},
+    ) as span:
+        dispatching = server_config.dispatch_mode == "dispatcher"
+        check_not_draining()
+        try:
+            with tracer.span("admission"):
+                if dispatching:
+                    dispatcher.check_capacity()
+                else:
+                    await admission.acquire()
+        except AdmissionRejected as e:
+            logger.warning(f"Rejecting connect: {e}")
+            raise HTTPException(
+                status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+            )
+
+        try:
+            # A drain may have started while the connect was queued for admission
+            check_not_draining()
+            with tracer.span("room"):
+                room_url, token = await create_room_and_token()
+            logger.info(f"Room URL: {room_url} (trace {span.trace_id})")
+            with tracer.span("spawn") as spawn:
+                try:
+                    bot_id = await start_bot_process(room_url, token, spawn.traceparent, profile)
+                except Exception:
+                    # No bot will use the room: recycle or delete it rather than leak it
+                    await release_room(room_url)
+                    raise
+            span.attributes["bot.id"] = bot_id
+        finally:
+            if not dispatching:
+                admission.release()
+    return room_url, token, bot_id, span.trace_id
+
+
 @app.get("/")
 async def start_agent(request: Request):
     """
     Endpoint for direct browser access to the bot.
-    Creates a room and spawns a bot subprocess.
+    Creates a room and spawns a bot subprocess, with the profile named by the `profile` query
+    parameter.
     """
     logger.info("Creating room for bot (browser access)")
-    room_url, token = await create_room_and_token()
-    logger.info(f"Room URL: {room_url}")
-
-    # Start bot and redirect to room
-    await start_bot_process(room_url, token)
+    room_url, _, _, _ = await launch_bot(request, request.query_params.get("profile"))
     return RedirectResponse(room_url)
 
 
+async def requested_profile(request: Request) -> Optional[str]:
+    """Profile named by the `profile` field of a JSON request body or the query parameter."""
+    body = await request.body()
+    if body:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Request body is not valid JSON")
+        if isinstance(payload, dict) and payload.get("profile") is not None:
+            return str(payload["profile"])
+    return request.query_params.get("profile")
+
+
 @app.post("/connect")
 async def rtvi_connect(request: Request) -> Dict[str, Any]:
     """API-friendly endpoint returning connection credentials.
 
+    The bot runs with the profile named by `{"profile": "<name>"}` in the request body (or the
+    `profile` query parameter); without one, with the runners' own configuration.
+
     Returns:
-        Dict containing room_url, token, bot_pid, and status_endpoint
+        Dict containing room_url, token, bot_pid, status_endpoint, events_endpoint, the
+        profile and the trace_id of the connect, shared by the bot's spans
     """
     logger.info("Creating room for RTVI connection")
-    room_url, token = await create_room_and_token()
-    logger.info(f"Room URL: {room_url}")
-
-    # Start bot and return credentials
-    pid = await start_bot_process(room_url, token)
+    profile = await requested_profile(request)
+    room_url, token, pid, trace_id = await launch_bot(request, profile)
     return {
         "room_url": room_url,
         "token": token,
         "bot_pid": pid,
         "status_endpoint": f"/status/{pid}",
+        "events_endpoint": f"/events/{pid}",
+        "profile": profile or DEFAULT_PROFILE,
+        "trace_id": trace_id,
+    }
+
+
+@app.get("/status")
+async def get_status_summary() -> Dict[str, Any]:
+    """
+    Get aggregate bot status: active bots, bots per room, counters and recent exits.
+    """
+    # Async so that the snapshots are taken on the event loop, which changes the state
+    status = {
+        **bot_registry.summary(),
+        "recent_exits": [record.to_dict() for record in bot_registry.recent_exits()],
     }
+    if shared_state:
+        # Counters and recent exits are this worker's, the rest spans all workers
+        status["bots_per_room"] = await shared_state.run(shared_state.bots_per_room)
+        status["workers"] = await shared_state.run(shared_state.instances)
+    else:
+        status["bots_per_room"] = bot_registry.bots_per_room()
+    if server_config.dispatch_mode == "dispatcher":
+        status["agents"] = dispatcher.agents()
+    else:
+        status["admission"] = admission.snapshot()
+    status["drain"] = drain.snapshot()
+    status["daily"] = daily_limiter.snapshot()
+    status["client_limits"] = client_limiter.snapshot()
+    status["providers"] = health_monitor.snapshot()
+    status["resources"] = resource_limiter.snapshot()
+    if ledger:
+        status["ledger"] = await ledger.run(ledger.counts)
+    return status
 
 
 @app.get("/status/{pid}")
-def get_status(pid: int):
+async def get_status(pid: int):
+    """
+    Get the status of a specific bot by process id (bot id for bots on worker agents),
+    with the resource usage of its process while it runs on this host.
+    """
+    record = bot_registry.get(pid)
+    if record:
+        status = record.to_dict()
+    elif shared_state and (status := await shared_state.run(shared_state.get_bot, pid)):
+        pass  # Started by another worker
+    else:
+        raise HTTPException(status_code=404, detail=f"Bot with process id: {pid} not found")
+    if status["status"] == "running" and not status["host"]:
+        # /proc and cgroup reads stay off the event loop
+        status["resources"] = await asyncio.to_thread(resource_limiter.usage, status["pid"])
+    return JSONResponse(status)
+
+
+def readiness() -> Tuple[bool, Dict[str, Any]]:
+    """Whether this node should get new connects, with its capacity and provider health."""
+    reasons = []
+    if drain.draining:
+        reasons.append("draining")
+    if server_config.dispatch_mode == "dispatcher":
+        free = sum(agent["free"] for agent in dispatcher.agents() if agent["up"])
+    else:
+        free = admission.free_slots()
+    if free <= 0:
+        reasons.append("no free bot capacity")
+    reasons.extend(f"{name}: {reason}" for name, reason in health_monitor.degraded().items())
+    return not reasons, {
+        "ready": not reasons,
+        "reasons": reasons,
+        "free_slots": max(0, free),
+        "warm_workers": worker_pool.idle_count,
+        "pooled_rooms": room_pool.idle_count,
+        "providers": health_monitor.snapshot(),
+    }
+
+
+@app.get("/healthz")
+async def healthz() -> Dict[str, str]:
+    """Liveness: the server process and its event loop are responsive."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz() -> JSONResponse:
+    """
+    Readiness for new connects: not draining, free bot capacity (admission budget, or worker
+    agents in dispatcher mode) and no degraded provider. Answers 503 when not ready, so load
+    balancers route connects to other nodes.
+    """
+    ready, status = readiness()
+    return JSONResponse(status, status_code=200 if ready else 503)
+
+
+@app.get("/metrics")
+async def get_metrics() -> PlainTextResponse:
     """
-    Get the status of a specific bot process.
+    Prometheus metrics: pipeline latency and usage of all bots, bot counts and host load.
     """
-    proc_tuple = bot_procs.get(pid)
-    if not proc_tuple:
+    # Async so that the snapshots are taken on the event loop; only /proc reads use a thread
+    processes = await asyncio.to_thread(resource_limiter.running)
+    if server_config.dispatch_mode == "dispatcher":
+        agents = dispatcher.agents()
+        host_metrics = [
+            *format_metric(
+                "agents_up", "gauge", "Worker agents up", {(): sum(a["up"] for a in agents)}
+            ),
+            *format_metric(
+                "agent_free_slots",
+                "gauge",
+                "Free bot slots per worker agent",
+                {(a["agent_id"],): a["free"] for a in agents},
+                ("agent",),
+            ),
+        ]
+    else:
+        host_metrics = admission_metrics(admission.snapshot())
+
+    return PlainTextResponse(
+        render_exposition(
+            pipeline_metrics.render(),
+            registry_metrics(bot_registry.summary()),
+            process_metrics(processes),
+            host_metrics,
+            daily_api_metrics(daily_limiter.snapshot()),
+            health_metrics(health_monitor.snapshot(), readiness()[0]),
+            format_metric(
+                "server_draining",
+                "gauge",
+                "Whether the server is draining",
+                {(): int(drain.draining)},
+            ),
+            format_metric(
+                "event_subscribers",
+                "gauge",
+                "Open /events streams",
+                {(): event_bus.subscriber_count},
+            ),
+            format_metric(
+                "connects_rate_limited_total",
+                "counter",
+                "Connects rejected by per-client rate limits",
+                {(): client_limiter.rejected},
+            ),
+            # Each worker counts on its own; the label keeps their series apart
+            labels={"worker": str(os.getpid())} if shared_state else None,
+        ),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+def event_stream(bot_id: Optional[int], shared: bool = False) -> StreamingResponse:
+    """Serve lifecycle events as Server-Sent Events, from the ledger if `shared`."""
+
+    async def stream():
+        messages = shared_state.follow_events(bot_id) if shared else event_bus.subscribe(bot_id)
+        async for message in messages:
+            if message is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: {message['event']}\ndata: {json.dumps(message)}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/events")
+async def stream_events():
+    """
+    Stream lifecycle events of all bots (spawned, joined_room, first_audio_out, finished,
+    room_deleted/room_recycled/room_release_failed) as Server-Sent Events.
+    """
+    return event_stream(None)
+
+
+@app.get("/events/{pid}")
+async def stream_bot_events(pid: int):
+    """
+    Stream the lifecycle events of one bot, starting with those already published.
+    The stream ends once the bot's room has been released.
+    """
+    if not event_bus.knows(pid) and not bot_registry.get(pid):
+        if shared_state and await shared_state.run(shared_state.get_bot, pid):
+            # Started by another worker, whose events reach this one through the ledger
+            return event_stream(pid, shared=True)
         raise HTTPException(status_code=404, detail=f"Bot with process id: {pid} not found")
-    proc, _ = proc_tuple
-    status = "running" if proc.poll() is None else "finished"
-    return JSONResponse({"bot_id": pid, "status": status})
+    return event_stream(pid)
+
+
+@app.post("/agents/report")
+async def agent_report(request: Request) -> Dict[str, Any]:
+    """
+    Receive a worker agent's capacity and exit report (dispatcher mode).
+
+    Returns:
+        Dict with the PIDs of reported exits that were handled
+    """
+    if server_config.dispatch_mode != "dispatcher":
+        raise HTTPException(status_code=404, detail="Not running in dispatcher mode")
+    check_agent_key(request, server_config.agent_api_key)
+    try:
+        return {"acked": dispatcher.report(await request.json())}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid report: {e}")
+
+
+@app.post("/admin/drain")
+async def start_drain(request: Request) -> Dict[str, Any]:
+    """
+    Stop accepting connects, wait for running bots to finish (up to DRAIN_TIMEOUT_SECS),
+    then release their rooms and shut down. Requires ADMIN_API_KEY if set, otherwise
+    only loopback clients may drain the server.
+
+    Returns:
+        Dict with the drain state
+    """
+    check_admin(request, server_config.admin_api_key)
+    begin_drain(f"requested by {request.client.host if request.client else 'unknown'}")
+    return drain.snapshot()
 
 
 if __name__ == "__main__":
@@ -251,4 +1015,9 @@ if __name__ == "__main__":
         host=server_config.host,
         port=server_config.port,
         reload=server_config.reload,
+        workers=server_config.workers,
+        # Client addresses, e.g. for the connect rate limits, come from X-Forwarded-For when
+        # the peer is a trusted proxy
+        proxy_headers=True,
+        forwarded_allow_ips=server_config.forwarded_allow_ips,
     )
@@ -1,11 +1,9 @@
 from .types import NodeMessage
-from .helpers import get_system_prompt, get_current_date_uk
-from config.bot import BotConfig
-
-config = BotConfig()
+from .helpers import get_bot_config, get_system_prompt, get_current_date_uk
 
 
 def get_meta_instructions(user_name: str = None) -> str:
+    config = get_bot_config()
     user_name = "User" if user_name is None else user_name
     return f"""<meta_instructions>
 *   **[ACTION DRIVEN]**: The primary goal is to call functions accurately and promptly when required. All other conversational elements are secondary to this goal.
@@ -36,6 +34,7 @@ Today's day of the week and date in the UK is: {get_current_date_uk()}
 
 def get_recording_consent_prompt() -> NodeMessage:
     """Return a dictionary with the recording consent task."""
+    config = get_bot_config()
     return get_system_prompt(
         f"""<role>
 You are {config.bot_name}, a dynamic and high-performing voice assistant at John George Voice AI Solutions. You take immense pride in delivering exceptional customer service. You engage in conversations naturally and enthusiastically, ensuring a friendly and professional experience for every user. Your highest priority is to obtain the user's explicit, unambiguous, and unconditional consent to be recorded during this call and to record the outcome immediately. You are highly trained and proficient in using your functions precisely as described.
@@ -95,6 +94,7 @@ Your *sole* and *critical* task is to obtain the user's *explicit, unambiguous,
 
 def get_name_and_interest_prompt() -> NodeMessage:
     """Return a dictionary with the name and interest task."""
+    config = get_bot_config()
     return get_system_prompt(
         f"""<role>
 You are {config.bot_name}, a friendly and efficient voice assistant at John George Voice AI Solutions. Your primary goal is to quickly and accurately collect the caller's name and determine their primary interest (either technical consultancy or voice agent development) to personalize their experience.
@@ -181,6 +181,7 @@ Your *sole* and *critical* task is to: 1) Elicit the user's name. 2) Determine i
 
 def get_development_prompt(user_name: str = None) -> NodeMessage:
     """Return a dictionary with the development task."""
+    config = get_bot_config()
     user_name = "User" if user_name is None else user_name
     first_name = user_name.split(" ")[0]
     return get_system_prompt(
@@ -313,6 +314,7 @@ Follow the conversation flow below to collect this information. If {user_name} i
 
 def get_close_call_prompt(user_name: str = None) -> NodeMessage:
     """Return a dictionary with the close call task."""
+    config = get_bot_config()
     user_name = "User" if user_name is None else user_name
     first_name = user_name.split(" ")[0] if user_name != "User" else ""
     return get_system_prompt(
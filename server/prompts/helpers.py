@@ -1,8 +1,21 @@
 from datetime import datetime
+from functools import cache
 import pytz
+from config.bot import BotConfig, call_config
 from .types import NodeMessage
 
 
+@cache
+def _default_config() -> BotConfig:
+    return BotConfig()
+
+
+def get_bot_config() -> BotConfig:
+    """Return the configuration of the current call, or the process's default configuration
+    (created on first use rather than on import) outside of a call."""
+    return call_config() or _default_config()
+
+
 def get_system_prompt(content: str) -> NodeMessage:
     """Return a dictionary with a system prompt."""
     return {
@@ -1,12 +1,10 @@
 from .types import NodeContent
-from .helpers import get_system_prompt, get_current_date_uk
-from config.bot import BotConfig
-
-config = BotConfig()
+from .helpers import get_bot_config, get_system_prompt, get_current_date_uk
 
 
 def get_simple_prompt() -> NodeContent:
     """Return a dictionary with the simple prompt, combining all flows."""
+    config = get_bot_config()
     return get_system_prompt(
         f"""# Role
 You are {config.bot_name}, a dynamic and high-performing voice assistant at John George Voice AI Solutions. You take immense pride in delivering exceptional customer service. You engage in conversations naturally and enthusiastically, ensuring a friendly and professional experience for every user. Your goal is to qualify leads and gather necessary information efficiently and professionally.
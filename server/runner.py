@@ -1,38 +1,301 @@
 import argparse
 import asyncio
+import json
 import os
-from typing import Type
+import sys
+import time
+from typing import Any, Coroutine, Dict, List, Optional, Set, Tuple, Type
 
-from config.bot import BotConfig
+from loguru import logger
 
+from config.bot import BotConfig, set_call_config
+from config.profiles import BotProfile
+from bots.observers import FirstAudioObserver, MetricsObserver, TraceObserver
+from utils.ipc import ChannelWriter, open_channel
+from utils.loop_monitor import LoopMonitor
+from utils.tracing import Span, Tracer, create_tracer
 
-async def run_bot(bot_class: Type, config: BotConfig, room_url: str, token: str) -> None:
+
+def load_bot_class(bot_type: str) -> Type:
+    """Import the bot class of a bot type."""
+    if bot_type == "flow":
+        from bots.flow import FlowBot
+
+        return FlowBot
+
+    from bots.simple import SimpleBot
+
+    return SimpleBot
+
+
+def configure_call(config: BotConfig, profile: Optional[Dict[str, Any]]) -> BotConfig:
+    """Configuration of a call: the runner's profile with the call's profile payload applied.
+
+    Raises:
+        ValueError: If the payload is not a valid profile.
+    """
+    if not profile:
+        return config
+    if not isinstance(profile, dict):
+        raise ValueError(f"Profile payload must be a JSON object, not {profile!r}")
+    return config.with_profile(config.profile.replace(**profile))
+
+
+async def run_bot(
+    bot_class: Type,
+    config: BotConfig,
+    room_url: str,
+    token: str,
+    handle_sigint: bool = True,
+    channel: Optional[ChannelWriter] = None,
+    call_id: Optional[int] = None,
+    tracer: Optional[Tracer] = None,
+    traceparent: Optional[str] = None,
+) -> None:
     """Universal bot runner handling bot lifecycle.
 
     Args:
         bot_class: The bot class to instantiate (e.g. FlowBot or SimpleBot)
-        config: The configuration instance to use (with bot_type possibly overridden)
+        config: The call's configuration, also used by the prompts while the call runs
         room_url: The Daily room URL
         token: The Daily room token
+        handle_sigint: Whether SIGINT stops the bot (disabled in engine mode)
+        channel: Channel to the server, used to report lifecycle milestones
+        call_id: ID of the call in engine mode, included in channel messages
+        tracer: Records the call's spans (default: spans are not exported)
+        traceparent: Trace context of the server's connect, continued by the call's spans
+    """
+    tracer = tracer or Tracer("lead-qualifier-bot")
+    set_call_config(config)
+    attributes = {
+        "call.id": call_id,
+        "bot.type": config.bot_type,
+        "bot.profile": config.profile_name,
+    }
+    with tracer.span("call", traceparent, **attributes) as call:
+        # Instantiate the bot using the provided configuration instance.
+        bot = bot_class(config)
+
+        # Set up transport and pipeline.
+        with tracer.span("transport.setup"):
+            await bot.setup_transport(room_url, token)
+        joining = tracer.start_span("transport.join")
+        waiting: Optional[Span] = None
+        greeting: Optional[Span] = None
+
+        async def on_first_audio():
+            if greeting:
+                tracer.end_span(greeting)
+            if channel:
+                channel.send("first_audio_out", call_id=call_id)
+
+        @bot.transport.event_handler("on_joined")
+        async def on_joined(transport, data):
+            nonlocal waiting
+            tracer.end_span(joining)
+            waiting = tracer.start_span("participant.wait", call)
+            if channel:
+                channel.send("joined_room", call_id=call_id)
+
+        @bot.transport.event_handler("on_first_participant_joined")
+        async def on_first_participant_joined(transport, participant):
+            nonlocal greeting
+            if waiting:
+                tracer.end_span(waiting)
+            greeting = tracer.start_span("greeting", call)
+
+        def send_metrics(node: Optional[str], data: List[Dict[str, Any]]):
+            if channel:
+                channel.send("metrics", call_id=call_id, node=node, data=data)
+
+        turns = TraceObserver(tracer, call, bot.current_node)
+        bot.create_pipeline(
+            handle_sigint=handle_sigint,
+            observers=[
+                FirstAudioObserver(on_first_audio),
+                MetricsObserver(send_metrics, bot.current_node),
+                turns,
+            ],
+        )
+
+        # Open the service connections while the transport joins the room
+        warm_up: Optional[asyncio.Task] = None
+        if config.warm_up:
+            warm_up_started = time.time_ns()
+            warm_up = bot.warm_up()
+
+            def trace_warm_up(task: asyncio.Task):
+                if not task.cancelled() and not task.exception():
+                    attributes = {
+                        f"warmup.{name}.ms": round(secs * 1000, 1)
+                        for name, secs in task.result().items()
+                    }
+                    tracer.record("warmup", warm_up_started, time.time_ns(), call, **attributes)
+
+            warm_up.add_done_callback(trace_warm_up)
+
+        # Start the bot.
+        try:
+            await bot.start()
+        finally:
+            if warm_up:
+                warm_up.cancel()
+            turns.end()
+            for span in (joining, waiting, greeting):
+                if span:
+                    tracer.end_span(span)
+
+
+def wait_for_assignment(
+    channel: ChannelWriter,
+) -> Tuple[str, str, Optional[str], Optional[Dict[str, Any]]]:
+    """Tell the server this worker is warm and block until it assigns a room.
+
+    Returns:
+        The Daily room URL, token, trace context and profile payload sent by the server on stdin.
+    """
+    channel.send("ready")
+
+    line = sys.stdin.readline()
+    if not line:
+        # The server went away (or shrank the pool) before assigning a room
+        sys.exit(0)
+
+    assignment = json.loads(line)
+    return (
+        assignment["room_url"],
+        assignment["token"],
+        assignment.get("traceparent"),
+        assignment.get("profile"),
+    )
+
+
+async def run_engine(config: BotConfig, channel: ChannelWriter, tracer: Tracer) -> None:
+    """Host many calls in this process, one asyncio task per call.
+
+    Assignments arrive as JSON lines with call_id, room_url, token, traceparent and profile on
+    stdin. Calls share the process's imports, VAD model and API clients, but each runs its own
+    bot and pipeline with its own profile, so a failing call only ends itself. An invalid
+    assignment is logged and, if it has a call_id, reported finished with exit code 1. When
+    stdin closes, no new calls are accepted and the engine exits once the calls in progress
+    have finished.
+
+    Args:
+        config: The engine's configuration, to which each call's profile is applied
+        channel: Channel to the server
+        tracer: Records the spans of every call
     """
-    # Instantiate the bot using the provided configuration instance.
-    bot = bot_class(config)
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
 
-    # Set up transport and pipeline.
-    await bot.setup_transport(room_url, token)
-    bot.create_pipeline()
+    async def run_call(
+        call_id: int,
+        room_url: str,
+        token: str,
+        traceparent: Optional[str] = None,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        channel.send("started", call_id=call_id)
+        exit_code = 0
+        try:
+            call_config = configure_call(config, profile)
+            await run_bot(
+                load_bot_class(call_config.bot_type),
+                call_config,
+                room_url,
+                token,
+                handle_sigint=False,
+                channel=channel,
+                call_id=call_id,
+                tracer=tracer,
+                traceparent=traceparent,
+            )
+        except Exception as e:
+            logger.exception(f"Call {call_id} failed: {e}")
+            exit_code = 1
+        finally:
+            channel.send("finished", call_id=call_id, exit_code=exit_code)
 
-    # Start the bot.
-    await bot.start()
+    calls: Set[asyncio.Task] = set()
+    channel.send("ready")
+    while line := await reader.readline():
+        assignment = None
+        try:
+            assignment = json.loads(line)
+            call = asyncio.create_task(run_call(**assignment))
+        except (ValueError, TypeError) as e:
+            # A bad assignment must not end the engine and the calls it is hosting
+            logger.error(f"Invalid call assignment {line[:200]!r}: {e}")
+            if isinstance(assignment, dict) and isinstance(assignment.get("call_id"), int):
+                channel.send("finished", call_id=assignment["call_id"], exit_code=1)
+            continue
+        calls.add(call)
+        call.add_done_callback(calls.discard)
+
+    if calls:
+        await asyncio.gather(*calls, return_exceptions=True)
+
+
+def run_loop(main: Coroutine, config: BotConfig, channel: ChannelWriter) -> None:
+    """Run `main` on the configured event loop, sampling its lag if the loop monitor is enabled.
+
+    Lag histograms and slow callbacks are sent as `metrics` messages labelled with the loop
+    policy; the bot's own messages keep flowing on the same channel.
+    """
+    if config.loop_policy == "uvloop":
+        try:
+            import uvloop
+        except ImportError:
+            raise SystemExit("LOOP_POLICY=uvloop requires the uvloop package (pip install uvloop)")
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+    if not config.loop_monitor:
+        asyncio.run(main)
+        return
+
+    async def monitored():
+        monitor = LoopMonitor(
+            lambda data: channel.send("metrics", node=None, data=data),
+            config.loop_policy,
+            slow_callback=config.loop_slow_callback_ms / 1000,
+        )
+        monitor.start()
+        try:
+            await main
+        finally:
+            await monitor.stop()
+
+    asyncio.run(monitored())
 
 
 def cli() -> None:
     """Parse command-line arguments, override configuration if needed, and start the bot."""
     parser = argparse.ArgumentParser(description="Unified Bot Runner")
 
-    # Required arguments
-    parser.add_argument("-u", "--room-url", type=str, required=True, help="Daily room URL")
-    parser.add_argument("-t", "--token", type=str, required=True, help="Authentication token")
+    # Room arguments (required unless running as a warm worker)
+    parser.add_argument("-u", "--room-url", type=str, help="Daily room URL")
+    parser.add_argument("-t", "--token", type=str, help="Authentication token")
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Preload the bot and wait for a room URL and token on stdin",
+    )
+    parser.add_argument(
+        "--engine",
+        action="store_true",
+        help="Host many calls in this process, assigned as JSON lines on stdin",
+    )
+    parser.add_argument(
+        "--traceparent",
+        type=str,
+        help="W3C trace context of the server's connect, continued by the call's spans",
+    )
+    parser.add_argument(
+        "--profile",
+        type=json.loads,
+        help="Profile payload of the call as a JSON object, applied over the other arguments",
+    )
 
     # Bot type selection
     parser.add_argument(
@@ -56,7 +319,7 @@ def cli() -> None:
         "-l",
         "--llm-provider",
         type=str.lower,
-        choices=["google", "openai"],
+        choices=["google"],
     )
 
     # Google configuration
@@ -124,50 +387,108 @@ def cli() -> None:
         help="Override ENABLE_STT_MUTE_FILTER (true/false)",
     )
 
+    # Event loop configuration
+    parser.add_argument(
+        "--loop",
+        type=str.lower,
+        choices=["asyncio", "uvloop"],
+        help="Override LOOP_POLICY (default: asyncio)",
+    )
+    parser.add_argument(
+        "--loop-monitor",
+        action="store_true",
+        default=None,
+        help="Report event-loop lag and slow callbacks (overrides LOOP_MONITOR)",
+    )
+    parser.add_argument(
+        "--slow-callback-ms",
+        type=float,
+        help="Override LOOP_SLOW_CALLBACK_MS (default: 50)",
+    )
+
     args = parser.parse_args()
+    if not (args.worker or args.engine) and not (args.room_url and args.token):
+        parser.error("--room-url and --token are required unless --worker or --engine is set")
 
-    # Set environment variables based on CLI arguments
-    if args.bot_type:
-        os.environ["BOT_TYPE"] = args.bot_type
-    if args.bot_name:
-        os.environ["BOT_NAME"] = args.bot_name
-    if args.llm_provider:
-        os.environ["LLM_PROVIDER"] = args.llm_provider.lower()
-    if args.google_model:
-        os.environ["GOOGLE_MODEL"] = args.google_model
-    if args.google_temperature is not None:
-        os.environ["GOOGLE_TEMPERATURE"] = str(args.google_temperature)
-    if args.openai_model:
-        os.environ["OPENAI_MODEL"] = args.openai_model
-    if args.openai_temperature is not None:
-        os.environ["OPENAI_TEMPERATURE"] = str(args.openai_temperature)
-    if args.tts_provider:
-        os.environ["TTS_PROVIDER"] = args.tts_provider.lower()
-    if args.deepgram_voice:
-        os.environ["DEEPGRAM_VOICE"] = args.deepgram_voice
-    if args.cartesia_voice:
-        os.environ["CARTESIA_VOICE"] = args.cartesia_voice
-    if args.elevenlabs_voice_id:
-        os.environ["ELEVENLABS_VOICE_ID"] = args.elevenlabs_voice_id
-    if args.rime_voice_id:
-        os.environ["RIME_VOICE_ID"] = args.rime_voice_id
-    if args.enable_stt_mute_filter is not None:
-        os.environ["ENABLE_STT_MUTE_FILTER"] = str(args.enable_stt_mute_filter).lower()
-
-    # Instantiate the configuration AFTER setting environment variables
-    config = BotConfig()
-
-    # Determine the bot class to use based on the configuration
-    if config.bot_type == "flow":
-        from bots.flow import FlowBot
+    # CLI arguments override the environment's profile; the environment is not modified
+    overrides = {
+        name: getattr(args, name)
+        for name in (
+            "bot_type",
+            "bot_name",
+            "llm_provider",
+            "google_model",
+            "google_temperature",
+            "openai_model",
+            "openai_temperature",
+            "tts_provider",
+            "deepgram_voice",
+            "cartesia_voice",
+            "elevenlabs_voice_id",
+            "rime_voice_id",
+            "enable_stt_mute_filter",
+        )
+        if getattr(args, name) is not None
+    }
+    config = BotConfig(
+        BotProfile.from_env().replace(**overrides),
+        loop_policy=args.loop,
+        loop_monitor=args.loop_monitor,
+        loop_slow_callback_ms=args.slow_callback_ms,
+    )
+
+    # Channel to the server for readiness and lifecycle messages; takes over stdout
+    channel = open_channel()
+
+    # Import the runner's bot class and providers now, so warm workers and engines report ready
+    # with them loaded; calls with another profile import theirs on first use
+    from bots.providers import preload
+
+    load_bot_class(config.bot_type)
+    preload(config)
+    if config.endpoint_classifier == "local":
+        from bots.completeness import load_model
+
+        load_model(config.endpoint_model_file)
+
+    # Spans of the calls, exported if TRACES_FILE or OTEL_EXPORTER_OTLP_ENDPOINT is set
+    tracer = create_tracer(
+        "lead-qualifier-bot",
+        traces_file=config.traces_file,
+        otlp_endpoint=config.otlp_endpoint,
+        **{"process.pid": os.getpid()},
+    )
 
-        bot_class = FlowBot
-    else:
-        from bots.simple import SimpleBot
+    try:
+        if args.engine:
+            run_loop(run_engine(config, channel, tracer), config, channel)
+            return
 
-        bot_class = SimpleBot
+        room_url, token, traceparent, profile = (
+            args.room_url,
+            args.token,
+            args.traceparent,
+            args.profile,
+        )
+        if args.worker:
+            room_url, token, traceparent, profile = wait_for_assignment(channel)
 
-    asyncio.run(run_bot(bot_class, config, room_url=args.room_url, token=args.token))
+        call_config = configure_call(config, profile)
+        run_loop(
+            run_bot(
+                load_bot_class(call_config.bot_type),
+                call_config,
+                room_url=room_url,
+                token=token,
+                channel=channel,
+                tracer=tracer,
+                traceparent=traceparent,
+            ),
+            config,
+            channel,
+        )
+    finally:
+        tracer.shutdown()
 
 
 if __name__ == "__main__":
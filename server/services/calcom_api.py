@@ -5,8 +5,9 @@ This module provides a typed interface to the Cal.com API v2, handling:
 - Booking creation and management
 - Time slot formatting and timezone conversion
 
-The service is configured through environment variables and provides
-robust error handling and retry mechanisms for API operations.
+The service is configured through environment variables, which are checked
+when the client is created rather than on import, and provides robust error
+handling and retry mechanisms for API operations.
 """
 
 import os
@@ -18,9 +19,6 @@ from dotenv import load_dotenv
 from loguru import logger
 from zoneinfo import ZoneInfo
 
-# Load environment variables
-load_dotenv()
-
 # Environment validation
 required_env_vars = [
     "CALCOM_API_KEY",
@@ -30,19 +28,24 @@ required_env_vars = [
     "CALCOM_EVENT_SLUG",
 ]
 
-for var in required_env_vars:
-    if not os.getenv(var):
-        raise ValueError(f"{var} is required")
-
 
 # Configuration
 class Config:
     BASE_URL = "https://api.cal.com/v2"
-    API_KEY = os.getenv("CALCOM_API_KEY")
-    EVENT_TYPE_ID = int(os.getenv("CALCOM_EVENT_TYPE_ID", "0"))
-    EVENT_DURATION = int(os.getenv("CALCOM_EVENT_DURATION", "0"))
-    USERNAME = os.getenv("CALCOM_USERNAME")
-    EVENT_SLUG = os.getenv("CALCOM_EVENT_SLUG")
+
+    def __init__(self):
+        # Load environment variables
+        load_dotenv()
+
+        for var in required_env_vars:
+            if not os.getenv(var):
+                raise ValueError(f"{var} is required")
+
+        self.API_KEY = os.getenv("CALCOM_API_KEY")
+        self.EVENT_TYPE_ID = int(os.getenv("CALCOM_EVENT_TYPE_ID", "0"))
+        self.EVENT_DURATION = int(os.getenv("CALCOM_EVENT_DURATION", "0"))
+        self.USERNAME = os.getenv("CALCOM_USERNAME")
+        self.EVENT_SLUG = os.getenv("CALCOM_EVENT_SLUG")
 
 
 # Type definitions
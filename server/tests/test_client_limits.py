@@ -0,0 +1,58 @@
+from utils.client_limits import BucketSet, ClientRateLimiter
+
+
+def test_burst_then_rate():
+    buckets = BucketSet(rate=2.0, burst=3, max_clients=10)
+    assert [buckets.take("1.2.3.4", 0.0) for _ in range(3)] == [None, None, None]
+    assert buckets.take("1.2.3.4", 0.0) == 0.5
+    # Half a second refills one token
+    assert buckets.take("1.2.3.4", 0.5) is None
+    assert buckets.take("1.2.3.4", 0.5) == 0.5
+
+
+def test_clients_have_their_own_buckets():
+    buckets = BucketSet(rate=1.0, burst=1, max_clients=10)
+    assert buckets.take("a", 0.0) is None
+    assert buckets.take("a", 0.0) is not None
+    assert buckets.take("b", 0.0) is None
+
+
+def test_idle_buckets_are_dropped():
+    buckets = BucketSet(rate=1.0, burst=2, max_clients=10)
+    buckets.take("a", 0.0)
+    buckets.take("b", 1.0)
+    assert len(buckets) == 2
+    # "a" has been idle for the 2 s it takes to refill, "b" not yet
+    buckets.take("c", 2.5)
+    assert len(buckets) == 2
+
+
+def test_least_recently_used_bucket_is_evicted():
+    buckets = BucketSet(rate=0.001, burst=1, max_clients=2)
+    buckets.take("a", 0.0)
+    buckets.take("b", 0.0)
+    buckets.take("a", 0.0)  # "a" is now the most recently used
+    buckets.take("c", 0.0)
+    assert len(buckets) == 2
+    # "a" is still empty, while "b" was evicted and starts with a full bucket again
+    assert buckets.take("a", 0.0) is not None
+    assert buckets.take("b", 0.0) is None
+
+
+def test_known_api_keys_are_limited_per_key():
+    limiter = ClientRateLimiter(rate=0.001, burst=1, api_keys=["key"], key_rate=0.001, key_burst=2)
+    assert limiter.check("1.2.3.4", None) is None
+    assert limiter.check("1.2.3.4", None) is not None
+    # The key has its own bucket, whatever the client address
+    assert limiter.check("1.2.3.4", "key") is None
+    assert limiter.check("5.6.7.8", "key") is None
+    assert limiter.check("5.6.7.8", "key") is not None
+    # Unknown keys fall back to the address
+    assert limiter.check("1.2.3.4", "other") is not None
+    assert limiter.rejected == 3
+
+
+def test_disabled_by_default_rate():
+    limiter = ClientRateLimiter(rate=0, burst=5)
+    assert not limiter.enabled
+    assert all(limiter.check("1.2.3.4", None) is None for _ in range(100))
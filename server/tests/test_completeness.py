@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from bots.completeness import (
+    CompletenessModel,
+    Example,
+    decide,
+    ends_open,
+    instruction_examples,
+    logged_examples,
+    tokenize,
+)
+
+
+def test_tokenize_folds_numbers_and_fillers():
+    assert tokenize("Umm, it's $1,200 or 3k?") == ["<filler>", "it's", "<num>", "or", "<num>"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "My name is",
+        "I'd like to book it for",
+        "My number is 555 123",
+        "Call me at 12",
+        "It's four one five",
+        "My email is john dot",
+        "john underscore",
+        "It costs around",
+    ],
+)
+def test_ends_open(text):
+    assert ends_open(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "My name is John",
+        "That's all.",
+        "I am.",
+        "Call me at 12.",
+        "My email is john dot smith at example dot com",
+    ],
+)
+def test_does_not_end_open(text):
+    assert not ends_open(text)
+
+
+def test_decide():
+    assert decide(0.99, 0.9, "My name is John") is True
+    assert decide(0.05, 0.9, "My name is") is False
+    assert decide(0.5, 0.9, "My name is John") is None
+    # A confident YES on an open ending is left to the LLM
+    assert decide(0.99, 0.9, "My name is") is None
+    assert decide(0.99, 0.9, "It's four one five") is None
+
+
+def test_model_learns_and_round_trips(tmp_path):
+    examples = [
+        Example("I'd like a demo", "", True),
+        Example("Yes please", "", True),
+        Example("My budget is ten thousand dollars", "", True),
+        Example("I'd like a", "", False),
+        Example("Yes but", "", False),
+        Example("My budget is", "", False),
+    ]
+    model = CompletenessModel.train(examples)
+    assert model.probability("I'd like a demo") > 0.5 > model.probability("I'd like a")
+    path = tmp_path / "model.json"
+    model.save(str(path))
+    loaded = CompletenessModel.from_dict(json.loads(path.read_text()))
+    assert loaded.probability("Yes but") == model.probability("Yes but")
+
+
+def test_examples_from_instruction_and_logs(tmp_path):
+    instruction = "\n".join(
+        [
+            "Assistant: What is your name?",
+            "- User: My name is → Output: NO",
+            "- User: My name is Ann → Output: YES",
+        ]
+    )
+    assert instruction_examples(instruction) == [
+        Example("My name is", "What is your name?", False),
+        Example("My name is Ann", "What is your name?", True),
+    ]
+    log = tmp_path / "endpointing.jsonl"
+    log.write_text(json.dumps({"user": "Sure", "complete": True}) + "\n\n")
+    assert logged_examples(str(log)) == [Example("Sure", "", True)]
+
+
+def test_classifier_instruction_has_examples_of_both_kinds():
+    labels = {example.complete for example in instruction_examples()}
+    assert labels == {True, False}
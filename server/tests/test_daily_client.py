@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+from utils.daily_client import (
+    PRIORITY_CLEANUP,
+    PRIORITY_CONNECT,
+    PRIORITY_POOL,
+    RateLimiter,
+    parse_retry_after,
+)
+
+
+def test_requests_within_burst_do_not_wait():
+    async def run():
+        limiter = RateLimiter(rate=1, burst=3, max_in_flight=10)
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire(PRIORITY_CLEANUP)
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) < 0.05
+
+
+def test_waiters_are_granted_by_priority():
+    async def run():
+        limiter = RateLimiter(rate=1000, burst=1, max_in_flight=1)
+        await limiter.acquire(PRIORITY_CLEANUP)
+        order = []
+
+        async def request(name, priority):
+            await limiter.acquire(priority)
+            order.append(name)
+            limiter.release()
+
+        tasks = [
+            asyncio.create_task(request("cleanup", PRIORITY_CLEANUP)),
+            asyncio.create_task(request("pool", PRIORITY_POOL)),
+            asyncio.create_task(request("connect", PRIORITY_CONNECT)),
+        ]
+        await asyncio.sleep(0.01)
+        assert limiter.snapshot()["queued"] == {"connect": 1, "pool": 1, "cleanup": 1}
+        limiter.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()) == ["connect", "pool", "cleanup"]
+
+
+def test_in_flight_bound():
+    async def run():
+        limiter = RateLimiter(rate=1000, burst=10, max_in_flight=2)
+        await limiter.acquire(PRIORITY_CONNECT)
+        await limiter.acquire(PRIORITY_CONNECT)
+        third = asyncio.create_task(limiter.acquire(PRIORITY_CONNECT))
+        await asyncio.sleep(0.02)
+        blocked = not third.done()
+        limiter.release()
+        await asyncio.wait_for(third, 1)
+        return blocked, limiter.snapshot()["in_flight"]
+
+    assert asyncio.run(run()) == (True, 2)
+
+
+def test_pause_holds_every_request():
+    async def run():
+        limiter = RateLimiter(rate=1000, burst=10, max_in_flight=10)
+        limiter.pause(0.2)
+        start = time.monotonic()
+        await limiter.acquire(PRIORITY_CONNECT)
+        return time.monotonic() - start, limiter.snapshot()["throttled"]
+
+    waited, throttled = asyncio.run(run())
+    assert waited >= 0.19
+    assert throttled == 1
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def run():
+        limiter = RateLimiter(rate=1000, burst=1, max_in_flight=1)
+        await limiter.acquire(PRIORITY_CONNECT)
+        cancelled = asyncio.create_task(limiter.acquire(PRIORITY_CONNECT))
+        waiting = asyncio.create_task(limiter.acquire(PRIORITY_POOL))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        limiter.release()
+        await asyncio.wait_for(waiting, 1)
+        return limiter.snapshot()["in_flight"]
+
+    assert asyncio.run(run()) == 1
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from utils.dispatcher import Dispatcher
+
+
+def report(**fields):
+    return {
+        "agent_id": "agent-1",
+        "url": "http://agent-1:7861",
+        "max_bots": 4,
+        "free": 4,
+        "active": 0,
+        **fields,
+    }
+
+
+async def settle():
+    """Let the exit handlers the dispatcher scheduled run."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def make_dispatcher(**kwargs):
+    exits = []
+
+    async def on_exit(agent_id, pid, exit_code):
+        exits.append((agent_id, pid, exit_code))
+
+    return Dispatcher(on_exit, **kwargs), exits
+
+
+def test_registers_agents_and_applies_capacity():
+    async def run():
+        dispatcher, _ = make_dispatcher()
+        dispatcher.report(report(free=3, active=1))
+        return dispatcher.agents()
+
+    (agent,) = asyncio.run(run())
+    assert agent["agent_id"] == "agent-1"
+    assert agent["up"] and agent["free"] == 3 and agent["active"] == 1
+
+
+def test_reported_exits_are_handled_once_and_acked():
+    async def run():
+        dispatcher, exits = make_dispatcher()
+        dispatcher.report(report())
+        dispatcher._agents["agent-1"].bots[10] = time.monotonic()
+        acked = dispatcher.report(report(running=[10], exits=[{"pid": 10, "exit_code": 0}]))
+        await settle()
+        # The agent resends an exit until it is acked; a resend is acked but not handled again
+        again = dispatcher.report(report(exits=[{"pid": 10, "exit_code": 0}]))
+        await settle()
+        return acked, again, exits
+
+    acked, again, exits = asyncio.run(run())
+    assert acked == [10]
+    assert again == [10]
+    assert exits == [("agent-1", 10, 0)]
+
+
+def test_bots_missing_from_reports_are_lost_after_settling():
+    async def run():
+        dispatcher, exits = make_dispatcher(report_timeout=0.05)
+        dispatcher.report(report())
+        bots = dispatcher._agents["agent-1"].bots
+        bots[10] = time.monotonic() - 1  # Placed long ago
+        bots[11] = time.monotonic()  # Just placed, may not be in the agent's report yet
+        dispatcher.report(report(running=[]))
+        await settle()
+        return exits, set(bots)
+
+    exits, placed = asyncio.run(run())
+    assert exits == [("agent-1", 10, None)]
+    assert placed == {11}
+
+
+def test_events_of_placed_bots_are_forwarded():
+    async def run():
+        events = []
+        dispatcher = Dispatcher(
+            lambda *args: asyncio.sleep(0), on_event=lambda *args: events.append(args)
+        )
+        dispatcher.report(report())
+        dispatcher._agents["agent-1"].bots[10] = time.monotonic()
+        message = {"pid": 10, "type": "joined_room"}
+        dispatcher.report(report(running=[10], events=[message, {"pid": 99, "type": "x"}]))
+        return events
+
+    assert asyncio.run(run()) == [("agent-1", 10, {"pid": 10, "type": "joined_room"})]
+
+
+@pytest.mark.parametrize(
+    "bad",
+    [
+        [],
+        {"url": "http://agent-1:7861", "max_bots": 4, "free": 4, "active": 0},
+        report(free="4"),
+        report(exits=[{"exit_code": 0}]),
+        report(exits=[{"pid": 10, "exit_code": "0"}]),
+        report(events=[{"type": "joined_room"}]),
+        report(running=["10"]),
+    ],
+)
+def test_malformed_reports_are_rejected_without_applying_them(bad):
+    async def run():
+        dispatcher, _ = make_dispatcher()
+        with pytest.raises(ValueError):
+            dispatcher.report(bad)
+        return dispatcher.agents()
+
+    assert asyncio.run(run()) == []
+
+
+def test_bots_of_an_agent_that_stays_down_are_lost():
+    async def run():
+        dispatcher, exits = make_dispatcher(report_timeout=0.05, down_grace=0.1)
+        dispatcher.report(report(url="http://127.0.0.1:1"))
+        dispatcher._agents["agent-1"].bots[10] = time.monotonic()
+        # Reports stop and the health check cannot reach the agent
+        async with aiohttp.ClientSession() as session:
+            dispatcher.start(session)
+            await asyncio.sleep(0.5)
+            await dispatcher.stop()
+        return exits, dispatcher.agents()
+
+    exits, (agent,) = asyncio.run(run())
+    assert exits == [("agent-1", 10, None)]
+    assert not agent["up"] and agent["placed"] == 0
@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import pytest
+
+from utils.ledger import GC_BACKOFF_BASE_SECS, GC_CLAIM_SECS, Ledger, RoomGarbageCollector
+from utils.registry import BotRecord
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "ledger.db")
+
+
+def rooms(ledger):
+    rows = ledger._execute("SELECT url, state, attempts, next_attempt_at FROM rooms ORDER BY url")
+    return {row["url"]: dict(row) for row in rows}
+
+
+def kill(ledger):
+    """Make an instance look dead: its heartbeat stopped long ago."""
+    ledger._execute("UPDATE instances SET heartbeat_at = 0 WHERE instance = ?", (ledger.instance,))
+
+
+def test_reconcile_takes_over_what_a_dead_instance_left(path):
+    dead, live = Ledger(path), Ledger(path)
+    dead.register()
+    live.register()
+    dead.bot_started(BotRecord(bot_id=1, pid=1, room_url="room-a"))
+    dead.room_created("room-a")
+    live.bot_started(BotRecord(bot_id=2, pid=2, room_url="room-b"))
+    live.room_created("room-b")
+    kill(dead)
+
+    # PID 1 is not a bot runner, so nothing is left to stop
+    assert live.reconcile("runner.py") == []
+    assert live.get_bot(1)["status"] == "lost"
+    assert live.get_bot(2)["status"] == "running"
+    assert {url: room["state"] for url, room in rooms(live).items()} == {
+        "room-a": "orphaned",
+        "room-b": "active",
+    }
+    assert live.instances()["workers"] == 1
+    assert live.active_count() == 1
+
+
+def test_reconcile_drops_finished_bots_past_retention(path):
+    ledger = Ledger(path)
+    ledger.register()
+    record = BotRecord(bot_id=1, pid=1, room_url="room", state="finished", ended_at=1.0)
+    ledger.bot_started(record)
+    ledger.bot_finished(record)
+    ledger.reconcile("runner.py")
+    assert ledger.get_bot(1) is None
+
+
+def test_other_instances_bots_are_counted_apart(path):
+    first, second = Ledger(path), Ledger(path)
+    first.register()
+    second.register()
+    first.bot_started(BotRecord(bot_id=1, pid=1, room_url="room"))
+    second.bot_started(BotRecord(bot_id=2, pid=2, room_url="room"))
+    second.bot_started(BotRecord(bot_id=3, pid=3, room_url="room"))
+    first.refresh_others()
+    assert first.others_active == 2
+    assert first.count_in_room("room") == 3
+
+
+def test_orphaned_rooms_are_claimed(path):
+    first, second = Ledger(path), Ledger(path)
+    for url in ("room-a", "room-b", "room-c"):
+        first.room_orphaned(url)
+    claimed = first.orphaned_rooms(2)
+    assert len(claimed) == 2
+    # Another worker's collector only gets the rest
+    assert second.orphaned_rooms(5) == sorted({"room-a", "room-b", "room-c"} - set(claimed))
+    assert first.orphaned_rooms(5) == []
+    claim = rooms(first)[claimed[0]]["next_attempt_at"]
+    assert claim == pytest.approx(time.time() + GC_CLAIM_SECS, abs=5)
+
+
+def test_failed_deletions_back_off(path):
+    ledger = Ledger(path)
+    ledger.room_orphaned("room")
+    ledger.room_delete_failed("room")
+    ledger.room_delete_failed("room")
+    room = rooms(ledger)["room"]
+    assert room["attempts"] == 2
+    assert room["next_attempt_at"] == pytest.approx(time.time() + 2 * GC_BACKOFF_BASE_SECS, abs=5)
+
+
+def test_garbage_collector_deletes_orphaned_rooms_and_retries_failures(path):
+    ledger = Ledger(path)
+    ledger.room_created("room-active")
+    ledger.room_orphaned("room-ok")
+    ledger.room_orphaned("room-fails")
+    deleted = []
+
+    async def delete(url):
+        if url == "room-fails":
+            raise RuntimeError("Daily API error")
+        deleted.append(url)
+
+    async def run():
+        collector = RoomGarbageCollector(ledger, delete, batch_size=5, interval=0.01)
+        collector.start()
+        await asyncio.sleep(0.3)
+        await collector.stop()
+        return await ledger.run(rooms, ledger)
+
+    left = asyncio.run(run())
+    ledger.close()
+    assert deleted == ["room-ok"]
+    assert set(left) == {"room-active", "room-fails"}
+    assert left["room-active"]["state"] == "active"
+    assert left["room-fails"]["attempts"] == 1
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from pipecat.transports.services.helpers.daily_rest import (
+    DailyMeetingTokenParams,
+    DailyMeetingTokenProperties,
+)
+
+from utils.meeting_tokens import (
+    LocalTokenDailyRESTHelper,
+    decode_meeting_token,
+    sign_meeting_token,
+)
+
+API_KEY = "test-key"
+ROOM_URL = "https://example.daily.co/room-1"
+
+
+def make_tokens(calls):
+    """Run `calls(helper)` against a helper that never needs the REST API."""
+
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            helper = LocalTokenDailyRESTHelper(
+                daily_api_key=API_KEY, aiohttp_session=session, domain_id="domain-1"
+            )
+            return await calls(helper)
+
+    return asyncio.run(run())
+
+
+def test_sign_and_decode_round_trip():
+    claims = {"r": "room-1", "d": "domain-1", "exp": int(time.time()) + 60}
+    assert decode_meeting_token(API_KEY, sign_meeting_token(API_KEY, claims)) == claims
+
+
+def test_decode_rejects_wrong_key_and_tampering():
+    token = sign_meeting_token(API_KEY, {"r": "room-1"})
+    with pytest.raises(ValueError, match="signature"):
+        decode_meeting_token("other-key", token)
+    header, _, signature = token.split(".")
+    forged = sign_meeting_token(API_KEY, {"r": "room-2"}).split(".")[1]
+    with pytest.raises(ValueError, match="signature"):
+        decode_meeting_token(API_KEY, f"{header}.{forged}.{signature}")
+    with pytest.raises(ValueError, match="Malformed"):
+        decode_meeting_token(API_KEY, "not-a-token")
+
+
+def test_decode_checks_expiry_and_not_before():
+    now = int(time.time())
+    with pytest.raises(ValueError, match="expired"):
+        decode_meeting_token(API_KEY, sign_meeting_token(API_KEY, {"exp": now - 1}))
+    with pytest.raises(ValueError, match="not yet valid"):
+        decode_meeting_token(API_KEY, sign_meeting_token(API_KEY, {"nbf": now + 60}))
+
+
+def test_token_claims():
+    async def calls(helper):
+        return await helper.get_token(ROOM_URL, expiry_time=600, owner=False)
+
+    before = int(time.time())
+    claims = decode_meeting_token(API_KEY, make_tokens(calls))
+    assert claims["r"] == "room-1"
+    assert claims["d"] == "domain-1"
+    assert claims["o"] is False
+    assert before + 600 <= claims["exp"] <= int(time.time()) + 600
+
+
+def test_tokens_are_cached_until_forgotten():
+    async def calls(helper):
+        first = await helper.get_token(ROOM_URL, expiry_time=600)
+        again = await helper.get_token(ROOM_URL, expiry_time=600)
+        # A longer lifetime than the cached token still covers needs a new token
+        longer = await helper.get_token(ROOM_URL, expiry_time=3600)
+        await asyncio.sleep(1.1)  # iat has one-second resolution
+        helper.forget_tokens(ROOM_URL)
+        fresh = await helper.get_token(ROOM_URL, expiry_time=3600)
+        return first, again, longer, fresh
+
+    first, again, longer, fresh = make_tokens(calls)
+    assert again == first
+    assert longer != first
+    assert fresh != longer
+
+
+def test_tokens_with_properties_are_not_cached():
+    params = DailyMeetingTokenParams(
+        properties=DailyMeetingTokenProperties(eject_at_token_exp=True)
+    )
+
+    async def calls(helper):
+        plain = await helper.get_token(ROOM_URL, expiry_time=600)
+        ejecting = await helper.get_token(ROOM_URL, expiry_time=600, params=params)
+        return plain, ejecting, await helper.get_token(ROOM_URL, expiry_time=600)
+
+    plain, ejecting, cached = make_tokens(calls)
+    assert decode_meeting_token(API_KEY, ejecting)["ejt"] is True
+    assert ejecting != plain
+    assert cached == plain
@@ -0,0 +1,60 @@
+from utils.registry import SYNTHETIC_BOT_ID_BASE, BotRegistry
+
+
+def test_rooms_and_states_are_indexed():
+    registry = BotRegistry()
+    registry.add(101, "room-a")
+    registry.add(102, "room-a")
+    registry.add(103, "room-b")
+    assert registry.count_in_room("room-a") == 2
+    assert registry.bots_per_room() == {"room-a": 2, "room-b": 1}
+    assert registry.active_count == 3
+
+    registry.finish(101, 0)
+    registry.finish(103, 1)
+    assert registry.count_in_room("room-a") == 1
+    assert registry.count_in_room("room-b") == 0
+    assert registry.bots_per_room() == {"room-a": 1}
+    summary = registry.summary()
+    assert summary["states"] == {"running": 1, "finished": 1, "failed": 1}
+    assert summary["counters"] == {"spawned": 3, "finished": 1, "failed": 1}
+    assert summary["rooms"] == 1
+
+
+def test_finish_is_idempotent_and_ignores_unknown_bots():
+    registry = BotRegistry()
+    registry.add(101, "room-a")
+    assert registry.finish(101, 0).state == "finished"
+    assert registry.finish(101, 0) is None
+    assert registry.finish(999, 0) is None
+    assert registry.summary()["counters"]["finished"] == 1
+
+
+def test_history_is_bounded_and_most_recent_first():
+    registry = BotRegistry(history_size=2)
+    for pid in (1, 2, 3):
+        registry.add(pid, "room")
+        registry.finish(pid, 0)
+    assert [record.bot_id for record in registry.recent_exits()] == [3, 2]
+    assert registry.get(1) is None
+    assert registry.summary()["states"]["finished"] == 2
+
+
+def test_reused_pid_replaces_the_finished_record():
+    registry = BotRegistry()
+    registry.add(101, "room-a")
+    registry.finish(101, 1)
+    record = registry.add(101, "room-b")
+    assert registry.get(101) is record
+    assert registry.recent_exits() == []
+    assert registry.summary()["states"] == {"running": 1, "finished": 0, "failed": 0}
+
+
+def test_synthetic_ids_of_workers_are_disjoint():
+    first, second = BotRegistry(id_block=100), BotRegistry(id_block=101)
+    first_ids = {first.next_bot_id() for _ in range(3)}
+    assert min(first_ids) > SYNTHETIC_BOT_ID_BASE
+    assert max(first_ids) < second.next_bot_id()
+    record = first.add(555, "room", bot_id=min(first_ids), host="agent-1")
+    assert record.pid == 555
+    assert first.count_in_room("room") == 1
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from utils.tracing import KIND_SERVER, FileExporter, Tracer, parse_traceparent
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+SPAN_ID = "00f067aa0ba902b7"
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        f"00-{TRACE_ID}-{SPAN_ID}-01",
+        f"00-{TRACE_ID.upper()}-{SPAN_ID}-00",
+        f"  00-{TRACE_ID}-{SPAN_ID}-01  ",
+        # Later versions may append fields
+        f"01-{TRACE_ID}-{SPAN_ID}-01-extra",
+    ],
+)
+def test_valid_traceparents(value):
+    assert parse_traceparent(value) == (TRACE_ID, SPAN_ID)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        "",
+        "garbage",
+        f"ff-{TRACE_ID}-{SPAN_ID}-01",
+        f"0-{TRACE_ID}-{SPAN_ID}-01",
+        f"00-{TRACE_ID[:-1]}-{SPAN_ID}-01",
+        f"00-{TRACE_ID}-{SPAN_ID}0-01",
+        f"00-{'0' * 32}-{SPAN_ID}-01",
+        f"00-{TRACE_ID}-{'0' * 16}-01",
+        f"00-{'g' * 32}-{SPAN_ID}-01",
+        f"00-+{TRACE_ID[1:]}-{SPAN_ID}-01",
+        f"00-{TRACE_ID}-{SPAN_ID}",
+    ],
+)
+def test_invalid_traceparents(value):
+    assert parse_traceparent(value) is None
+
+
+def test_spans_continue_the_parent_trace():
+    tracer = Tracer("test")
+    parent = tracer.start_span("connect", f"00-{TRACE_ID}-{SPAN_ID}-01", KIND_SERVER)
+    assert (parent.trace_id, parent.parent_span_id) == (TRACE_ID, SPAN_ID)
+    with tracer.span("room") as child:
+        pass
+    # Without a current span, a new trace starts
+    assert child.trace_id != TRACE_ID and child.parent_span_id is None
+    with tracer.span("outer") as outer:
+        with tracer.span("inner") as inner:
+            pass
+    assert (inner.trace_id, inner.parent_span_id) == (outer.trace_id, outer.span_id)
+
+
+def test_failed_spans_are_exported_with_an_error_status(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer("test", [FileExporter(str(path))])
+    with pytest.raises(RuntimeError):
+        with tracer.span("spawn"):
+            raise RuntimeError("no runner")
+    tracer.shutdown()
+    (line,) = path.read_text().splitlines()
+    (span,) = json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert span["name"] == "spawn"
+    assert span["status"] == {"code": 2, "message": "RuntimeError: no runner"}
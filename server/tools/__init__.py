@@ -0,0 +1,6 @@
+"""Development tools package.
+
+This package contains local stand-ins and benchmarks used to exercise the
+server without external services:
+- Daily REST API stand-in
+"""
@@ -0,0 +1,350 @@
+"""Load generator and latency benchmark for the connect path.
+
+Starts the Daily REST API stand-in (`tools.daily_stub`) and the server with
+the stub runner (`tools.stub_runner`) in place of real bots, then sends
+connects to `POST /connect` and/or `GET /` at a given average arrival rate.
+For every connect it records the time to the HTTP response and the time until
+the bot reported `joined_room` on the server's `/events` stream, and reports
+both as percentiles together with failure rates. The numbers cover room
+creation, token minting, bot start and join, so regressions in the server's
+startup cost show up run against run.
+
+Server settings such as WARM_WORKERS, BOT_ENGINES or ROOM_POOL_SIZE are taken
+from the environment. Admission limits are lifted unless set there, since stub
+bots cost next to nothing.
+
+Usage:
+    python -m tools.connect_bench --rate 5 --requests 200
+    WARM_WORKERS=4 python -m tools.connect_bench --rate 10 --endpoint mixed
+    python -m tools.connect_bench --server-url http://127.0.0.1:7860  # running server
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+API_KEY = "bench-key"
+PLACEHOLDER_KEYS = ("DEEPGRAM_API_KEY", "OPENAI_API_KEY", "GOOGLE_API_KEY")
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    response_secs: Optional[float] = None
+    ready_secs: Optional[float] = None
+    failure: Optional[str] = None
+
+
+class EventWatcher:
+    """Follows the server's /events stream to tell when each bot joined its room."""
+
+    def __init__(self):
+        self.connected = asyncio.Event()
+        self._bots_by_room: Dict[str, asyncio.Future] = {}
+        self._ready: Dict[int, asyncio.Future] = {}
+
+    async def run(self, session: aiohttp.ClientSession, server_url: str) -> None:
+        async with session.get(
+            f"{server_url}/events", timeout=aiohttp.ClientTimeout(total=None)
+        ) as r:
+            r.raise_for_status()
+            self.connected.set()
+            async for line in r.content:
+                if line.startswith(b"data: "):
+                    self._handle(json.loads(line[6:]))
+
+    async def bot_for_room(self, room_url: str) -> int:
+        return await self._future(self._bots_by_room, room_url)
+
+    async def ready_at(self, bot_id: int) -> Optional[float]:
+        """Monotonic time the bot joined its room, or None if it exited first."""
+        return await self._future(self._ready, bot_id)
+
+    def _handle(self, message: Dict[str, Any]) -> None:
+        match message["event"]:
+            case "spawned":
+                self._resolve(self._bots_by_room, message["room_url"], message["bot_id"])
+            case "joined_room":
+                self._resolve(self._ready, message["bot_id"], time.monotonic())
+            case "finished":
+                self._resolve(self._ready, message["bot_id"], None)
+
+    def _future(self, table: Dict[Any, asyncio.Future], key: Any) -> asyncio.Future:
+        if key not in table:
+            table[key] = asyncio.get_running_loop().create_future()
+        return table[key]
+
+    def _resolve(self, table: Dict[Any, asyncio.Future], key: Any, value: Any) -> None:
+        future = self._future(table, key)
+        if not future.done():
+            future.set_result(value)
+
+
+async def connect(
+    session: aiohttp.ClientSession,
+    server_url: str,
+    endpoint: str,
+    watcher: EventWatcher,
+    ready_timeout: float,
+) -> Sample:
+    """Send one connect and wait for its bot to join the room."""
+    sample = Sample(endpoint)
+    start = time.monotonic()
+    try:
+        if endpoint == "connect":
+            async with session.post(f"{server_url}/connect") as r:
+                status = r.status
+                bot_id = (await r.json())["bot_pid"] if status == 200 else None
+        else:
+            async with session.get(f"{server_url}/", allow_redirects=False) as r:
+                status = r.status
+                room_url = r.headers.get("Location")
+            bot_id = None
+            if status in (302, 307) and room_url:
+                bot_id = await asyncio.wait_for(watcher.bot_for_room(room_url), ready_timeout)
+    except asyncio.TimeoutError:
+        sample.failure = "timeout"
+        return sample
+    except aiohttp.ClientError as e:
+        sample.failure = type(e).__name__
+        return sample
+    sample.response_secs = time.monotonic() - start
+
+    if bot_id is None:
+        sample.failure = f"http_{status}"
+        return sample
+    try:
+        ready = await asyncio.wait_for(watcher.ready_at(bot_id), ready_timeout)
+    except asyncio.TimeoutError:
+        sample.failure = "ready_timeout"
+        return sample
+    if ready is None:
+        sample.failure = "exited_before_ready"
+    else:
+        sample.ready_secs = ready - start
+    return sample
+
+
+async def generate_load(
+    session: aiohttp.ClientSession, server_url: str, watcher: EventWatcher, args
+) -> Tuple[List[Sample], float]:
+    """Send the connects and wait for all of them to complete.
+
+    Returns:
+        The samples and the number of seconds it took to send the connects.
+    """
+    started = time.monotonic()
+    rng = random.Random(args.seed)
+    endpoints = ["connect", "root"] if args.endpoint == "mixed" else [args.endpoint]
+    tasks = []
+    for i in range(args.requests):
+        endpoint = endpoints[i % len(endpoints)]
+        tasks.append(
+            asyncio.create_task(connect(session, server_url, endpoint, watcher, args.ready_timeout))
+        )
+        gap = rng.expovariate(args.rate) if args.arrival == "poisson" else 1 / args.rate
+        await asyncio.sleep(gap)
+    sent_secs = time.monotonic() - started
+    return await asyncio.gather(*tasks), sent_secs
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def report(samples: List[Sample], sent_secs: float) -> None:
+    print(
+        f"\n{len(samples)} connects sent in {sent_secs:.1f}s ({len(samples) / sent_secs:.2f}/s)\n"
+    )
+    print(
+        f"{'endpoint':<9} {'sent':>5} {'failed':>7} {'fail %':>7} {'metric':<9} "
+        f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    )
+    for endpoint in sorted({s.endpoint for s in samples}):
+        group = [s for s in samples if s.endpoint == endpoint]
+        failed = sum(1 for s in group if s.failure)
+        prefix = f"{endpoint:<9} {len(group):>5} {failed:>7} {100 * failed / len(group):>6.1f}%"
+        for metric, values in (
+            ("response", [s.response_secs for s in group if s.response_secs is not None]),
+            ("ready", [s.ready_secs for s in group if s.ready_secs is not None]),
+        ):
+            stats = " ".join(
+                f"{1000 * percentile(values, p):>8.1f}" if values else f"{'-':>8}"
+                for p in (50, 90, 99, 100)
+            )
+            print(f"{prefix} {metric:<9} {stats}")
+            prefix = " " * len(prefix)
+
+    failures = Counter(s.failure for s in samples if s.failure)
+    if failures:
+        print("\nFailures: " + ", ".join(f"{reason} {n}" for reason, n in failures.most_common()))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_process(args: List[str], env: Dict[str, str], log: Optional[str]) -> subprocess.Popen:
+    output = open(log, "a") if log else subprocess.DEVNULL
+    return subprocess.Popen(
+        [sys.executable, *args],
+        cwd=SERVER_DIR,
+        env=env,
+        stdout=output,
+        stderr=output,
+    )
+
+
+async def wait_until_up(session: aiohttp.ClientSession, url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(url, headers={"Authorization": f"Bearer {API_KEY}"}) as r:
+                if r.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+async def stop_process(proc: Optional[subprocess.Popen]) -> None:
+    if proc and proc.poll() is None:
+        proc.terminate()
+        await asyncio.to_thread(proc.wait)
+
+
+async def start_stack(session: aiohttp.ClientSession, args) -> Dict[str, Any]:
+    """Start the Daily stub and a server using it with the stub runner."""
+    daily_port, server_port = free_port(), free_port()
+    daily_url = f"http://127.0.0.1:{daily_port}"
+    env = {
+        **os.environ,
+        "DAILY_API_KEY": API_KEY,
+        "DAILY_API_URL": daily_url,
+        "BOT_RUNNER": "tools/stub_runner.py",
+        "STUB_STARTUP_SECS": str(args.startup_secs),
+        "STUB_CALL_SECS": str(args.call_secs),
+    }
+    env.setdefault("MAX_BOTS", "100000")
+    env.setdefault("MAX_CPU_UTILIZATION", "2")
+    # Every connect comes from the same address
+    env.setdefault("CONNECT_RATE_LIMIT", "0")
+    # Only the Daily stub is reachable; probing the real providers would only log failures
+    env.setdefault("HEALTH_PROBES", "daily")
+    for key in PLACEHOLDER_KEYS:
+        env.setdefault(key, "benchmark")
+
+    stack = {"daily_url": daily_url, "server_url": f"http://127.0.0.1:{server_port}"}
+    stack["daily"] = start_process(
+        ["-m", "tools.daily_stub", "--port", str(daily_port), "--api-key", API_KEY]
+        + ["--latency-ms", str(args.daily_latency_ms)]
+        + ["--rate-limit", str(args.daily_rate_limit)],
+        env,
+        args.log,
+    )
+    await wait_until_up(session, f"{daily_url}/")
+    stack["server"] = start_process(["main.py", "--port", str(server_port)], env, args.log)
+    await wait_until_up(session, f"{stack['server_url']}/status")
+    # Let warm workers, engines and the room pool fill up
+    await asyncio.sleep(args.warmup)
+    return stack
+
+
+async def run(args) -> None:
+    stack: Dict[str, Any] = {"server_url": args.server_url}
+    async with aiohttp.ClientSession() as session:
+        try:
+            if not args.server_url:
+                stack = await start_stack(session, args)
+            server_url = stack["server_url"]
+
+            watcher = EventWatcher()
+            events = asyncio.create_task(watcher.run(session, server_url))
+            await asyncio.wait_for(watcher.connected.wait(), 10)
+
+            print(
+                f"Sending {args.requests} connects to {args.endpoint} at {args.rate}/s "
+                f"({args.arrival} arrivals) against {server_url}"
+            )
+            samples, sent_secs = await generate_load(session, server_url, watcher, args)
+            events.cancel()
+            report(samples, sent_secs)
+        finally:
+            await stop_process(stack.get("server"))
+            if stack.get("daily"):
+                await report_leaked_rooms(session, stack["daily_url"])
+                await stop_process(stack["daily"])
+
+
+async def report_leaked_rooms(session: aiohttp.ClientSession, daily_url: str) -> None:
+    """Rooms left on the stub after the server shut down were never cleaned up."""
+    try:
+        async with session.get(
+            f"{daily_url}/rooms", headers={"Authorization": f"Bearer {API_KEY}"}
+        ) as r:
+            rooms = (await r.json())["total_count"]
+    except aiohttp.ClientError:
+        return
+    print(f"Rooms left after server shutdown: {rooms}")
+
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the connect path under load")
+    parser.add_argument("--rate", type=float, default=5.0, help="Connects per second")
+    parser.add_argument("--requests", type=int, default=100, help="Number of connects")
+    parser.add_argument(
+        "--endpoint",
+        choices=("connect", "root", "mixed"),
+        default="connect",
+        help="POST /connect, GET / or both alternately",
+    )
+    parser.add_argument(
+        "--arrival", choices=("poisson", "fixed"), default="poisson", help="Arrival process"
+    )
+    parser.add_argument(
+        "--ready-timeout", type=float, default=30.0, help="Max seconds until a bot joins"
+    )
+    parser.add_argument("--call-secs", type=float, default=2.0, help="Stub call duration")
+    parser.add_argument(
+        "--startup-secs", type=float, default=0.0, help="Simulated runner import time"
+    )
+    parser.add_argument(
+        "--daily-latency-ms", type=float, default=0.0, help="Latency added by the Daily stub"
+    )
+    parser.add_argument(
+        "--daily-rate-limit",
+        type=float,
+        default=0.0,
+        help="Writes per second the Daily stub allows before answering 429 (0: unlimited)",
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=2.0, help="Seconds to wait after the server is up"
+    )
+    parser.add_argument("--server-url", help="Benchmark a running server instead")
+    parser.add_argument("--log", help="Append stub and server logs to this file")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for arrivals")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,177 @@
+"""Local stand-in for the Daily REST API.
+
+Implements the subset of the API used by the server (domain config, rooms and
+meeting tokens) in memory, with optional artificial latency and an optional
+rate limit on writes that answers with 429 and Retry-After like Daily does. Meeting tokens,
+whether issued by `POST /meeting-tokens` or self-signed by the server, can be
+checked with `GET /meeting-tokens/{token}` just like against the real API.
+
+Usage:
+    python -m tools.daily_stub --port 9000 --api-key test-key
+
+Then point the server at it with DAILY_API_URL=http://127.0.0.1:9000 and
+DAILY_API_KEY=test-key.
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from aiohttp import web
+
+from utils.meeting_tokens import decode_meeting_token, sign_meeting_token
+
+
+def _error(status: int, info: str) -> web.Response:
+    return web.json_response({"error": "invalid-request-error", "info": info}, status=status)
+
+
+class DailyStub:
+    """In-memory Daily REST API.
+
+    Args:
+        api_key: API key clients must send as a bearer token, also used to sign tokens.
+        domain_name: Domain used to build room URLs.
+        latency: Artificial delay added to every request, in seconds.
+        rate_limit: Writes (POST and DELETE) allowed per second; 0 disables the limit.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        domain_name: str = "stub",
+        latency: float = 0.0,
+        rate_limit: float = 0.0,
+    ):
+        self.api_key = api_key
+        self.domain_name = domain_name
+        self.domain_id = str(uuid.uuid4())
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self._window = (0, 0)  # (second, writes in it)
+        self.rooms: Dict[str, Dict[str, Any]] = {}
+        self.request_counts: Dict[str, int] = {}
+        self._room_ids = itertools.count(1)
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.add_routes(
+            [
+                web.get("/", self.get_domain),
+                web.post("/rooms", self.create_room),
+                web.get("/rooms", self.list_rooms),
+                web.get("/rooms/{name}", self.get_room),
+                web.delete("/rooms/{name}", self.delete_room),
+                web.post("/meeting-tokens", self.create_token),
+                web.get("/meeting-tokens/{token}", self.validate_token),
+            ]
+        )
+        return app
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        route = f"{request.method} {request.match_info.route.resource.canonical}"
+        self.request_counts[route] = self.request_counts.get(route, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if request.headers.get("Authorization") != f"Bearer {self.api_key}":
+            return web.json_response({"error": "authentication-error"}, status=401)
+        if self.rate_limit and request.method in ("POST", "DELETE"):
+            second = int(time.time())
+            count = self._window[1] + 1 if self._window[0] == second else 1
+            self._window = (second, count)
+            if count > self.rate_limit:
+                self.request_counts["429"] = self.request_counts.get("429", 0) + 1
+                return web.json_response(
+                    {"error": "rate-limit-error"}, status=429, headers={"Retry-After": "1"}
+                )
+        return await handler(request)
+
+    async def get_domain(self, request: web.Request) -> web.Response:
+        return web.json_response({"domain_name": self.domain_name, "domain_id": self.domain_id})
+
+    async def create_room(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        name = body.get("name") or f"stub-room-{next(self._room_ids)}"
+        if name in self.rooms:
+            return _error(400, f"a room named {name} already exists")
+
+        room = {
+            "id": str(uuid.uuid4()),
+            "name": name,
+            "api_created": True,
+            "privacy": body.get("privacy", "public"),
+            "url": f"https://{self.domain_name}.daily.co/{name}",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "config": body.get("properties", {}),
+        }
+        self.rooms[name] = room
+        return web.json_response(room)
+
+    async def list_rooms(self, request: web.Request) -> web.Response:
+        rooms = list(self.rooms.values())
+        return web.json_response({"total_count": len(rooms), "data": rooms})
+
+    async def get_room(self, request: web.Request) -> web.Response:
+        room = self.rooms.get(request.match_info["name"])
+        if not room:
+            return web.json_response({"error": "not-found"}, status=404)
+        return web.json_response(room)
+
+    async def delete_room(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        if not self.rooms.pop(name, None):
+            return web.json_response({"error": "not-found"}, status=404)
+        return web.json_response({"deleted": True, "name": name})
+
+    async def create_token(self, request: web.Request) -> web.Response:
+        properties = (await request.json()).get("properties", {})
+        claims = {
+            "r": properties.get("room_name"),
+            "o": properties.get("is_owner", False),
+            "d": self.domain_id,
+            "iat": int(time.time()),
+        }
+        if "exp" in properties:
+            claims["exp"] = properties["exp"]
+        return web.json_response({"token": sign_meeting_token(self.api_key, claims)})
+
+    async def validate_token(self, request: web.Request) -> web.Response:
+        try:
+            claims = decode_meeting_token(self.api_key, request.match_info["token"])
+        except ValueError as e:
+            return _error(400, str(e))
+
+        if claims.get("d") != self.domain_id:
+            return _error(400, "token is for a different domain")
+        if claims.get("r") not in self.rooms:
+            return _error(400, f"room {claims.get('r')} does not exist")
+
+        return web.json_response(
+            {"room_name": claims["r"], "is_owner": claims.get("o", False), "exp": claims.get("exp")}
+        )
+
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(description="Local Daily REST API stand-in")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind host")
+    parser.add_argument("--port", type=int, default=9000, help="Bind port")
+    parser.add_argument("--api-key", default="test-key", help="Expected DAILY_API_KEY")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to requests")
+    parser.add_argument(
+        "--rate-limit", type=float, default=0.0, help="Writes allowed per second (0: unlimited)"
+    )
+    args = parser.parse_args()
+
+    stub = DailyStub(
+        api_key=args.api_key, latency=args.latency_ms / 1000, rate_limit=args.rate_limit
+    )
+    web.run_app(stub.create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,140 @@
+"""Accuracy and latency report for the local endpointing classifier.
+
+The local classifier decides a turn only when its probability clears the
+confidence threshold, so what matters is how many turns it decides (coverage),
+how often those decisions are right and, above all, how often it calls an
+incomplete turn complete: that cuts the user off. Accuracy is measured with
+leave-one-out cross-validation over the instruction examples and any logged
+statement LLM decisions (`ENDPOINT_LOG_FILE`), or on all of them for a saved
+`--model`. Latency compares the local prediction with the statement LLM's
+round trips recorded in the logs.
+
+Usage:
+    python -m tools.endpointing_report
+    python -m tools.endpointing_report --log endpointing.jsonl --save endpoint_model.json
+    python -m tools.endpointing_report --model endpoint_model.json --log endpointing.jsonl
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Callable, List, Optional, Sequence
+
+from bots.completeness import (
+    CompletenessModel,
+    Example,
+    decide,
+    instruction_examples,
+    load_model,
+    logged_examples,
+)
+
+THRESHOLDS = (0.6, 0.7, 0.8, 0.9, 0.95)
+
+
+def leave_one_out(examples: Sequence[Example]) -> List[float]:
+    """Probability of each example under a model trained on all the others."""
+    probabilities = []
+    for i, example in enumerate(examples):
+        model = CompletenessModel.train([e for j, e in enumerate(examples) if j != i])
+        probabilities.append(model.probability(example.user, example.assistant))
+    return probabilities
+
+
+def report_accuracy(
+    examples: Sequence[Example], probabilities: Sequence[float], thresholds: Sequence[float]
+) -> None:
+    print(f"{'confidence':>10} {'decided':>9} {'accuracy':>9} {'false complete':>15}")
+    for threshold in thresholds:
+        decided = correct = false_complete = 0
+        for example, probability in zip(examples, probabilities):
+            complete = decide(probability, threshold, example.user)
+            if complete is None:
+                continue
+            decided += 1
+            correct += complete == example.complete
+            false_complete += complete and not example.complete
+        accuracy = f"{correct / decided:.1%}" if decided else "-"
+        print(
+            f"{threshold:>10.2f} {decided / len(examples):>9.1%} {accuracy:>9} {false_complete:>15}"
+        )
+
+
+def percentiles(values: Sequence[float]) -> str:
+    if len(values) < 2:
+        return "-"
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return f"p50 {cuts[49]:.1f}, p99 {cuts[98]:.1f}"
+
+
+def time_predictions(
+    predict: Callable[[str, str], float], examples: Sequence[Example], rounds: int
+) -> List[float]:
+    """Duration of each prediction in µs."""
+    durations = []
+    for _ in range(rounds):
+        for example in examples:
+            start = time.perf_counter()
+            predict(example.user, example.assistant)
+            durations.append((time.perf_counter() - start) * 1e6)
+    return durations
+
+
+def llm_latencies(paths: Sequence[str]) -> List[float]:
+    """Statement LLM round trips in ms recorded in the decision logs."""
+    latencies = []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                if line.strip() and "llm_ms" in (entry := json.loads(line)):
+                    latencies.append(float(entry["llm_ms"]))
+    return latencies
+
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(description="Report the endpointing classifier's accuracy")
+    parser.add_argument(
+        "--log", action="append", default=[], help="Statement LLM decision log (repeatable)"
+    )
+    parser.add_argument("--model", help="Evaluate this saved model instead of leave-one-out")
+    parser.add_argument("--save", help="Train on all examples and save the model here")
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        action="append",
+        help=f"Thresholds to report (default: {', '.join(map(str, THRESHOLDS))})",
+    )
+    parser.add_argument("--rounds", type=int, default=200, help="Timing rounds over the examples")
+    args = parser.parse_args()
+
+    examples = instruction_examples()
+    for path in args.log:
+        examples += logged_examples(path)
+    if not examples:
+        sys.exit("No examples")
+
+    model: Optional[CompletenessModel] = None
+    if args.model:
+        model = load_model(args.model)
+        print(f"{len(examples)} examples, model {args.model}\n")
+        probabilities = [model.probability(e.user, e.assistant) for e in examples]
+    else:
+        print(f"{len(examples)} examples, leave-one-out\n")
+        probabilities = leave_one_out(examples)
+    report_accuracy(examples, probabilities, args.confidence or THRESHOLDS)
+
+    if model is None or args.save:
+        model = CompletenessModel.train(examples)
+    if args.save:
+        model.save(args.save)
+        print(f"\nsaved the model trained on all examples to {args.save}")
+
+    durations = time_predictions(model.probability, examples, args.rounds)
+    print(f"\nlocal prediction µs: {percentiles(durations)}")
+    print(f"statement LLM ms:    {percentiles(llm_latencies(args.log))}")
+
+
+if __name__ == "__main__":
+    cli()
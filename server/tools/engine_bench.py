@@ -0,0 +1,128 @@
+"""Memory benchmark: process-per-call runners versus one engine process.
+
+Builds N fully initialised bots (services, Daily transport, pipeline, one VAD
+inference each) either as N separate processes, as `runner.py` does per call,
+or inside one process, as `runner.py --engine` does. It then reports the
+proportional set size (PSS) and the resulting calls per GB of RAM. Bots are
+not connected to a room, so the figures cover the fixed per-call cost, not
+media buffers of a live call.
+
+Usage:
+    python -m tools.engine_bench --calls 8
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from typing import List
+
+PLACEHOLDER_KEYS = ("DAILY_API_KEY", "DEEPGRAM_API_KEY", "OPENAI_API_KEY", "GOOGLE_API_KEY")
+
+
+def memory_mb(pid: int) -> float:
+    """PSS of a process in MB, falling back to RSS where smaps_rollup is unavailable."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError(f"Cannot read memory of process {pid}")
+
+
+async def hold(calls: int) -> None:
+    """Build `calls` bots in this process, report readiness and wait to be measured."""
+    for key in PLACEHOLDER_KEYS:
+        os.environ.setdefault(key, "benchmark")
+
+    from config.bot import BotConfig
+
+    config = BotConfig()
+    if config.bot_type == "flow":
+        from bots.flow import FlowBot as bot_class
+    else:
+        from bots.simple import SimpleBot as bot_class
+
+    bots = []
+    for i in range(calls):
+        bot = bot_class(config)
+        await bot.setup_transport(f"https://benchmark.daily.co/room-{i}", "token")
+        bot.create_pipeline(handle_sigint=False)
+        vad = bot.transport_params.vad_analyzer
+        vad.set_sample_rate(16000)
+        vad.voice_confidence(bytes(vad.num_frames_required() * 2))
+        bots.append(bot)
+
+    print("ready", flush=True)
+    await asyncio.sleep(3600)
+
+
+def start_holders(calls_per_process: List[int]) -> List[subprocess.Popen]:
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "tools.engine_bench", "--hold", str(calls)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        for calls in calls_per_process
+    ]
+    for proc in procs:
+        if proc.stdout.readline().strip() != "ready":
+            raise RuntimeError(f"Benchmark process {proc.pid} failed to build its bots")
+    return procs
+
+
+def measure(mode: str, calls_per_process: List[int]) -> None:
+    started = time.monotonic()
+    procs = start_holders(calls_per_process)
+    try:
+        time.sleep(1)
+        total_mb = sum(memory_mb(proc.pid) for proc in procs)
+    finally:
+        for proc in procs:
+            proc.kill()
+            proc.wait()
+
+    calls = sum(calls_per_process)
+    print(
+        f"{mode:<8} {len(procs):>9} {calls:>6} {total_mb:>10.1f} {total_mb / calls:>10.1f} "
+        f"{calls * 1024 / total_mb:>10.1f} {time.monotonic() - started:>8.1f}"
+    )
+
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(description="Compare calls per GB: processes vs engine")
+    parser.add_argument("--calls", type=int, default=8, help="Number of calls to build")
+    parser.add_argument(
+        "--engines", type=int, default=1, help="Engine processes the calls are spread over"
+    )
+    parser.add_argument("--hold", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hold is not None:
+        asyncio.run(hold(args.hold))
+        return
+
+    per_engine = [
+        args.calls // args.engines + (1 if i < args.calls % args.engines else 0)
+        for i in range(args.engines)
+    ]
+    print(
+        f"{'mode':<8} {'processes':>9} {'calls':>6} {'PSS MB':>10} {'MB/call':>10} "
+        f"{'calls/GB':>10} {'time s':>8}"
+    )
+    measure("process", [1] * args.calls)
+    measure("engine", per_engine)
+
+
+if __name__ == "__main__":
+    cli()
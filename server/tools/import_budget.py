@@ -0,0 +1,133 @@
+"""Import-time breakdown and budget check for the bot runner.
+
+Every warm worker, engine and per-call runner pays for `runner.py`'s imports
+before it can take a call, so a provider SDK pulled in by accident shows up
+directly in connect latency. This tool imports what a runner imports before it
+reports ready (the runner, the bot class and the selected providers) in a
+fresh interpreter under `python -X importtime`, attributes the time to
+top-level packages and fails when the total exceeds the budget.
+
+Each run starts a new process; the fastest of `--runs` is reported, since
+noise only ever adds time.
+
+Usage:
+    python -m tools.import_budget
+    python -m tools.import_budget --tts-provider cartesia --budget-ms 2500
+    python -m tools.import_budget --bot-type simple --modules 20
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List
+
+PLACEHOLDER_KEYS = ("DAILY_API_KEY", "DEEPGRAM_API_KEY", "OPENAI_API_KEY", "GOOGLE_API_KEY")
+
+# What a runner has imported by the time it reports ready
+STATEMENT = """
+import runner
+from config.bot import BotConfig
+from bots.providers import preload
+config = BotConfig()
+__import__("bots.flow" if config.bot_type == "flow" else "bots.simple")
+preload(config)
+"""
+
+FIRST_PARTY = ("runner", "bots", "config", "prompts", "services", "utils", "tools")
+
+
+@dataclass
+class ImportEntry:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def run_importtime(env: Dict[str, str]) -> List[ImportEntry]:
+    """Run the statement under `-X importtime` and parse its report."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STATEMENT],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time")]
+        raise RuntimeError("Import failed:\n" + "\n".join(errors[-20:]))
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        entries.append(ImportEntry(name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def by_package(entries: List[ImportEntry]) -> Dict[str, int]:
+    """Self time per top-level package in µs; the values add up to the total."""
+    totals: Dict[str, int] = defaultdict(int)
+    for entry in entries:
+        totals[entry.module.split(".")[0]] += entry.self_us
+    return dict(totals)
+
+
+def report(entries: List[ImportEntry], packages: int, modules: int) -> int:
+    """Print the breakdown and return the total import time in µs."""
+    total = sum(entry.self_us for entry in entries)
+    print(f"{'package':<32} {'self ms':>9} {'share':>7}")
+    for name, self_us in sorted(by_package(entries).items(), key=lambda item: -item[1])[:packages]:
+        print(f"{name:<32} {self_us / 1000:>9.1f} {self_us / total:>7.1%}")
+
+    first_party = [e for e in entries if e.module.split(".")[0] in FIRST_PARTY]
+    if modules and first_party:
+        print(f"\n{'first-party module':<32} {'cumul. ms':>9}")
+        for entry in sorted(first_party, key=lambda e: -e.cumulative_us)[:modules]:
+            print(f"{entry.module:<32} {entry.cumulative_us / 1000:>9.1f}")
+    return total
+
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(description="Check the runner's import time against a budget")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.getenv("IMPORT_BUDGET_MS", "4000")),
+        help="Fail when the import time exceeds this many ms (default: IMPORT_BUDGET_MS or 4000)",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Runs, of which the fastest counts")
+    parser.add_argument("--bot-type", choices=["flow", "simple"], help="Bot type to import")
+    parser.add_argument("--tts-provider", help="TTS provider to import (default: TTS_PROVIDER)")
+    parser.add_argument("--llm-provider", help="LLM provider to import (default: LLM_PROVIDER)")
+    parser.add_argument("--packages", type=int, default=15, help="Packages to list")
+    parser.add_argument("--modules", type=int, default=10, help="First-party modules to list")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    for key in PLACEHOLDER_KEYS:
+        env.setdefault(key, "benchmark")
+    for name, value in (
+        ("BOT_TYPE", args.bot_type),
+        ("TTS_PROVIDER", args.tts_provider),
+        ("LLM_PROVIDER", args.llm_provider),
+    ):
+        if value:
+            env[name] = value
+
+    # The first run also fills the bytecode cache, so later runs measure imports alone
+    runs = [run_importtime(env) for _ in range(max(1, args.runs))]
+    fastest = min(runs, key=lambda entries: sum(entry.self_us for entry in entries))
+    total_ms = report(fastest, args.packages, args.modules) / 1000
+
+    verdict = "over" if total_ms > args.budget_ms else "within"
+    print(f"\ntotal {total_ms:.1f} ms ({verdict} budget of {args.budget_ms:.0f} ms)")
+    if total_ms > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,138 @@
+"""Stand-in for `runner.py` that speaks the runner channel protocol without a pipeline.
+
+Supports the same modes as the real runner: one call from `-u`/`-t`, a warm
+worker (`--worker`) and an engine (`--engine`). A call "joins" its room by
+validating its meeting token against the Daily API the server uses (normally
+`tools.daily_stub`), then reports `joined_room` and `first_audio_out`, stays
+in the call for a while and exits, recording `call` and `transport.join`
+spans in the connect's trace like the real runner. Unknown arguments forwarded
+by the server are ignored. Timings are set through environment variables, in seconds:
+
+    STUB_STARTUP_SECS       Simulated import time before a runner is usable (default 0)
+    STUB_FIRST_AUDIO_SECS   Delay between joining and the first audio out (default 0.3)
+    STUB_CALL_SECS          Call duration after joining (default 5)
+
+Start the server with BOT_RUNNER=tools/stub_runner.py to use it.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Optional, Set
+
+from utils.ipc import ChannelWriter, open_channel
+from utils.tracing import create_tracer
+
+STARTUP_SECS = float(os.getenv("STUB_STARTUP_SECS", "0"))
+FIRST_AUDIO_SECS = float(os.getenv("STUB_FIRST_AUDIO_SECS", "0.3"))
+CALL_SECS = float(os.getenv("STUB_CALL_SECS", "5"))
+
+tracer = create_tracer(
+    "lead-qualifier-bot",
+    traces_file=os.getenv("TRACES_FILE"),
+    otlp_endpoint=os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"),
+    **{"process.pid": os.getpid(), "bot.type": "stub"},
+)
+
+
+def join(token: str) -> None:
+    """Validate the meeting token like joining the room would; raises if it is rejected."""
+    api_url = os.getenv("DAILY_API_URL", "https://api.daily.co/v1")
+    request = urllib.request.Request(
+        f"{api_url}/meeting-tokens/{token}",
+        headers={"Authorization": f"Bearer {os.getenv('DAILY_API_KEY', '')}"},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        response.read()
+
+
+async def run_call(
+    channel: ChannelWriter,
+    token: str,
+    call_id: Optional[int] = None,
+    traceparent: Optional[str] = None,
+) -> int:
+    """Simulate one call.
+
+    Returns:
+        The call's exit code: 0, or 1 if the room could not be joined.
+    """
+    with tracer.span("call", traceparent, **{"call.id": call_id}) as call:
+        try:
+            with tracer.span("transport.join"):
+                await asyncio.to_thread(join, token)
+        except (urllib.error.URLError, OSError) as e:
+            print(f"Failed to join room: {e}", file=sys.stderr)
+            call.error = str(e)
+            return 1
+        channel.send("joined_room", call_id=call_id)
+        await asyncio.sleep(FIRST_AUDIO_SECS)
+        channel.send("first_audio_out", call_id=call_id)
+        await asyncio.sleep(max(0.0, CALL_SECS - FIRST_AUDIO_SECS))
+        return 0
+
+
+async def run_engine(channel: ChannelWriter) -> None:
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    async def call(
+        call_id: int,
+        room_url: str,
+        token: str,
+        traceparent: Optional[str] = None,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        channel.send("started", call_id=call_id)
+        exit_code = await run_call(channel, token, call_id, traceparent)
+        channel.send("finished", call_id=call_id, exit_code=exit_code)
+
+    calls: Set[asyncio.Task] = set()
+    channel.send("ready")
+    while line := await reader.readline():
+        task = asyncio.create_task(call(**json.loads(line)))
+        calls.add(task)
+        task.add_done_callback(calls.discard)
+    if calls:
+        await asyncio.gather(*calls)
+
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(description="Stub bot runner")
+    parser.add_argument("-u", "--room-url", type=str)
+    parser.add_argument("-t", "--token", type=str)
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--engine", action="store_true")
+    parser.add_argument("--traceparent", type=str)
+    args, _ = parser.parse_known_args()
+
+    channel = open_channel()
+    time.sleep(STARTUP_SECS)
+
+    if args.engine:
+        asyncio.run(run_engine(channel))
+        tracer.shutdown()
+        return
+
+    token, traceparent = args.token, args.traceparent
+    if args.worker:
+        channel.send("ready")
+        line = sys.stdin.readline()
+        if not line:
+            sys.exit(0)
+        assignment = json.loads(line)
+        token, traceparent = assignment["token"], assignment.get("traceparent")
+
+    exit_code = asyncio.run(run_call(channel, token, traceparent=traceparent))
+    tracer.shutdown()
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,9 @@
+"""Common utilities package.
+
+This package contains helpers shared by the server and the bot runner:
+- Bot lifecycle management (warm worker pool, room pool, reaping, registry, ledger)
+- Per-client connect rate limits and admission control
+- Per-bot resource limits, multi-host dispatch and graceful drain
+- Server/runner IPC channel, lifecycle events, pipeline metrics and tracing
+- Rate-limited Daily REST client and upstream health probes
+"""
@@ -0,0 +1,25 @@
+"""Access checks of the admin and agent endpoints, shared by the server and worker agents."""
+
+import secrets
+from typing import Optional
+
+from fastapi import HTTPException, Request
+
+LOOPBACK_HOSTS = ("127.0.0.1", "::1")
+
+
+def check_admin(request: Request, admin_api_key: Optional[str]) -> None:
+    """Require `X-Admin-Key` if an admin key is set, otherwise a loopback client."""
+    if admin_api_key:
+        key = request.headers.get("X-Admin-Key", "")
+        if not secrets.compare_digest(key, admin_api_key):
+            raise HTTPException(status_code=401, detail="Invalid admin key")
+    elif not request.client or request.client.host not in LOOPBACK_HOSTS:
+        raise HTTPException(status_code=403, detail="Admin endpoints are loopback-only")
+
+
+def check_agent_key(request: Request, agent_api_key: str) -> None:
+    """Require the key shared between the dispatcher and its worker agents in `X-Agent-Key`."""
+    key = request.headers.get("X-Agent-Key", "")
+    if not secrets.compare_digest(key, agent_api_key):
+        raise HTTPException(status_code=401, detail="Invalid agent key")
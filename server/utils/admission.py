@@ -0,0 +1,201 @@
+"""Host-aware admission control for new bots.
+
+Every bot loads its own VAD model and streams STT/TTS audio, so starting more
+bots than the host can carry degrades audio for every call. The controller
+admits a new bot only while the live bot count is under the host budget and
+CPU utilisation and free memory leave room for one more; near the limit
+connects wait briefly for capacity, then get rejected with a retry hint.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+# Host samples are reused for this long
+SAMPLE_INTERVAL_SECS = 1.0
+
+# How often queued connects re-check host load while waiting
+QUEUE_POLL_SECS = 0.25
+
+
+class AdmissionRejected(Exception):
+    """Raised when the host is saturated and a connect should be retried later."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+def read_mem_available_mb() -> Optional[float]:
+    """Available memory from /proc/meminfo, or None where it is not available."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class CpuSampler:
+    """Host CPU utilisation (0-1) between consecutive samples of /proc/stat."""
+
+    def __init__(self):
+        self._last = self._read()
+
+    def _read(self) -> Optional[tuple[int, int]]:
+        try:
+            with open("/proc/stat") as f:
+                fields = [int(v) for v in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+        return sum(fields), idle
+
+    def utilization(self) -> float:
+        current = self._read()
+        if current is None or self._last is None:
+            # Fall back to the 1-minute load average
+            return os.getloadavg()[0] / (os.cpu_count() or 1)
+        total, idle = current[0] - self._last[0], current[1] - self._last[1]
+        self._last = current
+        return 1 - idle / total if total else 0.0
+
+
+class AdmissionController:
+    """Admits new bots against the host's CPU and memory budget.
+
+    Args:
+        active_count: Callable returning the number of running bots.
+        max_bots: Maximum concurrent bots; 0 derives it from the per-bot budget.
+        cpu_per_bot: CPU cores budgeted per bot.
+        memory_per_bot_mb: Memory budgeted per bot, in MB.
+        max_cpu_utilization: Host CPU utilisation (0-1) above which new bots are not admitted.
+        queue_timeout: How long a connect may wait for capacity before being rejected.
+        max_queue: Maximum number of connects waiting for capacity.
+        retry_after: Seconds suggested to rejected clients.
+    """
+
+    def __init__(
+        self,
+        active_count: Callable[[], int],
+        max_bots: int = 0,
+        cpu_per_bot: float = 0.5,
+        memory_per_bot_mb: float = 400,
+        max_cpu_utilization: float = 0.85,
+        queue_timeout: float = 2.0,
+        max_queue: int = 32,
+        retry_after: int = 5,
+    ):
+        self._active_count = active_count
+        self._memory_per_bot_mb = memory_per_bot_mb
+        self._max_cpu_utilization = max_cpu_utilization
+        self._queue_timeout = queue_timeout
+        self._max_queue = max_queue
+        self._retry_after = retry_after
+        self._pending = 0
+        self._queued = 0
+        self._capacity_changed = asyncio.Condition()
+        self._cpu = CpuSampler()
+        self._sampled_at = 0.0
+        self._cpu_utilization = 0.0
+        self._mem_available_mb: Optional[float] = None
+
+        if max_bots:
+            self.max_bots = max_bots
+        else:
+            by_cpu = int((os.cpu_count() or 1) / cpu_per_bot)
+            mem_available = read_mem_available_mb()
+            by_memory = int(mem_available / memory_per_bot_mb) if mem_available else by_cpu
+            self.max_bots = max(1, min(by_cpu, by_memory))
+            logger.info(
+                f"Admission budget: {self.max_bots} bots (CPU allows {by_cpu}, memory {by_memory})"
+            )
+
+    async def acquire(self) -> None:
+        """Reserve capacity for one bot, waiting briefly if the host is near its limit.
+
+        Raises:
+            AdmissionRejected: If the host stays saturated or too many connects are queued.
+        """
+        reason = self._saturation()
+        if reason is None:
+            self._pending += 1
+            return
+
+        if self._queued >= self._max_queue:
+            raise AdmissionRejected(f"Host saturated ({reason}), queue full", self._retry_after)
+
+        self._queued += 1
+        deadline = time.monotonic() + self._queue_timeout
+        try:
+            async with self._capacity_changed:
+                while (reason := self._saturation()) is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise AdmissionRejected(f"Host saturated ({reason})", self._retry_after)
+                    try:
+                        await asyncio.wait_for(
+                            self._capacity_changed.wait(), min(remaining, QUEUE_POLL_SECS)
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+            self._pending += 1
+        finally:
+            self._queued -= 1
+
+    def release(self) -> None:
+        """Release a reservation once the bot is registered (or failed to start)."""
+        self._pending -= 1
+        self.notify()
+
+    def notify(self) -> None:
+        """Wake queued connects, e.g. after a bot exited."""
+
+        async def _notify():
+            async with self._capacity_changed:
+                self._capacity_changed.notify_all()
+
+        if self._queued:
+            asyncio.create_task(_notify())
+
+    def free_slots(self) -> int:
+        """Number of bots the host can admit right now."""
+        if self._saturation() is not None:
+            return 0
+        return self.max_bots - self._active_count() - self._pending
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._sample()
+        return {
+            "max_bots": self.max_bots,
+            "free": self.free_slots(),
+            "pending": self._pending,
+            "queued": self._queued,
+            "cpu_utilization": round(self._cpu_utilization, 3),
+            "mem_available_mb": self._mem_available_mb,
+        }
+
+    def _saturation(self) -> Optional[str]:
+        """Return why the host cannot take another bot, or None if it can."""
+        if self._active_count() + self._pending >= self.max_bots:
+            return f"{self.max_bots} bots running"
+
+        self._sample()
+        if self._cpu_utilization > self._max_cpu_utilization:
+            return f"CPU at {self._cpu_utilization:.0%}"
+        if self._mem_available_mb is not None and self._mem_available_mb < self._memory_per_bot_mb:
+            return f"{self._mem_available_mb:.0f} MB memory available"
+        return None
+
+    def _sample(self) -> None:
+        now = time.monotonic()
+        if now - self._sampled_at < SAMPLE_INTERVAL_SECS:
+            return
+        self._sampled_at = now
+        self._cpu_utilization = self._cpu.utilization()
+        self._mem_available_mb = read_mem_available_mb()
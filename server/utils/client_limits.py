@@ -0,0 +1,169 @@
+"""Per-client rate limits on the connect endpoints.
+
+Every connect creates a room and starts a bot, so a single misbehaving client
+or scraper could use up the host's capacity. Each client gets a token bucket,
+keyed by its API key when it sends a known one and by its IP address
+otherwise, and connects beyond the bucket are answered with a 429 in
+middleware, before any room or process is created. A bucket is two floats,
+and buckets idle long enough to have refilled are dropped, since a fresh
+bucket is identical.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Collection, Dict, Optional, Set, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Header clients send their API key in
+API_KEY_HEADER = b"x-api-key"
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class BucketSet:
+    """Token buckets for many clients, least recently used first.
+
+    Args:
+        rate: Requests per second per client.
+        burst: Requests a client may make at once.
+        max_clients: Buckets kept; the least recently used are evicted beyond it.
+    """
+
+    def __init__(self, rate: float, burst: int, max_clients: int):
+        self._rate = rate
+        self._burst = max(1, burst)
+        self._max_clients = max_clients
+        # A bucket idle for this long is full again and can be dropped
+        self._idle_secs = self._burst / rate if rate > 0 else 0.0
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, client: str, now: float) -> Optional[float]:
+        """Take a token for a client.
+
+        Returns:
+            None if the request is allowed, otherwise seconds until a token is available.
+        """
+        self._expire(now)
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = _Bucket(float(self._burst), now)
+            if len(self._buckets) > self._max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            bucket.tokens = min(self._burst, bucket.tokens + (now - bucket.updated) * self._rate)
+            bucket.updated = now
+            self._buckets.move_to_end(client)
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return None
+        return (1 - bucket.tokens) / self._rate
+
+    def _expire(self, now: float) -> None:
+        while self._buckets:
+            bucket = next(iter(self._buckets.values()))
+            if now - bucket.updated < self._idle_secs:
+                return
+            self._buckets.popitem(last=False)
+
+
+class ClientRateLimiter:
+    """Connect rate limits per IP address and per API key.
+
+    Args:
+        rate: Connects per second per IP address; 0 disables the IP limit.
+        burst: Connects an IP address may make at once.
+        api_keys: Known API keys, each limited on its own instead of by IP address.
+        key_rate: Connects per second per API key.
+        key_burst: Connects an API key may make at once.
+        max_clients: Buckets kept per kind of client.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        api_keys: Collection[str] = (),
+        key_rate: float = 0.0,
+        key_burst: int = 1,
+        max_clients: int = 100_000,
+    ):
+        self._api_keys: Set[str] = set(api_keys)
+        self._by_ip = BucketSet(rate, burst, max_clients) if rate > 0 else None
+        self._by_key = BucketSet(key_rate, key_burst, max_clients) if key_rate > 0 else None
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._by_ip is not None or self._by_key is not None
+
+    def check(self, ip: str, api_key: Optional[str]) -> Optional[float]:
+        """Admit a connect, or return the seconds after which the client may retry."""
+        now = time.monotonic()
+        if api_key in self._api_keys:
+            retry_after = self._by_key.take(api_key, now) if self._by_key is not None else None
+        else:
+            retry_after = self._by_ip.take(ip, now) if self._by_ip is not None else None
+        if retry_after is not None:
+            self.rejected += 1
+        return retry_after
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "tracked_ips": len(self._by_ip) if self._by_ip is not None else 0,
+            "tracked_keys": len(self._by_key) if self._by_key is not None else 0,
+            "rejected": self.rejected,
+        }
+
+
+class ClientRateLimitMiddleware:
+    """ASGI middleware answering rate-limited requests to `routes` with a 429.
+
+    Args:
+        app: The wrapped application.
+        limiter: Limits to enforce.
+        routes: (method, path) pairs that are limited.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: ClientRateLimiter,
+        routes: Collection[Tuple[str, str]],
+    ):
+        self.app = app
+        self._limiter = limiter
+        self._routes = set(routes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] == "http"
+            and self._limiter.enabled
+            and (scope["method"], scope["path"]) in self._routes
+        ):
+            client = scope.get("client")
+            api_key = dict(scope["headers"]).get(API_KEY_HEADER)
+            retry_after = self._limiter.check(
+                client[0] if client else "unknown", api_key.decode("latin-1") if api_key else None
+            )
+            if retry_after is not None:
+                response = JSONResponse(
+                    {"detail": "Too many connects from this client"},
+                    status_code=429,
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -0,0 +1,277 @@
+"""Rate-limited access to the Daily REST API.
+
+Room creation, token requests and room deletions used to hit the API as fast
+as connects and cleanups arrived, so a burst could exceed Daily's rate limits
+and the resulting 429s failed calls outright. Every request the Daily helper
+makes now goes through a limiter: a token bucket caps the request rate, a
+bound on in-flight requests caps concurrency, and waiting requests are served
+by priority, so rooms for connects go ahead of pool refills and deletions. A
+429 pauses all requests for its `Retry-After` and the request is retried.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+from loguru import logger
+from pipecat.transports.services.helpers.daily_rest import (
+    DailyMeetingTokenParams,
+    DailyRESTHelper,
+    DailyRoomObject,
+    DailyRoomParams,
+)
+
+from .meeting_tokens import LocalTokenDailyRESTHelper
+
+# Request priorities, lowest value first
+PRIORITY_CONNECT = 0  # Rooms and tokens a connect is waiting for
+PRIORITY_POOL = 1  # Room pool refills and recycling
+PRIORITY_CLEANUP = 2  # Deleting finished and orphaned rooms
+
+PRIORITY_NAMES = {PRIORITY_CONNECT: "connect", PRIORITY_POOL: "pool", PRIORITY_CLEANUP: "cleanup"}
+
+# Pause after a 429 without a usable Retry-After, doubled on every retry
+DEFAULT_RETRY_AFTER_SECS = 1.0
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "daily_priority", default=PRIORITY_CLEANUP
+)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay in seconds or an HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Token bucket with a bound on in-flight requests, granting slots by priority.
+
+    Args:
+        rate: Requests per second.
+        burst: Bucket size: requests that may be sent at once after a quiet period.
+        max_in_flight: Requests allowed in flight at once.
+    """
+
+    def __init__(self, rate: float, burst: int, max_in_flight: int):
+        self._rate = rate
+        self._burst = max(1, burst)
+        self._max_in_flight = max(1, max_in_flight)
+        self._tokens = float(self._burst)
+        self._updated = time.monotonic()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.throttled = 0
+
+    async def acquire(self, priority: int) -> None:
+        """Wait for a request slot; release it with `release`."""
+        if not self._waiters and self._take():
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._grant()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted as the waiter was cancelled
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._grant()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request for `seconds`, e.g. after a 429."""
+        self.throttled += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        # Restart from an empty bucket once the pause ends instead of bursting
+        self._tokens = 0.0
+        self._updated = self._paused_until
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._refill()
+        queued = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                queued[PRIORITY_NAMES.get(priority, str(priority))] += 1
+        return {
+            "rate": self._rate,
+            "tokens": round(self._tokens, 2),
+            "in_flight": self._in_flight,
+            "queued": queued,
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "throttled": self.throttled,
+        }
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if now > self._updated:
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+    def _take(self) -> bool:
+        self._refill()
+        if (
+            time.monotonic() < self._paused_until
+            or self._in_flight >= self._max_in_flight
+            or self._tokens < 1
+        ):
+            return False
+        self._tokens -= 1
+        self._in_flight += 1
+        return True
+
+    def _grant(self) -> None:
+        """Hand slots to waiters in priority order, then wait for the bucket if needed."""
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._take():
+                break
+            heapq.heappop(self._waiters)
+            future.set_result(None)
+
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if self._waiters and self._in_flight < self._max_in_flight:
+            # Blocked by the bucket or a pause rather than concurrency, which `release` ends
+            delay = max(
+                self._paused_until - time.monotonic(), (1 - self._tokens) / self._rate, 0.001
+            )
+            self._timer = asyncio.get_running_loop().call_later(delay, self._grant)
+
+
+class _LimitedRequest:
+    """Async context manager sending one request through the limiter, retrying 429s."""
+
+    def __init__(self, session: "RateLimitedSession", method: str, url: str, kwargs: Dict):
+        self._session = session
+        self._method = method
+        self._url = url
+        self._kwargs = kwargs
+        self._response: Optional[aiohttp.ClientResponse] = None
+
+    async def __aenter__(self) -> aiohttp.ClientResponse:
+        limiter = self._session.limiter
+        priority = _priority.get()
+        attempt = 0
+        while True:
+            await limiter.acquire(priority)
+            try:
+                response = await self._session.session.request(
+                    self._method, self._url, **self._kwargs
+                )
+            except BaseException:
+                limiter.release()
+                raise
+            if response.status != 429 or attempt >= self._session.max_retries:
+                self._response = response
+                return response
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is None:
+                retry_after = DEFAULT_RETRY_AFTER_SECS * 2**attempt
+            response.release()
+            limiter.pause(retry_after)
+            limiter.release()
+            logger.warning(
+                f"Daily API rate limited {self._method} {self._url}, retrying in {retry_after:.1f}s"
+            )
+            attempt += 1
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._response.release()
+        self._session.limiter.release()
+
+
+class RateLimitedSession:
+    """The subset of `aiohttp.ClientSession` the Daily helpers use, behind a `RateLimiter`.
+
+    Args:
+        session: Session that sends the requests.
+        limiter: Limiter every request waits for.
+        max_retries: Retries of a request answered with 429 before its 429 is returned.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, limiter: RateLimiter, max_retries: int = 3):
+        self.session = session
+        self.limiter = limiter
+        self.max_retries = max_retries
+
+    def get(self, url: str, **kwargs) -> _LimitedRequest:
+        return _LimitedRequest(self, "GET", url, kwargs)
+
+    def post(self, url: str, **kwargs) -> _LimitedRequest:
+        return _LimitedRequest(self, "POST", url, kwargs)
+
+    def delete(self, url: str, **kwargs) -> _LimitedRequest:
+        return _LimitedRequest(self, "DELETE", url, kwargs)
+
+
+class DailyClient:
+    """Daily REST operations used by the server, each sent at a given priority.
+
+    Args:
+        helper: Daily helper built on a `RateLimitedSession`.
+        limiter: The session's limiter, for status reporting.
+    """
+
+    def __init__(self, helper: DailyRESTHelper, limiter: RateLimiter):
+        self.helper = helper
+        self.limiter = limiter
+
+    async def create_room(
+        self, params: DailyRoomParams, priority: int = PRIORITY_POOL
+    ) -> DailyRoomObject:
+        token = _priority.set(priority)
+        try:
+            return await self.helper.create_room(params)
+        finally:
+            _priority.reset(token)
+
+    async def get_token(
+        self,
+        room_url: str,
+        expiry_time: float = 60 * 60,
+        owner: bool = True,
+        params: Optional[DailyMeetingTokenParams] = None,
+        priority: int = PRIORITY_POOL,
+    ) -> str:
+        token = _priority.set(priority)
+        try:
+            return await self.helper.get_token(room_url, expiry_time, owner, params)
+        finally:
+            _priority.reset(token)
+
+    def forget_tokens(self, room_url: str) -> None:
+        """Drop the room's cached meeting tokens, if the helper caches them."""
+        if isinstance(self.helper, LocalTokenDailyRESTHelper):
+            self.helper.forget_tokens(room_url)
+
+    async def delete_room_by_url(self, room_url: str, priority: int = PRIORITY_CLEANUP) -> bool:
+        token = _priority.set(priority)
+        try:
+            return await self.helper.delete_room_by_url(room_url)
+        finally:
+            _priority.reset(token)
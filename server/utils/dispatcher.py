@@ -0,0 +1,328 @@
+"""Placement of bots on remote worker agents.
+
+In dispatcher mode the front server creates rooms but starts no bots itself.
+Worker agents (see `agent.py`) push a report with their free capacity, running
+bots and recent exits every few seconds and whenever a bot exits. The
+dispatcher places each call on the up agent with the most free slots, health
+checks agents whose reports are late and marks an agent down when it stops
+reporting, so no further calls are placed on it until it reports again. Bots
+on an agent that stays down past a grace period are treated as lost.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import aiohttp
+from loguru import logger
+
+from utils.admission import AdmissionRejected
+
+
+def check_report(report: Any) -> None:
+    """Validate an agent's report.
+
+    Raises:
+        ValueError: If a field `Dispatcher.report` reads is missing or of the wrong type.
+    """
+    if not isinstance(report, dict):
+        raise ValueError("Report must be an object")
+    for key in ("agent_id", "url"):
+        if not isinstance(report.get(key), str):
+            raise ValueError(f"Report field {key} must be a string")
+    for key in ("max_bots", "free", "active"):
+        if not isinstance(report.get(key), int):
+            raise ValueError(f"Report field {key} must be an int")
+    for key in ("exits", "events"):
+        entries = report.get(key, [])
+        if not isinstance(entries, list) or not all(
+            isinstance(entry, dict) and isinstance(entry.get("pid"), int) for entry in entries
+        ):
+            raise ValueError(f"Report field {key} must be a list of objects with an int pid")
+    for exit in report.get("exits", []):
+        if exit.get("exit_code") is not None and not isinstance(exit["exit_code"], int):
+            raise ValueError("Exit codes must be ints or null")
+    running = report.get("running", [])
+    if not isinstance(running, list) or not all(isinstance(pid, int) for pid in running):
+        raise ValueError("Report field running must be a list of PIDs")
+
+
+@dataclass
+class AgentInfo:
+    agent_id: str
+    url: str
+    max_bots: int = 0
+    free: int = 0
+    active: int = 0
+    up: bool = True
+    draining: bool = False
+    last_report: float = field(default_factory=time.monotonic)
+    down_since: float = 0.0
+    # Bots placed on the agent by this dispatcher, by PID, with their placement time
+    bots: Dict[int, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "agent_id": self.agent_id,
+            "url": self.url,
+            "up": self.up,
+            "draining": self.draining,
+            "max_bots": self.max_bots,
+            "free": self.free,
+            "active": self.active,
+            "placed": len(self.bots),
+            "last_report_age": round(time.monotonic() - self.last_report, 3),
+        }
+
+
+class Dispatcher:
+    """Tracks worker agents and places bots on them.
+
+    Args:
+        on_exit: Coroutine function called with the agent ID, PID and exit code of each
+            bot that exited (exit code None if the bot was lost).
+        report_timeout: Seconds without a report after which an agent is health checked,
+            and marked down if the check fails or the report stays missing twice as long.
+        spawn_timeout: Timeout for a spawn request to an agent.
+        retry_after: Seconds suggested to clients when no agent has capacity.
+        api_key: Shared key sent to and expected from agents, if set.
+        on_event: Called with the agent ID, PID and message of each channel message a bot
+            on an agent sent.
+        down_grace: Seconds an agent may stay down before its bots are considered lost.
+    """
+
+    def __init__(
+        self,
+        on_exit: Callable[[str, int, Optional[int]], Awaitable[None]],
+        report_timeout: float = 6.0,
+        spawn_timeout: float = 10.0,
+        retry_after: int = 5,
+        api_key: Optional[str] = None,
+        on_event: Optional[Callable[[str, int, Dict[str, Any]], None]] = None,
+        down_grace: float = 60.0,
+    ):
+        self._on_exit = on_exit
+        self._on_event = on_event
+        self._report_timeout = report_timeout
+        self._down_grace = down_grace
+        self._spawn_timeout = spawn_timeout
+        self._retry_after = retry_after
+        self._headers = {"X-Agent-Key": api_key} if api_key else {}
+        self._agents: Dict[str, AgentInfo] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def start(self, session: aiohttp.ClientSession) -> None:
+        self._session = session
+        self._monitor_task = asyncio.create_task(self._monitor())
+
+    async def stop(self) -> None:
+        if self._monitor_task:
+            self._monitor_task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def agents(self) -> List[Dict[str, Any]]:
+        return [agent.to_dict() for agent in self._agents.values()]
+
+    def report(self, report: Dict[str, Any]) -> List[int]:
+        """Apply an agent's report.
+
+        Returns:
+            PIDs of the reported exits that were handled and need not be reported again.
+
+        Raises:
+            ValueError: If the report is malformed; nothing of it is applied then.
+        """
+        check_report(report)
+        agent_id = report["agent_id"]
+        agent = self._agents.get(agent_id)
+        if not agent:
+            agent = self._agents[agent_id] = AgentInfo(agent_id=agent_id, url=report["url"])
+            logger.info(f"Worker agent {agent_id} registered at {agent.url}")
+        elif not agent.up:
+            logger.info(f"Worker agent {agent_id} is back up")
+
+        agent.url = report["url"]
+        agent.up = True
+        agent.last_report = time.monotonic()
+        self._apply_capacity(agent, report)
+
+        if self._on_event:
+            for message in report.get("events", []):
+                if message["pid"] in agent.bots:
+                    self._on_event(agent_id, message["pid"], message)
+
+        # Exits of bots already given up on (e.g. while the agent was down) are acked too
+        acked = []
+        for exit in report.get("exits", []):
+            pid = exit["pid"]
+            if agent.bots.pop(pid, None) is not None:
+                self._track(
+                    asyncio.create_task(self._dispatch(agent_id, pid, exit.get("exit_code")))
+                )
+            acked.append(pid)
+
+        # Bots the agent no longer runs, without a reported exit, were lost (e.g. agent restart)
+        running = set(report.get("running", []))
+        settled = time.monotonic() - self._report_timeout
+        for pid, placed_at in list(agent.bots.items()):
+            if pid not in running and placed_at < settled:
+                self._lose(agent, pid)
+        return acked
+
+    def check_capacity(self) -> None:
+        """Fail fast before a room is created when no agent can take a call.
+
+        Raises:
+            AdmissionRejected: If no up agent has free capacity.
+        """
+        if not any(agent.up and agent.free > 0 for agent in self._agents.values()):
+            raise AdmissionRejected("No worker agent has capacity", self._retry_after)
+
+    async def place(
+        self,
+        room_url: str,
+        token: str,
+        traceparent: Optional[str] = None,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, int]:
+        """Start a bot on the up agent with the most free capacity, trying others on failure.
+
+        Args:
+            room_url: Room the bot joins.
+            token: The bot's meeting token.
+            traceparent: Trace context the bot's spans continue.
+            profile: Profile payload the bot runs with.
+
+        Returns:
+            Tuple of the agent ID and the bot's PID on that agent.
+
+        Raises:
+            AdmissionRejected: If no agent could start the bot.
+        """
+        tried: Set[str] = set()
+        while True:
+            candidates = [
+                agent
+                for agent in self._agents.values()
+                if agent.up and agent.free > 0 and agent.agent_id not in tried
+            ]
+            if not candidates:
+                raise AdmissionRejected("No worker agent has capacity", self._retry_after)
+            agent = max(candidates, key=lambda a: a.free)
+            tried.add(agent.agent_id)
+
+            # Reserve the slot until the agent's next report
+            agent.free -= 1
+            pid = await self._spawn_on(agent, room_url, token, traceparent, profile)
+            if pid is not None:
+                agent.bots[pid] = time.monotonic()
+                return agent.agent_id, pid
+
+    async def _spawn_on(
+        self,
+        agent: AgentInfo,
+        room_url: str,
+        token: str,
+        traceparent: Optional[str],
+        profile: Optional[Dict[str, Any]],
+    ) -> Optional[int]:
+        body = {
+            "room_url": room_url,
+            "token": token,
+            "traceparent": traceparent,
+            "profile": profile,
+        }
+        try:
+            async with self._session.post(
+                f"{agent.url}/spawn",
+                json=body,
+                headers=self._headers,
+                timeout=aiohttp.ClientTimeout(total=self._spawn_timeout),
+            ) as r:
+                if r.status == 200:
+                    return (await r.json())["pid"]
+                if r.status == 429:
+                    agent.free = 0
+                    logger.info(f"Worker agent {agent.agent_id} is at capacity")
+                else:
+                    logger.error(
+                        f"Worker agent {agent.agent_id} failed to start bot: "
+                        f"{r.status} {await r.text()}"
+                    )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._mark_down(agent, f"spawn request failed: {e!r}")
+        return None
+
+    async def _monitor(self) -> None:
+        while True:
+            await asyncio.sleep(self._report_timeout / 2)
+            now = time.monotonic()
+            stale = [
+                agent
+                for agent in self._agents.values()
+                if agent.up and now - agent.last_report > self._report_timeout
+            ]
+            for agent in stale:
+                if now - agent.last_report > 2 * self._report_timeout:
+                    self._mark_down(agent, "stopped reporting")
+                elif not await self._health_check(agent):
+                    self._mark_down(agent, "reports late and health check failed")
+            # Bots of an agent that stays down would otherwise hold their rooms forever
+            for agent in self._agents.values():
+                if not agent.up and agent.bots and now - agent.down_since > self._down_grace:
+                    logger.error(
+                        f"Worker agent {agent.agent_id} is still down, "
+                        f"giving up on its {len(agent.bots)} bots"
+                    )
+                    for pid in list(agent.bots):
+                        self._lose(agent, pid)
+
+    async def _health_check(self, agent: AgentInfo) -> bool:
+        try:
+            async with self._session.get(
+                f"{agent.url}/capacity",
+                headers=self._headers,
+                timeout=aiohttp.ClientTimeout(total=self._report_timeout / 2),
+            ) as r:
+                if r.status != 200:
+                    return False
+                capacity = await r.json()
+                check_report(capacity)
+                self._apply_capacity(agent, capacity)
+                logger.warning(f"Worker agent {agent.agent_id} is reachable but reports are late")
+                return True
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return False
+
+    def _apply_capacity(self, agent: AgentInfo, report: Dict[str, Any]) -> None:
+        agent.max_bots = report["max_bots"]
+        agent.free = report["free"]
+        agent.active = report["active"]
+        agent.draining = report.get("draining", False)
+
+    def _mark_down(self, agent: AgentInfo, reason: str) -> None:
+        if agent.up:
+            logger.error(f"Marking worker agent {agent.agent_id} down: {reason}")
+            agent.down_since = time.monotonic()
+        agent.up = False
+        agent.free = 0
+
+    def _lose(self, agent: AgentInfo, pid: int) -> None:
+        """Finish a bot of the agent that exited without a reported exit code."""
+        logger.warning(f"Bot {pid} on worker agent {agent.agent_id} was lost")
+        del agent.bots[pid]
+        self._track(asyncio.create_task(self._dispatch(agent.agent_id, pid, None)))
+
+    async def _dispatch(self, agent_id: str, pid: int, exit_code: Optional[int]) -> None:
+        try:
+            await self._on_exit(agent_id, pid, exit_code)
+        except Exception as e:
+            logger.error(f"Error handling exit of bot {pid} on worker agent {agent_id}: {e}")
+
+    def _track(self, task: asyncio.Task) -> None:
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,112 @@
+"""Graceful drain before a restart.
+
+Draining stops a server (or worker agent) from taking new calls while the
+calls it already runs continue. Once the last bot has finished, or the drain
+deadline has passed, `on_drained` stops whatever is left, cleans up and shuts
+the process down. A rolling restart drains each host in turn, so live calls
+are never cut.
+"""
+
+import asyncio
+import subprocess
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+class DrainController:
+    """Tracks the drain state and waits for running bots to finish.
+
+    Args:
+        active_count: Returns the number of running bots.
+        timeout: Seconds to wait for running bots before `on_drained` is called anyway.
+        on_drained: Coroutine function called once with True if the deadline passed
+            with bots still running, False if they all finished.
+    """
+
+    def __init__(
+        self,
+        active_count: Callable[[], int],
+        timeout: float,
+        on_drained: Callable[[bool], Awaitable[None]],
+    ):
+        self._active_count = active_count
+        self._timeout = timeout
+        self._on_drained = on_drained
+        self._changed = asyncio.Event()
+        self._deadline: Optional[float] = None
+        self._reason: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def draining(self) -> bool:
+        return self._deadline is not None
+
+    def begin(self, reason: str) -> bool:
+        """Stop taking new bots and start waiting for the running ones.
+
+        Returns:
+            False if a drain was already in progress.
+        """
+        if self.draining:
+            return False
+        self._deadline = time.monotonic() + self._timeout
+        self._reason = reason
+        logger.warning(
+            f"Draining ({reason}): waiting up to {self._timeout:.0f}s "
+            f"for {self._active_count()} running bots"
+        )
+        self._task = asyncio.create_task(self._wait())
+        return True
+
+    def notify(self) -> None:
+        """Signal that a bot finished."""
+        self._changed.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        remaining = None
+        if self._deadline is not None:
+            remaining = round(max(0.0, self._deadline - time.monotonic()), 1)
+        return {
+            "draining": self.draining,
+            "reason": self._reason,
+            "active": self._active_count(),
+            "deadline_in": remaining,
+        }
+
+    async def _wait(self) -> None:
+        timed_out = False
+        while self._active_count() > 0:
+            remaining = self._deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+        if timed_out:
+            logger.warning(f"Drain deadline passed with {self._active_count()} bots running")
+        else:
+            logger.info("All bots finished, drain complete")
+        try:
+            await self._on_drained(timed_out)
+        except Exception as e:
+            logger.error(f"Error completing drain: {e}")
+
+
+async def stop_processes(procs: List[subprocess.Popen], grace: float) -> None:
+    """Terminate processes, killing those still running after `grace` seconds."""
+    running = [proc for proc in procs if proc.poll() is None]
+    for proc in running:
+        proc.terminate()
+    deadline = time.monotonic() + grace
+    while running and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+        running = [proc for proc in running if proc.poll() is None]
+    for proc in running:
+        logger.warning(f"Process {proc.pid} did not exit within {grace:.0f}s, killing it")
+        proc.kill()
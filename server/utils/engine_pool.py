@@ -0,0 +1,171 @@
+"""Pool of bot engine processes hosting many calls each.
+
+A process-per-call runner carries its own copy of pipecat, the service SDKs
+and the Silero VAD model. An engine (`runner.py --engine`) loads all of that
+once and runs every assigned call as an asyncio task, so the per-call memory
+cost drops to the call's own pipeline and connections. The pool keeps a fixed
+number of engines running (typically one per core), assigns each call to the
+least loaded ready engine and replaces engines that exit.
+"""
+
+import asyncio
+import json
+import subprocess
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from loguru import logger
+
+from .ipc import read_messages
+
+# Delay before replacing an engine that exited
+RESPAWN_BACKOFF_SECS = 5.0
+
+
+@dataclass
+class Engine:
+    proc: subprocess.Popen
+    ready: bool = False
+    calls: Set[int] = field(default_factory=set)
+
+
+class EnginePool:
+    """Keeps `size` engine processes running and assigns calls to them.
+
+    Args:
+        size: Number of engine processes. Zero disables the pool.
+        max_calls: Maximum concurrent calls per engine.
+        spawn: Coroutine function starting a runner in engine mode with stdin and stdout piped.
+        on_call_exit: Coroutine function called with the call ID and exit code of each call
+            that ended (exit code None if its engine died).
+        on_message: Called with the call ID and every other message an engine sends for a call,
+            and with None for metrics of the engine as a whole (its event loop).
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_calls: int,
+        spawn: Callable[[], Awaitable[subprocess.Popen]],
+        on_call_exit: Callable[[int, Optional[int]], Awaitable[None]],
+        on_message: Optional[Callable[[Optional[int], Dict[str, Any]], None]] = None,
+    ):
+        self._size = size
+        self._max_calls = max_calls
+        self._spawn = spawn
+        self._on_call_exit = on_call_exit
+        self._on_message = on_message
+        self._engines: List[Optional[Engine]] = [None] * size
+        self._tasks: List[asyncio.Task] = []
+        self._exits: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self._size > 0
+
+    async def start(self) -> None:
+        """Start the engines in the background."""
+        self._tasks = [asyncio.create_task(self._supervise(slot)) for slot in range(self._size)]
+
+    async def stop(self) -> None:
+        """Stop replacing engines and terminate the running ones."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for engine in self._engines:
+            if engine and engine.proc.poll() is None:
+                engine.proc.terminate()
+        if self._exits:
+            await asyncio.gather(*self._exits, return_exceptions=True)
+
+    def assign(
+        self,
+        call_id: int,
+        room_url: str,
+        token: str,
+        traceparent: Optional[str] = None,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> Optional[int]:
+        """Start a call on the least loaded engine with a free slot.
+
+        The call's spans continue the trace context `traceparent`, if given, and the call runs
+        with the profile payload `profile` applied over the engine's configuration.
+
+        Returns:
+            The PID of the engine running the call, or None if every engine is full.
+        """
+        candidates = [
+            engine
+            for engine in self._engines
+            if engine and engine.ready and len(engine.calls) < self._max_calls
+        ]
+        for engine in sorted(candidates, key=lambda e: len(e.calls)):
+            assignment = {
+                "call_id": call_id,
+                "room_url": room_url,
+                "token": token,
+                "traceparent": traceparent,
+                "profile": profile,
+            }
+            try:
+                engine.proc.stdin.write(json.dumps(assignment).encode() + b"\n")
+                engine.proc.stdin.flush()
+            except OSError as e:
+                logger.warning(f"Failed to hand call to engine {engine.proc.pid}: {e}")
+                continue
+            engine.calls.add(call_id)
+            logger.info(
+                f"Assigned call {call_id} to engine {engine.proc.pid} "
+                f"({len(engine.calls)}/{self._max_calls} calls)"
+            )
+            return engine.proc.pid
+        return None
+
+    async def _supervise(self, slot: int) -> None:
+        """Run the engine in `slot`, replacing it whenever it exits."""
+        while True:
+            try:
+                proc = await self._spawn()
+            except Exception as e:
+                logger.error(f"Failed to start engine: {e}")
+                await asyncio.sleep(RESPAWN_BACKOFF_SECS)
+                continue
+
+            engine = self._engines[slot] = Engine(proc=proc)
+            try:
+                async for message in read_messages(proc.stdout):
+                    match message.get("type"):
+                        case "ready":
+                            engine.ready = True
+                            logger.info(f"Engine {proc.pid} ready")
+                        case "finished":
+                            engine.calls.discard(message["call_id"])
+                            self._call_exited(message["call_id"], message["exit_code"])
+                        case "metrics" if self._on_message and message.get("call_id") is None:
+                            self._on_message(None, message)
+                        case _ if self._on_message and message.get("call_id") is not None:
+                            self._on_message(message["call_id"], message)
+            finally:
+                engine.ready = False
+
+            returncode = await asyncio.to_thread(proc.wait)
+            logger.error(
+                f"Engine {proc.pid} exited with code {returncode}, "
+                f"failing {len(engine.calls)} calls"
+            )
+            for call_id in engine.calls:
+                self._call_exited(call_id, None)
+            engine.calls.clear()
+            self._engines[slot] = None
+            await asyncio.sleep(RESPAWN_BACKOFF_SECS)
+
+    def _call_exited(self, call_id: int, exit_code: Optional[int]) -> None:
+        task = asyncio.create_task(self._dispatch(call_id, exit_code))
+        self._exits.add(task)
+        task.add_done_callback(self._exits.discard)
+
+    async def _dispatch(self, call_id: int, exit_code: Optional[int]) -> None:
+        try:
+            await self._on_call_exit(call_id, exit_code)
+        except Exception as e:
+            logger.error(f"Error handling exit of call {call_id}: {e}")
@@ -0,0 +1,123 @@
+"""In-process bus for bot lifecycle events.
+
+Lifecycle events (spawned, joined_room, first_audio_out, finished and the
+room's release) are published once and fanned out to every subscriber, so
+clients can follow bots over a single Server-Sent Events stream instead of
+polling their status. Recent bots keep their event history, which lets a
+client that subscribes after a connect still see the events it missed.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+# Events reported by the runners themselves over their channel
+RUNNER_EVENTS = {"joined_room", "first_audio_out"}
+
+# Events after which a bot produces no further events
+TERMINAL_EVENTS = {"room_deleted", "room_recycled", "room_release_failed"}
+
+
+@dataclass(eq=False)
+class _Subscriber:
+    bot_id: Optional[int]
+    queue: asyncio.Queue
+    dropped: bool = field(default=False)
+
+
+class EventBus:
+    """Publishes bot lifecycle events to subscribers.
+
+    Args:
+        history_bots: Number of most recent bots whose events are kept for replay.
+        queue_size: Events buffered per subscriber; slower subscribers are disconnected.
+        on_publish: Called with every published event, e.g. to share it with other workers.
+    """
+
+    def __init__(
+        self,
+        history_bots: int = 200,
+        queue_size: int = 256,
+        on_publish: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self._history: OrderedDict[int, List[Dict[str, Any]]] = OrderedDict()
+        self._history_bots = history_bots
+        self._queue_size = queue_size
+        self._on_publish = on_publish
+        self._subscribers: Set[_Subscriber] = set()
+
+    def close(self) -> None:
+        """End every open stream, e.g. before the server shuts down."""
+        for subscriber in list(self._subscribers):
+            subscriber.dropped = True
+            try:
+                subscriber.queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+        self._subscribers.clear()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def knows(self, bot_id: int) -> bool:
+        return bot_id in self._history
+
+    def publish(self, event: str, bot_id: int, **fields: Any) -> None:
+        """Record an event for a bot and deliver it to matching subscribers."""
+        message = {"event": event, "bot_id": bot_id, "time": time.time(), **fields}
+
+        history = self._history.get(bot_id)
+        if history is None:
+            history = self._history[bot_id] = []
+            while len(self._history) > self._history_bots:
+                self._history.popitem(last=False)
+        history.append(message)
+        if self._on_publish:
+            self._on_publish(message)
+
+        for subscriber in list(self._subscribers):
+            if subscriber.bot_id not in (None, bot_id):
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Let the client reconnect rather than buffering without bound
+                subscriber.dropped = True
+                self._subscribers.discard(subscriber)
+
+    async def subscribe(
+        self, bot_id: Optional[int] = None, keepalive: float = 15.0
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield events for one bot (replaying its history first) or for all bots.
+
+        A bot's stream ends after its terminal event. None is yielded every `keepalive`
+        seconds without events so callers can keep the connection open.
+        """
+        subscriber = _Subscriber(bot_id=bot_id, queue=asyncio.Queue(self._queue_size))
+        self._subscribers.add(subscriber)
+        # Events published from here on reach the queue, earlier ones come from the history
+        replay = list(self._history.get(bot_id, [])) if bot_id is not None else []
+        try:
+            for message in replay:
+                yield message
+                if message["event"] in TERMINAL_EVENTS:
+                    return
+
+            while True:
+                if subscriber.dropped and subscriber.queue.empty():
+                    return
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if message is None:
+                    return
+                yield message
+                if bot_id is not None and message["event"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            self._subscribers.discard(subscriber)
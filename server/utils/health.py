@@ -0,0 +1,219 @@
+"""Liveness and readiness with latency probes of the upstream providers.
+
+A load balancer needs to know more than whether the process answers: a node
+without free bot capacity, or whose calls would go through a slow Daily,
+Deepgram or LLM endpoint, should get no new connects. The monitor sends a
+lightweight request to each configured provider at a fixed interval and keeps
+a rolling window of latencies; a provider is degraded while the window's mean
+latency is above the limit or its recent probes failed. Probes are plain
+(name, URL, headers) entries, so any URL can be pointed at a local stand-in.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Mapping, Optional
+
+import aiohttp
+from loguru import logger
+
+# Probes for the TTS and LLM providers, by provider name: (URL, headers from the API key)
+PROVIDER_PROBES = {
+    "deepgram": (
+        "https://api.deepgram.com/v1/projects",
+        lambda key: {"Authorization": f"Token {key}"},
+    ),
+    "cartesia": (
+        "https://api.cartesia.ai/voices",
+        lambda key: {"X-API-Key": key, "Cartesia-Version": "2024-06-10"},
+    ),
+    "elevenlabs": ("https://api.elevenlabs.io/v1/user", lambda key: {"xi-api-key": key}),
+    # Rime has no cheap read endpoint; a GET of the TTS endpoint is answered without synthesis
+    "rime": ("https://users.rime.ai/v1/rime-tts", lambda key: {"Authorization": f"Bearer {key}"}),
+    "google": (
+        "https://generativelanguage.googleapis.com/v1beta/models",
+        lambda key: {"x-goog-api-key": key},
+    ),
+    "openai": ("https://api.openai.com/v1/models", lambda key: {"Authorization": f"Bearer {key}"}),
+}
+
+# Environment variables holding each provider's API key
+PROVIDER_KEYS = {
+    "deepgram": "DEEPGRAM_API_KEY",
+    "cartesia": "CARTESIA_API_KEY",
+    "elevenlabs": "ELEVENLABS_API_KEY",
+    "rime": "RIME_API_KEY",
+    "google": "GOOGLE_API_KEY",
+    "openai": "OPENAI_API_KEY",
+}
+
+
+@dataclass
+class Probe:
+    """A provider endpoint whose latency is sampled.
+
+    Any HTTP response below 500 counts as the provider being reachable, since
+    only the round trip matters; server errors, timeouts and connection
+    failures count as failed probes.
+    """
+
+    name: str
+    url: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    latencies: Deque[float] = field(default_factory=deque)
+    failures: int = 0  # Consecutive failed probes
+    last_error: Optional[str] = None
+    checked_at: Optional[float] = None
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Mean latency of the recent successful probes, in seconds."""
+        return sum(self.latencies) / len(self.latencies) if self.latencies else None
+
+
+def provider_probes(
+    names: Iterable[str],
+    daily_api_url: str,
+    daily_api_key: str,
+    env: Mapping[str, str],
+    urls: Optional[Mapping[str, str]] = None,
+) -> List[Probe]:
+    """Build probes for the named providers ("daily" or a key of `PROVIDER_PROBES`).
+
+    Args:
+        names: Providers to probe; duplicates are probed once.
+        daily_api_url: Daily REST API base URL; the probe reads the domain config.
+        daily_api_key: Daily API key.
+        env: Environment holding the providers' API keys.
+        urls: URLs replacing the default of some providers, e.g. local stand-ins.
+    """
+    urls = urls or {}
+    probes: Dict[str, Probe] = {}
+    for name in names:
+        if name in probes:
+            continue
+        if name == "daily":
+            probes[name] = Probe(
+                name,
+                urls.get(name, daily_api_url.rstrip("/") + "/"),
+                {"Authorization": f"Bearer {daily_api_key}"},
+            )
+        elif name in PROVIDER_PROBES:
+            url, headers = PROVIDER_PROBES[name]
+            probes[name] = Probe(
+                name, urls.get(name, url), headers(env.get(PROVIDER_KEYS[name]) or "")
+            )
+        else:
+            raise ValueError(f"Unknown health probe: {name}")
+    return list(probes.values())
+
+
+class HealthMonitor:
+    """Probes providers in the background and judges whether they are degraded.
+
+    Args:
+        probes: Probes to run; more can be added with `add`.
+        interval: Seconds between rounds of probes.
+        timeout: Seconds after which a probe counts as failed.
+        window: Successful probes averaged per provider.
+        max_latency: Mean latency (seconds) above which a provider is degraded.
+        max_failures: Consecutive failed probes after which a provider is degraded.
+    """
+
+    def __init__(
+        self,
+        probes: Iterable[Probe] = (),
+        interval: float = 15.0,
+        timeout: float = 5.0,
+        window: int = 5,
+        max_latency: float = 2.0,
+        max_failures: int = 3,
+    ):
+        self._probes: Dict[str, Probe] = {}
+        self._interval = interval
+        self._timeout = timeout
+        self._window = max(1, window)
+        self._max_latency = max_latency
+        self._max_failures = max(1, max_failures)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._task: Optional[asyncio.Task] = None
+        for probe in probes:
+            self.add(probe)
+
+    def add(self, probe: Probe) -> None:
+        """Add a probe, replacing any probe with the same name."""
+        probe.latencies = deque(probe.latencies, maxlen=self._window)
+        self._probes[probe.name] = probe
+
+    def start(self, session: aiohttp.ClientSession) -> None:
+        """Start probing in the background using the given session."""
+        self._session = session
+        if self._probes:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def check(self) -> None:
+        """Run every probe once."""
+        await asyncio.gather(*(self._check(probe) for probe in self._probes.values()))
+
+    def degraded(self) -> Dict[str, str]:
+        """Providers that are degraded or not probed yet, with the reason."""
+        reasons = {}
+        for probe in self._probes.values():
+            latency = probe.latency
+            if probe.failures >= self._max_failures or (probe.failures and latency is None):
+                reasons[probe.name] = f"{probe.failures} failed probes ({probe.last_error})"
+            elif probe.checked_at is None:
+                reasons[probe.name] = "not probed yet"
+            elif latency is not None and latency > self._max_latency:
+                reasons[probe.name] = f"latency {latency * 1000:.0f} ms"
+        return reasons
+
+    def snapshot(self) -> Dict[str, Any]:
+        degraded = self.degraded()
+        return {
+            probe.name: {
+                "latency_ms": round(probe.latency * 1000, 1) if probe.latency is not None else None,
+                "samples": len(probe.latencies),
+                "failures": probe.failures,
+                "last_error": probe.last_error,
+                "degraded": degraded.get(probe.name),
+            }
+            for probe in self._probes.values()
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self._interval)
+
+    async def _check(self, probe: Probe) -> None:
+        started = time.monotonic()
+        try:
+            async with self._session.get(
+                probe.url,
+                headers=probe.headers,
+                timeout=aiohttp.ClientTimeout(total=self._timeout),
+            ) as response:
+                if response.status >= 500:
+                    raise aiohttp.ClientResponseError(
+                        response.request_info, (), status=response.status, message=response.reason
+                    )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            probe.failures += 1
+            probe.last_error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            if probe.failures == self._max_failures:
+                logger.warning(f"Health probe {probe.name} failed {probe.failures} times: {e}")
+        else:
+            probe.latencies.append(time.monotonic() - started)
+            probe.failures = 0
+            probe.last_error = None
+        probe.checked_at = time.time()
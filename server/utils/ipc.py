@@ -0,0 +1,53 @@
+"""Line-delimited JSON channel between the server and its bot processes.
+
+A runner that opens the channel keeps its original stdout pipe for channel
+messages and redirects its own stdout to stderr, so stray prints from
+libraries can never corrupt the stream. The server reads the other end of
+the pipe asynchronously, one JSON object per line.
+"""
+
+import asyncio
+import json
+import os
+import sys
+from typing import IO, Any, AsyncIterator, Dict
+
+from loguru import logger
+
+
+class ChannelWriter:
+    """Runner side of the channel."""
+
+    def __init__(self, stream: IO[str]):
+        self._stream = stream
+
+    def send(self, message_type: str, **fields: Any) -> None:
+        """Send a message to the server. Errors are ignored if the server has gone away."""
+        try:
+            self._stream.write(json.dumps({"type": message_type, **fields}) + "\n")
+            self._stream.flush()
+        except (BrokenPipeError, ValueError):
+            pass
+
+
+def open_channel() -> ChannelWriter:
+    """Take over stdout as the channel and route regular stdout output to stderr."""
+    sys.stdout.flush()
+    stream = os.fdopen(os.dup(sys.stdout.fileno()), "w", buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    return ChannelWriter(stream)
+
+
+async def read_messages(pipe: IO[bytes]) -> AsyncIterator[Dict[str, Any]]:
+    """Yield messages sent by a bot process until it closes its end of the pipe."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+    try:
+        async for line in reader:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Ignoring malformed channel message: {line!r}")
+    finally:
+        transport.close()
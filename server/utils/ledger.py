@@ -0,0 +1,518 @@
+"""Durable ledger of bots and Daily rooms.
+
+The registry and room pool live in memory, so a crash or restart used to
+leak every running bot process and every room the server had created. The
+ledger writes each bot start and exit and each room creation and deletion to
+a local SQLite database in WAL mode. On startup, bots that an earlier server
+instance left running are terminated and its rooms are marked orphaned. A
+garbage collector then deletes orphaned rooms in rate-limited batches,
+together with rooms whose release failed at runtime, so leaks stay bounded
+across crashes.
+
+The ledger is also the state shared by the workers of a multi-worker server.
+Every worker registers as an instance and refreshes a heartbeat, and only
+instances whose process is gone or whose heartbeat stopped are taken over.
+Bot counts per host and per room, status lookups of bots started by another
+worker, the lifecycle events streamed for them and drain requests all go
+through it. Reads never block the writer
+thanks to WAL.
+
+Workers still contend for the write lock, which SQLite waits out for up to its
+busy timeout, so the event loop never runs ledger queries itself: coroutines
+await them on the ledger's own thread, sync callbacks queue writes there, and
+admission reads the other workers' bot count from a cache that the ledger
+maintenance refreshes.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, TypeVar
+
+from loguru import logger
+
+from .events import TERMINAL_EVENTS
+from .registry import BotRecord
+
+# Finished bots are kept in the ledger for this long
+BOT_RETENTION_SECS = 7 * 24 * 3600
+
+# Lifecycle events are kept for this long, for streams of bots of another worker
+EVENT_RETENTION_SECS = 3600
+
+# Backoff between attempts to delete an orphaned room
+GC_BACKOFF_BASE_SECS = 5.0
+GC_BACKOFF_MAX_SECS = 600.0
+
+# How often the collector looks for orphaned rooms when it was not notified
+GC_SWEEP_SECS = 30.0
+
+# A collector claims the rooms it is deleting for this long, so other workers skip them
+GC_CLAIM_SECS = 60.0
+
+# Instances refresh their heartbeat this often; one whose process is gone or whose
+# heartbeat is older than the timeout is taken over by the others
+INSTANCE_HEARTBEAT_SECS = 5.0
+INSTANCE_TIMEOUT_SECS = 30.0
+
+# How often workers refresh the cached state of the others (bot count, drain requests)
+SHARED_STATE_REFRESH_SECS = 1.0
+
+T = TypeVar("T")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bots (
+    bot_id INTEGER PRIMARY KEY,
+    pid INTEGER NOT NULL,
+    room_url TEXT NOT NULL,
+    host TEXT,
+    instance TEXT NOT NULL,
+    state TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    exit_code INTEGER
+);
+CREATE INDEX IF NOT EXISTS bots_state ON bots (state);
+CREATE TABLE IF NOT EXISTS rooms (
+    url TEXT PRIMARY KEY,
+    instance TEXT NOT NULL,
+    state TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS rooms_orphaned ON rooms (state, next_attempt_at);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    bot_id INTEGER NOT NULL,
+    time REAL NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_bot ON events (bot_id, seq);
+CREATE INDEX IF NOT EXISTS events_time ON events (time);
+CREATE TABLE IF NOT EXISTS instances (
+    instance TEXT PRIMARY KEY,
+    pid INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    heartbeat_at REAL NOT NULL,
+    drain TEXT,
+    drained INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def is_runner_process(pid: int, runner: str) -> bool:
+    """Whether `pid` is a running bot runner, so a reused PID is never terminated."""
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            args = f.read().decode(errors="replace").split("\0")
+    except OSError:
+        return False
+    return any(arg.endswith(runner) for arg in args[:3])
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Ledger:
+    """SQLite record of bot lifecycles and the rooms this server owns.
+
+    Every server instance (each worker of a multi-worker server) writes under a random
+    instance ID, which tells its own rows from those a dead instance left behind.
+
+    Queries block, so async code goes through `run` and `submit`, which execute them in
+    order on a single ledger thread: a bot's exit is never written before its start.
+
+    Args:
+        path: Database file.
+    """
+
+    def __init__(self, path: str):
+        self.instance = uuid.uuid4().hex
+        # Sync endpoints run in a thread pool, so the connection is shared under a lock
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.row_factory = sqlite3.Row
+        # WAL with synchronous=NORMAL keeps each write to a single append without fsync
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ledger")
+        # Running bots of the other instances, as of the last `refresh_others`
+        self.others_active = 0
+
+    def close(self) -> None:
+        self._thread.shutdown()
+        with self._lock:
+            self._db.execute("DELETE FROM instances WHERE instance = ?", (self.instance,))
+            self._db.close()
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Await `fn(*args)`, one of this ledger's methods, on the ledger thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._thread, fn, *args)
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> None:
+        """Queue a write on the ledger thread without waiting for it. Failures are logged."""
+        self._thread.submit(self._write, fn, *args)
+
+    @staticmethod
+    def _write(fn: Callable[..., Any], *args: Any) -> None:
+        try:
+            fn(*args)
+        except sqlite3.Error as e:
+            logger.error(f"Ledger write {fn.__name__} failed: {e}")
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def register(self) -> None:
+        """Record this instance as live, joining a drain its sibling workers are in."""
+        drain = next((row["drain"] for row in self._live() if row["drain"]), None)
+        now = time.time()
+        self._execute(
+            "INSERT OR REPLACE INTO instances (instance, pid, started_at, heartbeat_at, drain)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (self.instance, os.getpid(), now, now, drain),
+        )
+
+    def heartbeat(self) -> None:
+        self._execute(
+            "UPDATE instances SET heartbeat_at = ? WHERE instance = ?",
+            (time.time(), self.instance),
+        )
+
+    def drain_requested(self) -> Optional[str]:
+        """Reason of a drain requested through any worker, or None."""
+        rows = self._execute("SELECT drain FROM instances WHERE instance = ?", (self.instance,))
+        return rows[0]["drain"] if rows else None
+
+    def request_drain(self, reason: str) -> None:
+        """Ask every worker to drain."""
+        self._execute("UPDATE instances SET drain = ? WHERE drain IS NULL", (reason,))
+
+    def instance_drained(self) -> bool:
+        """Record that this instance finished draining.
+
+        Returns:
+            Whether every live instance has finished draining.
+        """
+        self._execute("UPDATE instances SET drained = 1 WHERE instance = ?", (self.instance,))
+        return all(row["drained"] for row in self._live())
+
+    def _live(self) -> List[sqlite3.Row]:
+        rows = self._execute(
+            "SELECT * FROM instances WHERE heartbeat_at >= ?",
+            (time.time() - INSTANCE_TIMEOUT_SECS,),
+        )
+        return [row for row in rows if row["instance"] == self.instance or pid_alive(row["pid"])]
+
+    def _live_ids(self) -> Set[str]:
+        return {row["instance"] for row in self._live()} | {self.instance}
+
+    def bot_started(self, record: BotRecord) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO bots (bot_id, pid, room_url, host, instance, state, started_at)"
+            " VALUES (?, ?, ?, ?, ?, 'running', ?)",
+            (
+                record.bot_id,
+                record.pid,
+                record.room_url,
+                record.host,
+                self.instance,
+                record.started_at,
+            ),
+        )
+
+    def bot_finished(self, record: BotRecord) -> None:
+        self._execute(
+            "UPDATE bots SET state = ?, ended_at = ?, exit_code = ? WHERE bot_id = ?",
+            (record.state, record.ended_at, record.exit_code, record.bot_id),
+        )
+
+    def room_created(self, room_url: str) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO rooms (url, instance, state, created_at)"
+            " VALUES (?, ?, 'active', ?)",
+            (room_url, self.instance, time.time()),
+        )
+
+    def room_deleted(self, room_url: str) -> None:
+        self._execute("DELETE FROM rooms WHERE url = ?", (room_url,))
+
+    def room_orphaned(self, room_url: str) -> None:
+        """Hand a room whose deletion failed to the garbage collector."""
+        self._execute(
+            "INSERT INTO rooms (url, instance, state, created_at) VALUES (?, ?, 'orphaned', ?)"
+            " ON CONFLICT (url) DO UPDATE SET state = 'orphaned'",
+            (room_url, self.instance, time.time()),
+        )
+
+    def orphaned_rooms(self, limit: int) -> List[str]:
+        """Claim orphaned rooms due for a deletion attempt.
+
+        The claimed rooms are not due again for `GC_CLAIM_SECS`, so the collectors of
+        other workers skip them, and a worker that dies mid-deletion only delays them.
+        """
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            urls = [
+                row["url"]
+                for row in self._db.execute(
+                    "SELECT url FROM rooms WHERE state = 'orphaned' AND next_attempt_at <= ?"
+                    " ORDER BY next_attempt_at LIMIT ?",
+                    (now, limit),
+                )
+            ]
+            self._db.executemany(
+                "UPDATE rooms SET next_attempt_at = ? WHERE url = ?",
+                [(now + GC_CLAIM_SECS, url) for url in urls],
+            )
+        return urls
+
+    def room_delete_failed(self, room_url: str) -> None:
+        rows = self._execute("SELECT attempts FROM rooms WHERE url = ?", (room_url,))
+        if not rows:
+            return
+        attempts = rows[0]["attempts"] + 1
+        backoff = min(GC_BACKOFF_MAX_SECS, GC_BACKOFF_BASE_SECS * 2 ** (attempts - 1))
+        self._execute(
+            "UPDATE rooms SET attempts = ?, next_attempt_at = ? WHERE url = ?",
+            (attempts, time.time() + backoff, room_url),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._execute("SELECT state, COUNT(*) AS n FROM rooms GROUP BY state")
+        return {f"rooms_{row['state']}": row["n"] for row in rows}
+
+    def active_count(self) -> int:
+        """Number of running bots across all instances."""
+        return self._execute("SELECT COUNT(*) AS n FROM bots WHERE state = 'running'")[0]["n"]
+
+    def refresh_others(self) -> None:
+        """Refresh `others_active` from the ledger."""
+        rows = self._execute(
+            "SELECT COUNT(*) AS n FROM bots WHERE state = 'running' AND instance != ?",
+            (self.instance,),
+        )
+        self.others_active = rows[0]["n"]
+
+    def count_in_room(self, room_url: str) -> int:
+        """Number of running bots in a room across all instances."""
+        rows = self._execute(
+            "SELECT COUNT(*) AS n FROM bots WHERE state = 'running' AND room_url = ?",
+            (room_url,),
+        )
+        return rows[0]["n"]
+
+    def bots_per_room(self) -> Dict[str, int]:
+        rows = self._execute(
+            "SELECT room_url, COUNT(*) AS n FROM bots WHERE state = 'running' GROUP BY room_url"
+        )
+        return {row["room_url"]: row["n"] for row in rows}
+
+    def event_published(self, message: Dict[str, Any]) -> None:
+        """Record a lifecycle event, for streams served by the other workers."""
+        self._execute(
+            "INSERT INTO events (bot_id, time, message) VALUES (?, ?, ?)",
+            (message["bot_id"], message["time"], json.dumps(message)),
+        )
+
+    def events_since(self, bot_id: int, seq: int) -> List[tuple]:
+        """Events of a bot recorded after `seq`, as (seq, message) pairs."""
+        rows = self._execute(
+            "SELECT seq, message FROM events WHERE bot_id = ? AND seq > ? ORDER BY seq",
+            (bot_id, seq),
+        )
+        return [(row["seq"], json.loads(row["message"])) for row in rows]
+
+    async def follow_events(
+        self, bot_id: int, keepalive: float = 15.0
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield the recorded events of a bot, polling for new ones like `EventBus.subscribe`.
+
+        The stream ends after the bot's terminal event, or once the bot is no longer running
+        and no event arrived for `keepalive` seconds (e.g. its worker died).
+        """
+        seq = 0
+        idle = 0.0
+        while True:
+            events = await self.run(self.events_since, bot_id, seq)
+            for seq, message in events:
+                yield message
+                if message["event"] in TERMINAL_EVENTS:
+                    return
+            if events:
+                idle = 0.0
+            elif idle >= keepalive:
+                bot = await self.run(self.get_bot, bot_id)
+                if not bot or bot["status"] != "running":
+                    return
+                yield None
+                idle = 0.0
+            await asyncio.sleep(SHARED_STATE_REFRESH_SECS)
+            idle += SHARED_STATE_REFRESH_SECS
+
+    def get_bot(self, bot_id: int) -> Optional[Dict[str, Any]]:
+        """Status of a bot started by any instance, shaped like `BotRecord.to_dict`."""
+        rows = self._execute("SELECT * FROM bots WHERE bot_id = ?", (bot_id,))
+        if not rows:
+            return None
+        row = rows[0]
+        end = row["ended_at"] or time.time()
+        return {
+            "bot_id": row["bot_id"],
+            "pid": row["pid"],
+            "host": row["host"],
+            "status": row["state"],
+            "started_at": row["started_at"],
+            "ended_at": row["ended_at"],
+            "duration": round(end - row["started_at"], 3),
+            "exit_code": row["exit_code"],
+        }
+
+    def instances(self) -> Dict[str, Any]:
+        """Live instances and the bots they run, for the status endpoint."""
+        live = self._live()
+        return {
+            "workers": len(live),
+            "draining": sum(1 for row in live if row["drain"]),
+            "active": self.active_count(),
+        }
+
+    def reconcile(self, runner: str) -> List[int]:
+        """Take over what dead server instances left behind.
+
+        Their running bots are marked lost and their rooms orphaned, and finished bots
+        past the retention period are dropped. Safe to call periodically from every
+        live instance.
+
+        Args:
+            runner: Runner script name, used to recognise leftover local bot processes.
+
+        Returns:
+            PIDs of leftover bot processes that are still running and should be stopped.
+        """
+        now = time.time()
+        live = self._live_ids()
+        rows = [
+            row
+            for row in self._execute("SELECT pid, host, instance FROM bots WHERE state = 'running'")
+            if row["instance"] not in live
+        ]
+        pids = sorted(
+            {
+                row["pid"]
+                for row in rows
+                if not row["host"] and is_runner_process(row["pid"], runner)
+            }
+        )
+        dead = f"instance NOT IN ({', '.join('?' * len(live))})"
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute(
+                f"UPDATE bots SET state = 'lost', ended_at = ? WHERE state = 'running' AND {dead}",
+                (now, *live),
+            )
+            orphaned = self._db.execute(
+                f"UPDATE rooms SET state = 'orphaned' WHERE state = 'active' AND {dead}",
+                tuple(live),
+            ).rowcount
+            self._db.execute(f"DELETE FROM instances WHERE {dead}", tuple(live))
+            self._db.execute(
+                "DELETE FROM bots WHERE state != 'running' AND ended_at < ?",
+                (now - BOT_RETENTION_SECS,),
+            )
+            self._db.execute("DELETE FROM events WHERE time < ?", (now - EVENT_RETENTION_SECS,))
+        if rows or orphaned:
+            logger.warning(
+                f"Ledger: {len(rows)} bots of dead server instances were still running "
+                f"({len(pids)} processes left), {orphaned} of their rooms orphaned"
+            )
+        return pids
+
+
+class RoomGarbageCollector:
+    """Deletes orphaned rooms in rate-limited batches, retrying failures with backoff.
+
+    Args:
+        ledger: Ledger holding the orphaned rooms.
+        delete: Coroutine function deleting a room by URL.
+        batch_size: Rooms deleted concurrently per batch.
+        interval: Minimum seconds between batches.
+    """
+
+    def __init__(
+        self,
+        ledger: Ledger,
+        delete: Callable[[str], Awaitable[Any]],
+        batch_size: int = 5,
+        interval: float = 1.0,
+    ):
+        self._ledger = ledger
+        self._delete = delete
+        self._batch_size = batch_size
+        self._interval = interval
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def notify(self) -> None:
+        """Signal that rooms were orphaned."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        failures = 0
+        while True:
+            try:
+                urls = await self._ledger.run(self._ledger.orphaned_rooms, self._batch_size)
+            except sqlite3.Error as e:
+                # E.g. "database is locked" while other workers write; keep collecting
+                failures += 1
+                backoff = min(GC_BACKOFF_MAX_SECS, GC_BACKOFF_BASE_SECS * 2 ** (failures - 1))
+                logger.error(f"Failed to look up orphaned rooms, retrying in {backoff:.0f}s: {e}")
+                await asyncio.sleep(backoff)
+                continue
+            failures = 0
+            if not urls:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), GC_SWEEP_SECS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            results = await asyncio.gather(
+                *(self._delete(url) for url in urls), return_exceptions=True
+            )
+            for url, result in zip(urls, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to delete orphaned room {url}: {result}")
+                    self._ledger.submit(self._ledger.room_delete_failed, url)
+                else:
+                    logger.info(f"Deleted orphaned room {url}")
+                    self._ledger.submit(self._ledger.room_deleted, url)
+            await asyncio.sleep(self._interval)
@@ -0,0 +1,207 @@
+"""Event-loop lag monitoring for bot runners.
+
+A bot's whole pipeline runs on one asyncio loop, so any callback that blocks
+it (synchronous I/O or parsing, large log formatting, a slow transport
+callback) delays every audio frame queued behind it. The monitor measures the
+loop's scheduling lag with a periodic timer and keeps a histogram of it. A
+watchdog thread notices when the timer has not run for longer than the slow
+callback threshold, snapshots the loop thread's stack and names the code
+that is blocking the loop. Lag histograms and slow callbacks are reported as
+`metrics` items labelled with the loop policy, so runners on asyncio and on
+uvloop can be compared on the same /metrics.
+"""
+
+import asyncio
+import os
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+from types import FrameType
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from utils.metrics import LOOP_LAG_BUCKETS, Histogram
+
+# Stack frames logged per slow callback, innermost last
+STACK_LIMIT = 15
+
+# Directories of the event loop implementations
+_LOOP_DIRS = (os.path.dirname(asyncio.__file__) + os.sep, os.sep + "uvloop" + os.sep)
+
+_PATHS = sysconfig.get_paths()
+_STDLIB_DIRS = tuple({_PATHS["stdlib"] + os.sep, _PATHS["platstdlib"] + os.sep})
+_SITE_DIRS = tuple({_PATHS["purelib"] + os.sep, _PATHS["platlib"] + os.sep})
+
+
+def _is_loop_frame(frame: FrameType) -> bool:
+    return any(part in frame.f_code.co_filename for part in _LOOP_DIRS)
+
+
+def _is_stdlib_frame(frame: FrameType) -> bool:
+    filename = frame.f_code.co_filename
+    if filename.startswith("<frozen"):
+        return True
+    return filename.startswith(_STDLIB_DIRS) and not filename.startswith(_SITE_DIRS)
+
+
+def _frame_name(frame: FrameType) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_qualname}"
+
+
+def callback_name(frame: FrameType) -> str:
+    """Name of the code blocking a loop thread, given the thread's innermost frame.
+
+    That is the innermost frame run by the loop that is not part of the standard library, e.g.
+    the function making a synchronous call, so a blocking `json.dumps` or `strptime` is charged
+    to its caller. A builtin scheduled directly on the loop is named from its handle, where the
+    loop implementation exposes it.
+    """
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    start = next((i for i, f in enumerate(frames) if _is_loop_frame(f)), 0)
+    inside = frames[start:]
+    for f in reversed(inside):
+        if not _is_stdlib_frame(f):
+            return _frame_name(f)
+    for f in reversed(inside):
+        handle = f.f_locals.get("self") if f.f_code.co_name == "_run" else None
+        if isinstance(handle, asyncio.Handle):
+            callback = handle._callback
+            qualname = getattr(callback, "__qualname__", type(callback).__qualname__)
+            return f"{getattr(callback, '__module__', None) or '?'}.{qualname}"
+    if not frames or _is_loop_frame(frames[-1]):
+        # The loop itself is running a builtin, as uvloop does without a visible handle
+        return "<builtin callback>"
+    return _frame_name(frames[-1])
+
+
+class LoopMonitor:
+    """Samples the running loop's lag and reports callbacks that block it.
+
+    Args:
+        report: Called with `metrics` items (lag histogram deltas and slow callbacks).
+        policy: Loop policy the items are labelled with, e.g. "asyncio" or "uvloop".
+        interval: Seconds between lag samples.
+        slow_callback: Seconds a callback may block the loop before it is reported.
+        report_interval: Seconds between reports of the lag histogram.
+    """
+
+    def __init__(
+        self,
+        report: Callable[[List[Dict[str, Any]]], None],
+        policy: str,
+        interval: float = 0.02,
+        slow_callback: float = 0.05,
+        report_interval: float = 10.0,
+    ):
+        self._report = report
+        self._policy = policy
+        self._interval = interval
+        self._slow_callback = slow_callback
+        self._report_interval = report_interval
+        self._histogram = Histogram(LOOP_LAG_BUCKETS)
+        self._slow: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._beat = time.monotonic()
+        # Callback name and stack captured by the watchdog during the current stall
+        self._stall: Optional[tuple] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling the running loop."""
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop sampling and report what has not been reported yet."""
+        self._stopping.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog:
+            self._watchdog.join(timeout=1)
+        self.flush()
+
+    def flush(self) -> None:
+        """Report the lag histogram since the last report and the slow callbacks."""
+        with self._lock:
+            histogram, self._histogram = self._histogram, Histogram(LOOP_LAG_BUCKETS)
+            slow, self._slow = self._slow, []
+        items = slow
+        if histogram.count:
+            items.append(
+                {
+                    "kind": "loop_lag",
+                    "policy": self._policy,
+                    "counts": histogram.counts,
+                    "sum": histogram.sum,
+                    "count": histogram.count,
+                }
+            )
+        if items:
+            self._report(items)
+
+    async def _sample(self) -> None:
+        next_report = time.monotonic() + self._report_interval
+        while True:
+            expected = time.monotonic() + self._interval
+            await asyncio.sleep(self._interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            with self._lock:
+                self._beat = now
+                stall, self._stall = self._stall, None
+                self._histogram.observe(lag)
+            if lag >= self._slow_callback:
+                self._record_slow(lag, stall)
+            if now >= next_report:
+                self.flush()
+                next_report = now + self._report_interval
+
+    def _record_slow(self, lag: float, stall: Optional[tuple]) -> None:
+        # A stall shorter than the watchdog's check period may end before it is noticed
+        name, stack = stall or ("<unidentified>", [])
+        with self._lock:
+            self._slow.append(
+                {"kind": "slow_callback", "policy": self._policy, "callback": name, "value": lag}
+            )
+        logger.warning(
+            f"Event loop blocked for {lag * 1000:.0f} ms by {name}"
+            + ("\n" + "".join(stack) if stack else "")
+        )
+
+    def _watch(self) -> None:
+        stalled_beat = None
+        while not self._stopping.wait(self._slow_callback / 4):
+            with self._lock:
+                beat = self._beat
+            if (
+                beat == stalled_beat
+                or time.monotonic() - beat < self._interval + self._slow_callback
+            ):
+                continue
+            # The loop has not run the sampler for too long: snapshot what it is running
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stall = (callback_name(frame), traceback.format_stack(frame, limit=STACK_LIMIT))
+            del frame
+            with self._lock:
+                if self._beat == beat:
+                    self._stall = stall
+            stalled_beat = beat
@@ -0,0 +1,177 @@
+"""Local signing of Daily meeting tokens.
+
+Daily accepts self-signed meeting tokens: HS256 JWTs signed with the domain's
+API key, carrying the domain ID and room name as claims. Signing them locally
+removes the `POST /meeting-tokens` round trip from the connect path.
+
+Reference: https://docs.daily.co/guides/privacy-and-security/controlling-who-joins-a-meeting#self-signing-tokens
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+from pipecat.transports.services.helpers.daily_rest import (
+    DailyMeetingTokenParams,
+    DailyRESTHelper,
+)
+
+# Cached tokens are reused while they still cover the requested lifetime minus this slack
+TOKEN_REUSE_SLACK_SECS = 60
+
+# Meeting token properties that can be expressed as self-signed claims
+PROPERTY_CLAIMS = {
+    "room_name": "r",
+    "exp": "exp",
+    "nbf": "nbf",
+    "is_owner": "o",
+    "user_name": "u",
+    "user_id": "ud",
+    "eject_at_token_exp": "ejt",
+    "eject_after_elapsed": "eje",
+}
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signature(api_key: str, signing_input: str) -> str:
+    return _b64encode(hmac.new(api_key.encode(), signing_input.encode(), hashlib.sha256).digest())
+
+
+def sign_meeting_token(api_key: str, claims: Dict[str, Any]) -> str:
+    """Sign a meeting token with the given claims."""
+    header = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    signing_input = f"{header}.{payload}"
+    return f"{signing_input}.{_signature(api_key, signing_input)}"
+
+
+def decode_meeting_token(api_key: str, token: str) -> Dict[str, Any]:
+    """Verify a self-signed meeting token and return its claims.
+
+    Raises:
+        ValueError: If the token is malformed, incorrectly signed, expired or not yet valid.
+    """
+    try:
+        header, payload, signature = token.split(".")
+        claims = json.loads(_b64decode(payload))
+    except ValueError as e:
+        raise ValueError(f"Malformed meeting token: {e}")
+
+    if json.loads(_b64decode(header)).get("alg") != "HS256":
+        raise ValueError("Unsupported meeting token algorithm")
+    if not hmac.compare_digest(signature, _signature(api_key, f"{header}.{payload}")):
+        raise ValueError("Invalid meeting token signature")
+
+    now = time.time()
+    if "exp" in claims and claims["exp"] < now:
+        raise ValueError("Meeting token expired")
+    if "nbf" in claims and claims["nbf"] > now:
+        raise ValueError("Meeting token not yet valid")
+    return claims
+
+
+class LocalTokenDailyRESTHelper(DailyRESTHelper):
+    """DailyRESTHelper that signs meeting tokens locally instead of calling the REST API.
+
+    Tokens are cached per room and reused while they still cover the requested
+    lifetime, until the room is deleted or `forget_tokens` is called for it; tokens
+    requested with properties are never cached. Token requests with properties that
+    cannot be self-signed are forwarded to the REST API.
+
+    Args:
+        domain_id: Daily domain ID. Fetched from the API on first use if not given.
+        cache_size: Maximum number of rooms whose tokens are cached.
+    """
+
+    def __init__(
+        self,
+        *,
+        daily_api_key: str,
+        daily_api_url: str = "https://api.daily.co/v1",
+        aiohttp_session: aiohttp.ClientSession,
+        domain_id: Optional[str] = None,
+        cache_size: int = 256,
+    ):
+        super().__init__(
+            daily_api_key=daily_api_key,
+            daily_api_url=daily_api_url,
+            aiohttp_session=aiohttp_session,
+        )
+        self._domain_id = domain_id
+        self._cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, bool], Tuple[str, int]]" = OrderedDict()
+
+    async def get_domain_id(self) -> str:
+        """Return the Daily domain ID, fetching it from the domain config once."""
+        if self._domain_id:
+            return self._domain_id
+
+        headers = {"Authorization": f"Bearer {self.daily_api_key}"}
+        async with self.aiohttp_session.get(f"{self.daily_api_url}/", headers=headers) as r:
+            if r.status != 200:
+                text = await r.text()
+                raise Exception(f"Failed to fetch Daily domain (status: {r.status}): {text}")
+            data = await r.json()
+
+        self._domain_id = data["domain_id"]
+        return self._domain_id
+
+    async def get_token(
+        self,
+        room_url: str,
+        expiry_time: float = 60 * 60,
+        owner: bool = True,
+        params: Optional[DailyMeetingTokenParams] = None,
+    ) -> str:
+        if not room_url:
+            raise Exception(
+                "No Daily room specified. You must specify a Daily room in order a token to be generated."
+            )
+
+        properties = params.properties.model_dump(exclude_none=True) if params else {}
+        if set(properties) - set(PROPERTY_CLAIMS):
+            return await super().get_token(room_url, expiry_time, owner, params)
+
+        room_name = self.get_name_from_url(room_url)
+        now = int(time.time())
+        key = (room_name, owner)
+        if not properties and key in self._cache:
+            token, exp = self._cache[key]
+            if exp - now >= expiry_time - TOKEN_REUSE_SLACK_SECS:
+                self._cache.move_to_end(key)
+                return token
+
+        properties.update(room_name=room_name, is_owner=owner, exp=int(now + expiry_time))
+        claims = {PROPERTY_CLAIMS[name]: value for name, value in properties.items()}
+        claims.update(d=await self.get_domain_id(), iat=now)
+        token = sign_meeting_token(self.daily_api_key, claims)
+
+        if not params:
+            self._cache[key] = (token, claims["exp"])
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return token
+
+    def forget_tokens(self, room_url: str) -> None:
+        """Drop the room's cached tokens, so that none is handed out again for another call."""
+        room_name = self.get_name_from_url(room_url)
+        self._cache.pop((room_name, True), None)
+        self._cache.pop((room_name, False), None)
+
+    async def delete_room_by_name(self, room_name: str) -> bool:
+        self._cache.pop((room_name, True), None)
+        self._cache.pop((room_name, False), None)
+        return await super().delete_room_by_name(room_name)
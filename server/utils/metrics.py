@@ -0,0 +1,348 @@
+"""Fleet-wide aggregation of pipeline metrics in Prometheus text format.
+
+Runners forward the TTFB, processing-time and usage metrics of their
+pipelines over the channel as `metrics` messages. The collector folds them
+into histograms and counters labelled by provider (the pipeline processor),
+model and flow node, so latency can be tracked across all bots, including
+those that have already exited. Runners with the loop monitor enabled also
+report their event-loop lag and slow callbacks, labelled by loop policy.
+"""
+
+import math
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+# Event-loop lag histogram bucket upper bounds, in seconds
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Labels every pipeline metric is broken down by
+LABEL_NAMES = ("provider", "model", "node")
+
+# Labels of the runners' event-loop metrics
+LOOP_LABEL_NAMES = ("policy",)
+SLOW_CALLBACK_LABEL_NAMES = ("policy", "callback")
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_metric(
+    name: str,
+    metric_type: str,
+    help_text: str,
+    samples: Dict[Labels, float],
+    label_names: Tuple[str, ...] = (),
+) -> List[str]:
+    """Render a gauge or counter family with one sample per label set."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for values, value in samples.items():
+        lines.append(f"{name}{_labels(label_names, values)} {_number(value)}")
+    return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram for one label set."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def merge(self, counts: List[int], total: float, count: int) -> None:
+        """Add observations already bucketed with the same bounds, e.g. by a runner."""
+        if len(counts) != len(self.counts):
+            raise ValueError(f"Expected {len(self.counts)} bucket counts, got {len(counts)}")
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.sum += total
+        self.count += count
+
+
+class MetricsCollector:
+    """Aggregates pipeline metrics reported by runners."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self._buckets = buckets
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {
+            "ttfb": {},
+            "processing": {},
+            "loop_lag": {},
+        }
+        self._counters: Dict[str, Dict[Labels, float]] = {
+            "prompt_tokens": defaultdict(float),
+            "completion_tokens": defaultdict(float),
+            "tts_characters": defaultdict(float),
+            "slow_callbacks": defaultdict(float),
+            "slow_callback_seconds": defaultdict(float),
+        }
+        self.messages = 0
+
+    def record(self, message: Dict[str, Any]) -> None:
+        """Fold a runner's `metrics` message into the aggregates."""
+        self.messages += 1
+        node = message.get("node") or ""
+        for item in message.get("data", []):
+            labels = (_provider(item.get("processor", "")), item.get("model") or "", node)
+            match item.get("kind"):
+                case "ttfb" | "processing" as kind:
+                    histograms = self._histograms[kind]
+                    if labels not in histograms:
+                        histograms[labels] = Histogram(self._buckets)
+                    histograms[labels].observe(item["value"])
+                case "llm_usage":
+                    self._counters["prompt_tokens"][labels] += item["prompt_tokens"]
+                    self._counters["completion_tokens"][labels] += item["completion_tokens"]
+                case "tts_usage":
+                    self._counters["tts_characters"][labels] += item["characters"]
+                case "loop_lag":
+                    histograms = self._histograms["loop_lag"]
+                    policy = (item.get("policy") or "",)
+                    if policy not in histograms:
+                        histograms[policy] = Histogram(LOOP_LAG_BUCKETS)
+                    histograms[policy].merge(item["counts"], item["sum"], item["count"])
+                case "slow_callback":
+                    callback = (item.get("policy") or "", item.get("callback") or "")
+                    self._counters["slow_callbacks"][callback] += 1
+                    self._counters["slow_callback_seconds"][callback] += item["value"]
+
+    def render(self) -> List[str]:
+        """Prometheus text-format lines for all pipeline metrics."""
+        lines = []
+        lines += self._render_histogram(
+            "bot_ttfb_seconds", "Time to first byte of pipeline services", "ttfb"
+        )
+        lines += self._render_histogram(
+            "bot_processing_seconds", "Processing time of pipeline services", "processing"
+        )
+        for name, key, help_text in (
+            ("bot_llm_prompt_tokens_total", "prompt_tokens", "LLM prompt tokens used"),
+            ("bot_llm_completion_tokens_total", "completion_tokens", "LLM completion tokens"),
+            ("bot_tts_characters_total", "tts_characters", "Characters sent to TTS"),
+        ):
+            lines += format_metric(name, "counter", help_text, self._counters[key], LABEL_NAMES)
+        lines += self._render_histogram(
+            "bot_event_loop_lag_seconds",
+            "Scheduling lag of bot runners' event loops, by loop policy",
+            "loop_lag",
+            LOOP_LABEL_NAMES,
+        )
+        for name, key, help_text in (
+            (
+                "bot_event_loop_slow_callbacks_total",
+                "slow_callbacks",
+                "Callbacks that blocked a bot runner's event loop beyond the threshold",
+            ),
+            (
+                "bot_event_loop_slow_callback_seconds_total",
+                "slow_callback_seconds",
+                "Time bot runners' event loops were blocked by slow callbacks",
+            ),
+        ):
+            lines += format_metric(
+                name, "counter", help_text, self._counters[key], SLOW_CALLBACK_LABEL_NAMES
+            )
+        return lines
+
+    def _render_histogram(
+        self,
+        name: str,
+        help_text: str,
+        kind: str,
+        label_names: Tuple[str, ...] = LABEL_NAMES,
+    ) -> List[str]:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for labels, histogram in self._histograms[kind].items():
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{name}_bucket{_labels(label_names, labels, le)} {cumulative}")
+            inf = _labels(label_names, labels, 'le="+Inf"')
+            lines.append(f"{name}_bucket{inf} {histogram.count}")
+            lines.append(f"{name}_sum{_labels(label_names, labels)} {histogram.sum!r}")
+            lines.append(f"{name}_count{_labels(label_names, labels)} {histogram.count}")
+        return lines
+
+
+def _provider(processor: str) -> str:
+    """Processor name without its instance suffix, e.g. "DeepgramSTTService#0"."""
+    return re.sub(r"#\d+$", "", processor)
+
+
+def registry_metrics(summary: Dict[str, Any]) -> List[str]:
+    """Bot counts from `BotRegistry.summary()`."""
+    counters = summary["counters"]
+    return [
+        *format_metric("bots_active", "gauge", "Bots currently running", {(): summary["active"]}),
+        *format_metric("bot_rooms", "gauge", "Rooms with running bots", {(): summary["rooms"]}),
+        *format_metric(
+            "bots_started_total", "counter", "Bots started", {(): counters.get("spawned", 0)}
+        ),
+        *format_metric(
+            "bots_exited_total",
+            "counter",
+            "Bots exited, by status",
+            {(status,): counters.get(status, 0) for status in ("finished", "failed")},
+            ("status",),
+        ),
+    ]
+
+
+def admission_metrics(snapshot: Dict[str, Any]) -> List[str]:
+    """Host load and admission state from `AdmissionController.snapshot()`."""
+    lines = [
+        *format_metric("admission_max_bots", "gauge", "Bot budget", {(): snapshot["max_bots"]}),
+        *format_metric("admission_free_slots", "gauge", "Bots admissible", {(): snapshot["free"]}),
+        *format_metric(
+            "admission_queued", "gauge", "Connects waiting for capacity", {(): snapshot["queued"]}
+        ),
+        *format_metric(
+            "host_cpu_utilization",
+            "gauge",
+            "Host CPU utilisation",
+            {(): snapshot["cpu_utilization"]},
+        ),
+    ]
+    if snapshot["mem_available_mb"] is not None:
+        lines += format_metric(
+            "host_memory_available_bytes",
+            "gauge",
+            "Host memory available",
+            {(): int(snapshot["mem_available_mb"] * 1024 * 1024)},
+        )
+    return lines
+
+
+def daily_api_metrics(snapshot: Dict[str, Any]) -> List[str]:
+    """Daily REST API pacing from `RateLimiter.snapshot()`."""
+    return [
+        *format_metric(
+            "daily_api_in_flight",
+            "gauge",
+            "Daily API requests in flight",
+            {(): snapshot["in_flight"]},
+        ),
+        *format_metric(
+            "daily_api_queued",
+            "gauge",
+            "Daily API requests waiting for the rate limiter",
+            {(priority,): count for priority, count in snapshot["queued"].items()},
+            ("priority",),
+        ),
+        *format_metric(
+            "daily_api_throttled_total",
+            "counter",
+            "Daily API responses with status 429",
+            {(): snapshot["throttled"]},
+        ),
+    ]
+
+
+def health_metrics(providers: Dict[str, Dict[str, Any]], ready: bool) -> List[str]:
+    """Provider probe results from `HealthMonitor.snapshot()` and the readiness verdict."""
+    return [
+        *format_metric(
+            "provider_probe_latency_seconds",
+            "gauge",
+            "Mean latency of recent provider health probes",
+            {
+                (name,): probe["latency_ms"] / 1000
+                for name, probe in providers.items()
+                if probe["latency_ms"] is not None
+            },
+            ("provider",),
+        ),
+        *format_metric(
+            "provider_degraded",
+            "gauge",
+            "Whether a provider is degraded or not probed yet",
+            {(name,): int(probe["degraded"] is not None) for name, probe in providers.items()},
+            ("provider",),
+        ),
+        *format_metric("server_ready", "gauge", "Whether /readyz reports ready", {(): int(ready)}),
+    ]
+
+
+def process_metrics(running: Dict[int, Dict[str, Any]]) -> List[str]:
+    """Per-process usage of the bot runners from `ResourceLimiter.running()`."""
+    lines = [
+        *format_metric(
+            "bot_process_cpu_seconds_total",
+            "counter",
+            "CPU time used by bot runner processes",
+            {(str(pid),): usage["cpu_seconds"] for pid, usage in running.items()},
+            ("pid",),
+        ),
+        *format_metric(
+            "bot_process_resident_memory_bytes",
+            "gauge",
+            "Resident memory of bot runner processes",
+            {(str(pid),): usage["rss_bytes"] for pid, usage in running.items()},
+            ("pid",),
+        ),
+    ]
+    throttled = {
+        (str(pid),): usage["cgroup_throttled_seconds"]
+        for pid, usage in running.items()
+        if "cgroup_throttled_seconds" in usage
+    }
+    if throttled:
+        lines += format_metric(
+            "bot_process_cpu_throttled_seconds_total",
+            "counter",
+            "Time bot runner processes were throttled by their cgroup CPU quota",
+            throttled,
+            ("pid",),
+        )
+    return lines
+
+
+def _add_labels(line: str, extra: str) -> str:
+    """Add rendered labels to a sample line; comment lines are returned unchanged."""
+    if not extra or line.startswith("#"):
+        return line
+    name, brace, rest = line.partition("{")
+    if brace:
+        return f"{name}{{{extra},{rest}"
+    name, _, value = line.partition(" ")
+    return f"{name}{{{extra}}} {value}"
+
+
+def render_exposition(
+    *families: Optional[List[str]], labels: Optional[Dict[str, str]] = None
+) -> str:
+    """Join metric families into a Prometheus exposition body.
+
+    `labels` are added to every sample, e.g. the worker serving the scrape.
+    """
+    extra = _labels(labels or {}, (labels or {}).values())[1:-1]
+    lines = (_add_labels(line, extra) for family in families if family for line in family)
+    return "\n".join(lines) + "\n"
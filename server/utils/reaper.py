@@ -0,0 +1,76 @@
+"""Event-driven reaping of bot processes.
+
+Instead of polling every child on a timer, each watched process gets a pidfd
+registered with the event loop; the loop wakes up as soon as the process
+exits, the child is reaped and the exit callback is scheduled right away.
+On platforms without pidfd support a thread blocks in `wait()` instead.
+"""
+
+import asyncio
+import os
+import subprocess
+from typing import Awaitable, Callable, Dict, Set
+
+from loguru import logger
+
+
+class ProcessReaper:
+    """Calls `on_exit` for each watched process as soon as it exits.
+
+    Args:
+        on_exit: Coroutine function called with the reaped process.
+    """
+
+    def __init__(self, on_exit: Callable[[subprocess.Popen], Awaitable[None]]):
+        self._on_exit = on_exit
+        self._pidfds: Dict[int, int] = {}
+        self._waiters: Set[asyncio.Task] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def watch(self, proc: subprocess.Popen) -> None:
+        """Start watching a child process."""
+        loop = asyncio.get_running_loop()
+        try:
+            pidfd = os.pidfd_open(proc.pid)
+        except (AttributeError, OSError):
+            waiter = asyncio.create_task(self._wait_in_thread(proc))
+            self._waiters.add(waiter)
+            waiter.add_done_callback(self._waiters.discard)
+            return
+
+        self._pidfds[proc.pid] = pidfd
+        loop.add_reader(pidfd, self._on_pidfd_ready, proc)
+
+    async def stop(self) -> None:
+        """Stop watching and wait for exit callbacks already in progress."""
+        loop = asyncio.get_running_loop()
+        for pidfd in self._pidfds.values():
+            loop.remove_reader(pidfd)
+            os.close(pidfd)
+        self._pidfds.clear()
+        for waiter in self._waiters:
+            waiter.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _on_pidfd_ready(self, proc: subprocess.Popen) -> None:
+        pidfd = self._pidfds.pop(proc.pid)
+        asyncio.get_running_loop().remove_reader(pidfd)
+        os.close(pidfd)
+        # The process has exited, so this reaps it without blocking
+        proc.wait()
+        self._track(asyncio.create_task(self._dispatch(proc)))
+
+    async def _wait_in_thread(self, proc: subprocess.Popen) -> None:
+        await asyncio.to_thread(proc.wait)
+        self._track(asyncio.create_task(self._dispatch(proc)))
+
+    async def _dispatch(self, proc: subprocess.Popen) -> None:
+        try:
+            await self._on_exit(proc)
+        except Exception as e:
+            logger.error(f"Error handling exit of process {proc.pid}: {e}")
+
+    def _track(self, task: asyncio.Task) -> None:
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,162 @@
+"""Indexed registry of bot processes.
+
+Keeps every bot's record together with per-room and per-state indexes, so
+capacity checks and aggregate views never have to scan all bots, plus
+lifetime counters and a bounded history of recent exits.
+"""
+
+import itertools
+import subprocess
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Literal, Optional, Set
+
+BotState = Literal["running", "finished", "failed"]
+
+# Bot ids not tied to a local process start above the largest possible Linux PID
+SYNTHETIC_BOT_ID_BASE = 1 << 22
+
+
+@dataclass
+class BotRecord:
+    bot_id: int
+    pid: int
+    room_url: str
+    proc: Optional[subprocess.Popen] = field(default=None, repr=False)
+    host: Optional[str] = None
+    state: BotState = "running"
+    started_at: float = field(default_factory=time.time)
+    ended_at: Optional[float] = None
+    exit_code: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.ended_at or time.time()
+        return {
+            "bot_id": self.bot_id,
+            "pid": self.pid,
+            "host": self.host,
+            "status": self.state,
+            "started_at": self.started_at,
+            "ended_at": self.ended_at,
+            "duration": round(end - self.started_at, 3),
+            "exit_code": self.exit_code,
+        }
+
+
+class BotRegistry:
+    """Tracks running and recently finished bots.
+
+    Bots are keyed by `bot_id`, which is the process ID for bots running as local
+    processes and a synthetic ID (see `next_bot_id`) for bots running elsewhere.
+
+    Args:
+        history_size: Number of finished bots kept for status lookups and recent exits.
+        id_block: Block of synthetic IDs to allocate from; workers of a multi-worker server
+            pass their PID so their synthetic IDs never collide.
+    """
+
+    def __init__(self, history_size: int = 100, id_block: int = 0):
+        self._records: Dict[int, BotRecord] = {}
+        self._by_room: Dict[str, Set[int]] = {}
+        self._by_state: Dict[BotState, Set[int]] = {
+            "running": set(),
+            "finished": set(),
+            "failed": set(),
+        }
+        self._history: Deque[int] = deque()
+        self._history_size = history_size
+        self.counters: Counter = Counter()
+        # Each block spans SYNTHETIC_BOT_ID_BASE IDs, so blocks for any PID stay disjoint
+        self._bot_ids = itertools.count(SYNTHETIC_BOT_ID_BASE * (id_block + 1))
+
+    def next_bot_id(self) -> int:
+        """Allocate an ID for a bot that is not a local process."""
+        return next(self._bot_ids)
+
+    def add(
+        self,
+        pid: int,
+        room_url: str,
+        proc: Optional[subprocess.Popen] = None,
+        bot_id: Optional[int] = None,
+        host: Optional[str] = None,
+    ) -> BotRecord:
+        """Register a newly started bot, keyed by its PID unless `bot_id` is given."""
+        bot_id = pid if bot_id is None else bot_id
+        previous = self._records.get(bot_id)
+        if previous and previous.state != "running":
+            # The PID was reused after an earlier bot exited
+            self._history.remove(bot_id)
+            self._forget(bot_id)
+        record = BotRecord(bot_id=bot_id, pid=pid, room_url=room_url, proc=proc, host=host)
+        self._records[record.bot_id] = record
+        self._by_room.setdefault(room_url, set()).add(record.bot_id)
+        self._by_state["running"].add(record.bot_id)
+        self.counters["spawned"] += 1
+        return record
+
+    def finish(self, bot_id: int, exit_code: Optional[int]) -> Optional[BotRecord]:
+        """Mark a running bot as exited.
+
+        Returns:
+            The bot's record, or None if the bot is unknown or already finished.
+        """
+        record = self._records.get(bot_id)
+        if not record or record.state != "running":
+            return None
+
+        record.state = "finished" if exit_code == 0 else "failed"
+        record.exit_code = exit_code
+        record.ended_at = time.time()
+        record.proc = None
+        self._by_state["running"].discard(bot_id)
+        self._by_state[record.state].add(bot_id)
+        room = self._by_room[record.room_url]
+        room.discard(bot_id)
+        if not room:
+            del self._by_room[record.room_url]
+        self.counters[record.state] += 1
+
+        self._history.append(bot_id)
+        while len(self._history) > self._history_size:
+            self._forget(self._history.popleft())
+        return record
+
+    def get(self, bot_id: int) -> Optional[BotRecord]:
+        return self._records.get(bot_id)
+
+    def count_in_room(self, room_url: str) -> int:
+        """Number of running bots in a room."""
+        return len(self._by_room.get(room_url, ()))
+
+    @property
+    def active_count(self) -> int:
+        return len(self._by_state["running"])
+
+    def active(self) -> List[BotRecord]:
+        return [self._records[bot_id] for bot_id in self._by_state["running"]]
+
+    def bots_per_room(self) -> Dict[str, int]:
+        return {room_url: len(bot_ids) for room_url, bot_ids in self._by_room.items()}
+
+    def recent_exits(self) -> List[BotRecord]:
+        """Finished bots, most recent first."""
+        return [self._records[bot_id] for bot_id in reversed(self._history)]
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate view for the status and metrics endpoints."""
+        return {
+            "active": self.active_count,
+            "states": {state: len(bot_ids) for state, bot_ids in self._by_state.items()},
+            "counters": dict(self.counters),
+            "rooms": len(self._by_room),
+        }
+
+    def _forget(self, bot_id: int) -> None:
+        """Drop a finished record once it leaves the history."""
+        record = self._records.get(bot_id)
+        if not record or record.state == "running":
+            return
+        del self._records[bot_id]
+        self._by_state[record.state].discard(bot_id)
@@ -0,0 +1,227 @@
+"""Per-bot CPU pinning, cgroup v2 limits and resource usage.
+
+Bot runners otherwise compete freely for every core, so one bot busy with VAD
+or resampling adds jitter to the audio of its neighbours. The limiter pins
+each runner to one core, spreading runners across the allowed cores, and
+when cgroup v2 is available puts each runner into its own cgroup with a
+memory limit and a CPU quota. Everything is optional and degrades to a
+warning where the host does not support it. Usage is read from /proc (and
+the cgroup, if any) for the status and metrics endpoints.
+"""
+
+import os
+import subprocess
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+CGROUP_MOUNT = "/sys/fs/cgroup"
+
+# cpu.max period, in microseconds
+CPU_PERIOD_US = 100_000
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def parse_cpu_list(value: str) -> List[int]:
+    """Parse a CPU list such as "0-3,6" into CPU numbers."""
+    cpus = []
+    for part in filter(None, (p.strip() for p in value.split(","))):
+        start, _, end = part.partition("-")
+        cpus.extend(range(int(start), int(end or start) + 1))
+    return sorted(set(cpus))
+
+
+def process_usage(pid: int) -> Optional[Dict[str, float]]:
+    """CPU time and resident memory of a process, or None if it is gone."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    # utime and stime are fields 14 and 15 of /proc/<pid>/stat, counted from the pid
+    return {
+        "cpu_seconds": (int(fields[11]) + int(fields[12])) / CLOCK_TICKS,
+        "rss_bytes": resident_pages * PAGE_SIZE,
+    }
+
+
+@dataclass
+class _Placement:
+    proc: subprocess.Popen
+    cpu: Optional[int] = None
+    cgroup: Optional[str] = None
+
+
+class ResourceLimiter:
+    """Applies CPU pinning and cgroup limits to runner processes and reports their usage.
+
+    Args:
+        pin_cpus: Pin each runner to a single core, spread across `cpus`.
+        cpus: Cores available to runners (default: the cores this process may run on).
+        memory_max_mb: cgroup memory limit per bot; 0 disables it.
+        cpu_quota: cgroup CPU quota per bot, in cores; 0 disables it.
+    """
+
+    def __init__(
+        self,
+        pin_cpus: bool = False,
+        cpus: Optional[List[int]] = None,
+        memory_max_mb: float = 0,
+        cpu_quota: float = 0,
+    ):
+        if pin_cpus and not hasattr(os, "sched_setaffinity"):
+            logger.warning("CPU pinning is not supported on this platform")
+            pin_cpus = False
+        self._pin_cpus = pin_cpus
+        self._cpus = (cpus or sorted(os.sched_getaffinity(0))) if pin_cpus else []
+        self._memory_max = int(memory_max_mb * 1024 * 1024)
+        self._cpu_quota = cpu_quota
+        self._placements: Dict[int, _Placement] = {}
+        self._next_cpu = 0
+        # Processes are placed from the spawner's threads
+        self._lock = threading.Lock()
+        self._cgroup_parent: Optional[str] = None
+        if self._memory_max or self._cpu_quota:
+            self._cgroup_parent = self._setup_cgroups()
+
+    def apply(self, proc: subprocess.Popen, slots: int = 1) -> None:
+        """Pin a newly started runner and move it into its own cgroup.
+
+        Args:
+            proc: The runner process.
+            slots: Number of bots the process hosts; scales its cgroup limits.
+        """
+        with self._lock:
+            self._prune()
+            placement = self._placements[proc.pid] = _Placement(proc=proc)
+            if self._pin_cpus:
+                placement.cpu = self._pick_cpu()
+        if placement.cpu is not None:
+            try:
+                os.sched_setaffinity(proc.pid, {placement.cpu})
+            except OSError as e:
+                logger.warning(f"Failed to pin process {proc.pid} to CPU {placement.cpu}: {e}")
+                placement.cpu = None
+        if self._cgroup_parent:
+            placement.cgroup = self._create_cgroup(proc.pid, slots)
+
+    def usage(self, pid: int) -> Optional[Dict[str, Any]]:
+        """Resource usage and placement of a runner, or None if it is unknown or gone."""
+        usage = process_usage(pid)
+        if usage is None:
+            return None
+        placement = self._placements.get(pid)
+        if placement:
+            usage["cpu"] = placement.cpu
+            if placement.cgroup:
+                usage.update(self._cgroup_usage(placement.cgroup))
+        return usage
+
+    def running(self) -> Dict[int, Dict[str, Any]]:
+        """Usage of every runner placed by this limiter that is still running."""
+        with self._lock:
+            self._prune()
+            pids = list(self._placements)
+        return {pid: usage for pid in pids if (usage := self.usage(pid)) is not None}
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._prune()
+            per_cpu = {cpu: 0 for cpu in self._cpus}
+            for placement in self._placements.values():
+                if placement.cpu is not None:
+                    per_cpu[placement.cpu] += 1
+        return {
+            "cpu_pinning": self._pin_cpus,
+            "runners_per_cpu": per_cpu,
+            "cgroups": self._cgroup_parent is not None,
+            "memory_max_mb": self._memory_max // (1024 * 1024) or None,
+            "cpu_quota": self._cpu_quota or None,
+        }
+
+    def _pick_cpu(self) -> int:
+        """Least loaded core, taking cores in turn among equally loaded ones."""
+        load = {cpu: 0 for cpu in self._cpus}
+        for placement in self._placements.values():
+            if placement.cpu in load:
+                load[placement.cpu] += 1
+        order = self._cpus[self._next_cpu :] + self._cpus[: self._next_cpu]
+        cpu = min(order, key=lambda c: load[c])
+        self._next_cpu = (self._cpus.index(cpu) + 1) % len(self._cpus)
+        return cpu
+
+    def _prune(self) -> None:
+        """Forget runners that exited and remove their cgroups."""
+        for pid, placement in list(self._placements.items()):
+            if placement.proc.poll() is None:
+                continue
+            del self._placements[pid]
+            if placement.cgroup:
+                try:
+                    os.rmdir(placement.cgroup)
+                except OSError as e:
+                    logger.warning(f"Failed to remove cgroup {placement.cgroup}: {e}")
+
+    def _setup_cgroups(self) -> Optional[str]:
+        """Prepare a cgroup whose children get the cpu and memory controllers.
+
+        cgroup v2 only allows controllers in a child's subtree when the parent holds no
+        processes, so the server first moves itself into a `server` leaf of its cgroup.
+        """
+        if not os.path.exists(os.path.join(CGROUP_MOUNT, "cgroup.controllers")):
+            logger.warning("cgroup v2 is not available, bot memory and CPU limits are disabled")
+            return None
+        try:
+            with open("/proc/self/cgroup") as f:
+                own = next(line[3:].strip() for line in f if line.startswith("0::"))
+            base = os.path.join(CGROUP_MOUNT, own.lstrip("/"))
+            controllers = " ".join(f"+{c}" for c in ("cpu", "memory") if self._controller_wanted(c))
+            leaf = os.path.join(base, "server")
+            os.makedirs(leaf, exist_ok=True)
+            with open(os.path.join(leaf, "cgroup.procs"), "w") as f:
+                f.write(str(os.getpid()))
+            with open(os.path.join(base, "cgroup.subtree_control"), "w") as f:
+                f.write(controllers)
+        except (OSError, StopIteration) as e:
+            logger.warning(f"Cannot delegate cgroup controllers, bot limits are disabled: {e}")
+            return None
+        logger.info(f"Bot runners get their own cgroups under {base}")
+        return base
+
+    def _controller_wanted(self, controller: str) -> bool:
+        return bool(self._cpu_quota) if controller == "cpu" else bool(self._memory_max)
+
+    def _create_cgroup(self, pid: int, slots: int) -> Optional[str]:
+        path = os.path.join(self._cgroup_parent, f"bot-{pid}")
+        try:
+            os.makedirs(path, exist_ok=True)
+            if self._memory_max:
+                with open(os.path.join(path, "memory.max"), "w") as f:
+                    f.write(str(self._memory_max * slots))
+            if self._cpu_quota:
+                with open(os.path.join(path, "cpu.max"), "w") as f:
+                    f.write(f"{int(self._cpu_quota * slots * CPU_PERIOD_US)} {CPU_PERIOD_US}")
+            with open(os.path.join(path, "cgroup.procs"), "w") as f:
+                f.write(str(pid))
+        except OSError as e:
+            logger.warning(f"Failed to apply cgroup limits to process {pid}: {e}")
+            return None
+        return path
+
+    def _cgroup_usage(self, path: str) -> Dict[str, Any]:
+        usage: Dict[str, Any] = {}
+        try:
+            with open(os.path.join(path, "memory.current")) as f:
+                usage["cgroup_memory_bytes"] = int(f.read())
+            with open(os.path.join(path, "cpu.stat")) as f:
+                stats = dict(line.split() for line in f)
+            usage["cgroup_throttled_seconds"] = int(stats.get("throttled_usec", 0)) / 1e6
+        except (OSError, ValueError):
+            pass
+        return usage
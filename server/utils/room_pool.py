@@ -0,0 +1,272 @@
+"""Pool of pre-provisioned Daily rooms and meeting tokens.
+
+Creating a room and minting its token are two Daily REST round trips on the
+connect path. The pool creates rooms ahead of time with an expiry, hands them
+out instantly and tops itself up in the background. When a bot finishes, its
+room is either recycled (if recycling is enabled and the room has enough
+lifetime left) or deleted.
+
+Daily meeting tokens cannot be revoked, so the caller of a recycled room could
+rejoin it with their token while it serves the next call. Recycled rooms are
+therefore handed out with a token minted for the call, which expires after
+`call_ttl` and ejects its holder, and a released room only returns to the pool
+once that token has expired.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Literal, Optional, Set, Tuple
+
+from loguru import logger
+from pipecat.transports.services.helpers.daily_rest import (
+    DailyMeetingTokenParams,
+    DailyMeetingTokenProperties,
+    DailyRoomParams,
+    DailyRoomProperties,
+)
+
+from .daily_client import PRIORITY_CONNECT, DailyClient
+from .ledger import Ledger
+
+# How often idle rooms are checked for expiry
+EXPIRY_CHECK_INTERVAL_SECS = 30.0
+
+# Delay before retrying after a failed top-up
+TOP_UP_RETRY_SECS = 5.0
+
+
+@dataclass
+class PooledRoom:
+    url: str
+    expires_at: float
+    # Token minted with the room; recycled rooms get a new token for every call instead
+    token: Optional[str] = None
+    # When the token of the room's last call expires
+    token_expires_at: float = 0.0
+    uses: int = 0
+
+    def remaining(self) -> float:
+        return self.expires_at - time.time()
+
+
+class RoomPool:
+    """Keeps `size` Daily rooms with tokens ready to hand out.
+
+    Args:
+        size: Number of idle rooms to keep. Zero disables the pool.
+        room_ttl: Lifetime of pooled rooms and their tokens, in seconds.
+        min_remaining: Minimum lifetime a room must have left to be handed out or recycled.
+        recycle: Whether finished rooms go back to the pool instead of being deleted.
+        max_uses: Maximum number of calls served by a recycled room.
+        call_ttl: Lifetime of the per-call tokens of recycled rooms, in seconds; participants
+            are ejected when it ends.
+        ledger: Records the rooms the pool creates and deletes, if set.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        room_ttl: float,
+        min_remaining: float,
+        recycle: bool = False,
+        max_uses: int = 1,
+        call_ttl: float = 900.0,
+        ledger: Optional[Ledger] = None,
+    ):
+        self._size = size
+        self._room_ttl = room_ttl
+        self._min_remaining = min_remaining
+        self._recycle = recycle
+        self._max_uses = max_uses
+        self._call_ttl = call_ttl
+        self._ledger = ledger
+        self._helper: Optional[DailyClient] = None
+        self._idle: Deque[PooledRoom] = deque()
+        self._in_use: Dict[str, PooledRoom] = {}
+        # Released rooms waiting for the token of their last call to expire
+        self._cooling: List[PooledRoom] = []
+        self._creating = 0
+        self._deletions: Set[asyncio.Task] = set()
+        self._refill = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._size > 0
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    async def start(self, helper: DailyClient) -> None:
+        """Start filling the pool in the background using the given Daily client."""
+        self._helper = helper
+        if not self.enabled:
+            return
+        self._refill.set()
+        self._task = asyncio.create_task(self._maintain())
+
+    async def stop(self) -> None:
+        """Stop topping up and delete rooms that were never handed out."""
+        # Python 3.11's wait_for can swallow a cancellation that races the refill event, so the
+        # loop also checks this flag
+        self._stopping = True
+        self._refill.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        idle = list(self._idle) + self._cooling
+        self._idle.clear()
+        self._cooling.clear()
+        await asyncio.gather(*(self._delete(room.url) for room in idle))
+
+    async def acquire(self) -> Optional[Tuple[str, str]]:
+        """Take a ready room, minting its token for this call if rooms are recycled.
+
+        Returns:
+            The room URL and token, or None if the pool has no usable room.
+        """
+        while self._idle:
+            room = self._idle.popleft()
+            if room.remaining() < self._min_remaining:
+                self._delete_later(room.url)
+                continue
+            if self._recycle:
+                try:
+                    room.token = await self._call_token(room)
+                except Exception as e:
+                    logger.warning(f"Failed to get a token for pooled room {room.url}: {e}")
+                    self._idle.appendleft(room)
+                    return None
+            room.uses += 1
+            self._in_use[room.url] = room
+            self._refill.set()
+            return room.url, room.token
+        if self.enabled:
+            self._refill.set()
+        return None
+
+    async def release(self, room_url: str) -> Literal["recycled", "deleted"]:
+        """Return a room after its bot finished, recycling it or deleting it.
+
+        Returns:
+            Whether the room was recycled or deleted.
+        """
+        room = self._in_use.pop(room_url, None)
+        if (
+            room
+            and self._recycle
+            and room.uses < self._max_uses
+            and room.expires_at - room.token_expires_at >= self._min_remaining
+            and len(self._idle) + len(self._cooling) < self._size
+        ):
+            # The next call must not be given a token cached for this one
+            self._helper.forget_tokens(room_url)
+            self._cooling.append(room)
+            logger.info(
+                f"Recycling room {room_url} once its call's token expires "
+                f"({room.uses}/{self._max_uses} uses)"
+            )
+            return "recycled"
+
+        await self._helper.delete_room_by_url(room_url)
+        logger.success(f"Successfully deleted room {room_url}")
+        return "deleted"
+
+    async def _maintain(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._refill.wait(), timeout=EXPIRY_CHECK_INTERVAL_SECS)
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping:
+                return
+            self._refill.clear()
+            self._reuse_cooled()
+            self._expire_idle()
+
+            # Rooms waiting to be recycled take the place of new ones
+            missing = self._size - len(self._idle) - len(self._cooling) - self._creating
+            if missing <= 0:
+                continue
+            self._creating += missing
+            try:
+                results = await asyncio.gather(
+                    *(self._create() for _ in range(missing)), return_exceptions=True
+                )
+            finally:
+                self._creating -= missing
+
+            failures = [r for r in results if isinstance(r, Exception)]
+            self._idle.extend(r for r in results if isinstance(r, PooledRoom))
+            if failures:
+                logger.error(f"Failed to create {len(failures)} pooled room(s): {failures[0]}")
+                await asyncio.sleep(TOP_UP_RETRY_SECS)
+                self._refill.set()
+            else:
+                logger.debug(f"Room pool topped up ({len(self._idle)} idle)")
+
+    def _reuse_cooled(self) -> None:
+        now = time.time()
+        for room in [r for r in self._cooling if r.token_expires_at <= now]:
+            self._cooling.remove(room)
+            if len(self._idle) < self._size:
+                self._idle.append(room)
+            else:
+                self._delete_later(room.url)
+
+    def _expire_idle(self) -> None:
+        for room in [r for r in self._idle if r.remaining() < self._min_remaining]:
+            self._idle.remove(room)
+            self._delete_later(room.url)
+
+    def _delete_later(self, room_url: str) -> None:
+        task = asyncio.create_task(self._delete(room_url))
+        self._deletions.add(task)
+        task.add_done_callback(self._deletions.discard)
+
+    async def _create(self) -> PooledRoom:
+        expires_at = time.time() + self._room_ttl
+        room = await self._helper.create_room(
+            DailyRoomParams(properties=DailyRoomProperties(exp=expires_at))
+        )
+        if self._ledger:
+            self._ledger.submit(self._ledger.room_created, room.url)
+        if self._recycle:
+            return PooledRoom(url=room.url, expires_at=expires_at)
+        try:
+            token = await self._helper.get_token(room.url, expiry_time=self._room_ttl)
+        except Exception:
+            # Nothing else knows the room: delete it, or leave it orphaned for the GC
+            await self._delete(room.url)
+            raise
+        return PooledRoom(url=room.url, token=token, expires_at=expires_at)
+
+    async def _call_token(self, room: PooledRoom) -> str:
+        # Minted with properties, so that it is never taken from or added to a token cache
+        lifetime = min(self._call_ttl, room.remaining())
+        params = DailyMeetingTokenParams(
+            properties=DailyMeetingTokenProperties(eject_at_token_exp=True)
+        )
+        token = await self._helper.get_token(
+            room.url, expiry_time=lifetime, params=params, priority=PRIORITY_CONNECT
+        )
+        room.token_expires_at = time.time() + lifetime
+        return token
+
+    async def _delete(self, room_url: str) -> None:
+        try:
+            await self._helper.delete_room_by_url(room_url)
+        except Exception as e:
+            logger.error(f"Failed to delete pooled room {room_url}: {e}")
+            if self._ledger:
+                self._ledger.submit(self._ledger.room_orphaned, room_url)
+            return
+        if self._ledger:
+            self._ledger.submit(self._ledger.room_deleted, room_url)
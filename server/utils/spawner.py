@@ -0,0 +1,74 @@
+"""Bot runner spawning off the server event loop.
+
+`subprocess.Popen` blocks the calling thread until the child has exec'd, and
+copying `os.environ` for every call adds more work on the request path. The
+spawner builds the command prefix and environment once and runs `Popen` on a
+small dedicated thread pool, so a burst of connects never stalls the loop
+that serves every other request. CPU pinning and cgroup limits, if
+configured, are applied on the same threads right after the process starts.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+
+from .resources import ResourceLimiter
+
+
+class BotSpawner:
+    """Starts runner.py processes on a dedicated thread pool.
+
+    Args:
+        server_dir: Directory containing runner.py; used as working directory and PYTHONPATH.
+        bot_args: CLI arguments forwarded to every runner.
+        threads: Number of threads available for concurrent spawns.
+        runner: Runner script, relative to `server_dir`.
+        limiter: Applies CPU pinning and cgroup limits to every started runner.
+    """
+
+    def __init__(
+        self,
+        server_dir: str,
+        bot_args: List[str],
+        threads: int = 4,
+        runner: str = "runner.py",
+        limiter: Optional[ResourceLimiter] = None,
+    ):
+        self._server_dir = server_dir
+        self._limiter = limiter
+        self._cmd = [sys.executable, os.path.join(server_dir, runner)]
+        self._bot_args = bot_args
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="spawner")
+
+        # Set up environment with proper Python path
+        self._env: Dict[str, str] = os.environ.copy()
+        self._env["PYTHONPATH"] = server_dir  # Set server directory as Python path
+
+    async def spawn(self, *runner_args: str, slots: int = 1, **popen_kwargs) -> subprocess.Popen:
+        """Start the runner with the given arguments followed by the forwarded CLI arguments.
+
+        Args:
+            slots: Number of bots the runner will host, which scales its cgroup limits.
+        """
+        cmd = [*self._cmd, *runner_args, *self._bot_args]
+        start = partial(self._start, cmd, slots, popen_kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, start)
+
+    def _start(self, cmd: List[str], slots: int, popen_kwargs: Dict) -> subprocess.Popen:
+        proc = subprocess.Popen(
+            cmd,
+            cwd=self._server_dir,  # Run from server directory
+            env=self._env,
+            **popen_kwargs,
+        )
+        if self._limiter:
+            self._limiter.apply(proc, slots)
+        return proc
+
+    def shutdown(self) -> None:
+        """Release the spawn threads."""
+        self._executor.shutdown(wait=False)
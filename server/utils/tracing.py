@@ -0,0 +1,335 @@
+"""Trace spans from a connect request into the bot pipeline.
+
+The server starts a trace for every connect (continuing the caller's W3C
+`traceparent` if it sent one) and hands the connect span's context to the
+bot runner, whose spans for the call then join the same trace. Spans are
+exported in batches as OTLP/JSON, either appended to a file (one export
+request per line, as written by the OpenTelemetry collector's file exporter)
+or posted to a collector's OTLP/HTTP endpoint. Without an exporter spans are
+still created, so trace IDs show up in responses and logs, but not exported.
+"""
+
+import contextvars
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+# Seconds between exports of finished spans
+FLUSH_INTERVAL_SECS = 1.0
+
+# Spans exported per batch at most
+MAX_BATCH = 512
+
+# Finished spans waiting for export at most; further spans are dropped until the queue drains
+MAX_QUEUED_SPANS = 10_000
+
+HEX_DIGITS = "0123456789abcdef"
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Trace ID and parent span ID from a W3C traceparent header, or None if it is invalid."""
+    parts = (value or "").strip().lower().split("-")
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == "ff":
+        return None
+    trace_id, span_id = parts[1], parts[2]
+    if len(trace_id) != 32 or len(span_id) != 16:
+        return None
+    # Lowercase hex digits only (int() would also take a sign), and not all zeros
+    if not set(trace_id + span_id) <= set(HEX_DIGITS):
+        return None
+    if not int(trace_id, 16) or not int(span_id, 16):
+        return None
+    return trace_id, span_id
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    kind: int = KIND_INTERNAL
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _attributes(self.attributes),
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+class SpanExporter(ABC):
+    """Destination of finished spans, as OTLP/JSON export requests."""
+
+    @abstractmethod
+    def export(self, request: Dict[str, Any]) -> None:
+        pass
+
+
+class FileExporter(SpanExporter):
+    """Appends one export request per line to a file shared by the server and its bots."""
+
+    def __init__(self, path: str):
+        self._path = path
+
+    def export(self, request: Dict[str, Any]) -> None:
+        line = (json.dumps(request, separators=(",", ":")) + "\n").encode()
+        # A single O_APPEND write keeps lines from concurrent processes intact
+        fd = os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+
+class OtlpHttpExporter(SpanExporter):
+    """Posts export requests to an OTLP/HTTP collector, e.g. http://localhost:4318."""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        endpoint = endpoint.rstrip("/")
+        self._url = endpoint if endpoint.endswith("/v1/traces") else f"{endpoint}/v1/traces"
+        self._timeout = timeout
+
+    def export(self, request: Dict[str, Any]) -> None:
+        body = json.dumps(request, separators=(",", ":")).encode()
+        http_request = urllib.request.Request(
+            self._url, data=body, headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(http_request, timeout=self._timeout) as response:
+            response.read()
+
+
+class Tracer:
+    """Creates spans and exports finished ones in batches from a background thread.
+
+    Args:
+        service_name: Reported as the `service.name` resource attribute.
+        exporters: Destinations of finished spans; none disables exporting.
+        resource: Further resource attributes, e.g. the process id.
+    """
+
+    def __init__(
+        self,
+        service_name: str,
+        exporters: Optional[List[SpanExporter]] = None,
+        resource: Optional[Dict[str, Any]] = None,
+    ):
+        self._exporters = exporters or []
+        self._resource = {"service.name": service_name, **(resource or {})}
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(MAX_QUEUED_SPANS)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._exporters)
+
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[Span | str] = None,
+        kind: int = KIND_INTERNAL,
+        start_ns: Optional[int] = None,
+        **attributes: Any,
+    ) -> Span:
+        """Start a span.
+
+        Args:
+            name: Span name.
+            parent: Parent span or W3C traceparent; defaults to the current span. A new
+                trace is started without a (valid) parent.
+            kind: OTLP span kind.
+            start_ns: Start time in Unix nanoseconds (default: now).
+            **attributes: Span attributes.
+        """
+        if parent is None:
+            parent = _current.get()
+        if isinstance(parent, Span):
+            context = (parent.trace_id, parent.span_id)
+        else:
+            context = parse_traceparent(parent)
+        trace_id, parent_span_id = context or (secrets.token_hex(16), None)
+        span = Span(name, trace_id, secrets.token_hex(8), parent_span_id, kind)
+        if start_ns is not None:
+            span.start_ns = start_ns
+        span.attributes.update(attributes)
+        return span
+
+    def end_span(self, span: Span, end_ns: Optional[int] = None) -> None:
+        if span.end_ns is not None:
+            return
+        span.end_ns = end_ns or time.time_ns()
+        if self._exporters:
+            self._ensure_thread()
+            try:
+                self._queue.put_nowait(span)
+            except queue.Full:
+                # Exporting fell behind; never block the caller or grow without bound
+                if self.dropped % MAX_QUEUED_SPANS == 0:
+                    logger.warning("Span export queue full, dropping spans")
+                self.dropped += 1
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        parent: Optional[Span | str] = None,
+        kind: int = KIND_INTERNAL,
+        **attributes,
+    ) -> Iterator[Span]:
+        """Run a block in a span that is the current span inside it; exceptions mark it failed."""
+        span = self.start_span(name, parent, kind, **attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current.reset(token)
+            self.end_span(span)
+
+    def record(
+        self,
+        name: str,
+        start_ns: int,
+        end_ns: int,
+        parent: Optional[Span | str] = None,
+        kind: int = KIND_INTERNAL,
+        **attributes: Any,
+    ) -> Span:
+        """Export a span whose start and end are already known."""
+        span = self.start_span(name, parent, kind, start_ns, **attributes)
+        self.end_span(span, end_ns)
+        return span
+
+    def shutdown(self) -> None:
+        """Export the remaining spans and stop the export thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread:
+            try:
+                self._queue.put(None, timeout=5)
+            except queue.Full:
+                pass
+            thread.join(timeout=5)
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-export", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Span] = []
+            deadline = time.monotonic() + FLUSH_INTERVAL_SECS
+            while len(batch) < MAX_BATCH:
+                try:
+                    span = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if span is None:
+                    stopping = True
+                    break
+                batch.append(span)
+            if batch:
+                try:
+                    self._export(batch)
+                except Exception as e:
+                    # Keep the thread alive, or spans would queue up with nobody exporting them
+                    logger.error(f"Failed to export {len(batch)} spans: {e}")
+
+    def _export(self, batch: List[Span]) -> None:
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _attributes(self._resource)},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "lead-qualifier"},
+                            "spans": [span.to_otlp() for span in batch],
+                        }
+                    ],
+                }
+            ]
+        }
+        for exporter in self._exporters:
+            try:
+                exporter.export(request)
+            except Exception as e:
+                # E.g. a collector that is down, or a malformed OTEL_EXPORTER_OTLP_ENDPOINT
+                logger.warning(f"Failed to export {len(batch)} spans: {e}")
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def create_tracer(
+    service_name: str,
+    traces_file: Optional[str] = None,
+    otlp_endpoint: Optional[str] = None,
+    **resource: Any,
+) -> Tracer:
+    """Tracer exporting to a file and/or an OTLP/HTTP collector, if given."""
+    exporters: List[SpanExporter] = []
+    if traces_file:
+        exporters.append(FileExporter(traces_file))
+    if otlp_endpoint:
+        exporters.append(OtlpHttpExporter(otlp_endpoint))
+    return Tracer(service_name, exporters, resource)
+
+
+def _attributes(values: Dict[str, Any]) -> List[Dict[str, Any]]:
+    attributes = []
+    for key, value in values.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        attributes.append({"key": key, "value": typed})
+    return attributes
@@ -0,0 +1,146 @@
+"""Pool of pre-started bot runner processes.
+
+Starting `runner.py` from scratch means importing pipecat, every TTS/LLM
+service and the Silero VAD stack before the bot can join its room. The pool
+keeps a number of runners that have already done that work and are blocked
+waiting for a room assignment on stdin, so handing out a call only costs a
+pipe write. Used workers are replaced in the background.
+"""
+
+import asyncio
+import json
+import subprocess
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from loguru import logger
+
+from .ipc import read_messages
+
+# Delay before spawning again after a worker died before becoming ready
+RESPAWN_BACKOFF_SECS = 5.0
+
+
+class WorkerPool:
+    """Keeps `size` idle, fully imported runner processes ready for assignment.
+
+    Args:
+        size: Number of idle workers to keep. Zero disables the pool.
+        spawn: Coroutine function starting a runner in worker mode with stdin and stdout piped.
+        on_message: Called with the worker's PID and every other message it sends.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        spawn: Callable[[], Awaitable[subprocess.Popen]],
+        on_message: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    ):
+        self._size = size
+        self._spawn = spawn
+        self._on_message = on_message
+        self._idle: Deque[subprocess.Popen] = deque()
+        self._warming: Dict[int, subprocess.Popen] = {}
+        self._readers: Dict[int, asyncio.Task] = {}
+        self._refill = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._size > 0
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    async def start(self) -> None:
+        """Start filling the pool in the background."""
+        if not self.enabled:
+            return
+        self._refill.set()
+        self._task = asyncio.create_task(self._maintain())
+
+    async def stop(self) -> None:
+        """Stop refilling and terminate workers that were never assigned a room."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        for proc in [*self._idle, *self._warming.values()]:
+            proc.terminate()
+            reader = self._readers.pop(proc.pid, None)
+            if reader:
+                reader.cancel()
+        self._idle.clear()
+        self._warming.clear()
+
+    def acquire(
+        self,
+        room_url: str,
+        token: str,
+        traceparent: Optional[str] = None,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> Optional[subprocess.Popen]:
+        """Hand a room to an idle worker, with the trace context its spans continue and the
+        profile payload it runs with. Workers preload their own profile's providers, so a call
+        with another profile imports its providers when it starts.
+
+        Returns:
+            The worker process now serving the room, or None if no worker is ready.
+        """
+        while self._idle:
+            proc = self._idle.popleft()
+            if proc.poll() is not None:
+                continue
+            try:
+                assignment = {
+                    "room_url": room_url,
+                    "token": token,
+                    "traceparent": traceparent,
+                    "profile": profile,
+                }
+                proc.stdin.write(json.dumps(assignment).encode() + b"\n")
+                proc.stdin.close()
+            except OSError as e:
+                logger.warning(f"Failed to hand room to worker {proc.pid}: {e}")
+                continue
+            self._refill.set()
+            logger.info(f"Assigned room {room_url} to warm worker {proc.pid}")
+            return proc
+        self._refill.set()
+        return None
+
+    async def _maintain(self) -> None:
+        while True:
+            await self._refill.wait()
+            self._refill.clear()
+            while len(self._idle) + len(self._warming) < self._size:
+                try:
+                    proc = await self._spawn()
+                except Exception as e:
+                    logger.error(f"Failed to start warm worker: {e}")
+                    await asyncio.sleep(RESPAWN_BACKOFF_SECS)
+                    continue
+                self._warming[proc.pid] = proc
+                self._readers[proc.pid] = asyncio.create_task(self._read_worker(proc))
+
+    async def _read_worker(self, proc: subprocess.Popen) -> None:
+        """Track a worker's readiness and drain its channel for the rest of its life."""
+        async for message in read_messages(proc.stdout):
+            if message.get("type") == "ready" and self._warming.pop(proc.pid, None):
+                self._idle.append(proc)
+                logger.debug(f"Warm worker {proc.pid} ready ({len(self._idle)} idle)")
+            elif self._on_message:
+                self._on_message(proc.pid, message)
+
+        self._readers.pop(proc.pid, None)
+        if self._warming.pop(proc.pid, None):
+            logger.error(f"Warm worker {proc.pid} exited before becoming ready")
+            await asyncio.sleep(RESPAWN_BACKOFF_SECS)
+            self._refill.set()
+        elif proc in self._idle:
+            logger.warning(f"Idle warm worker {proc.pid} exited")
+            self._idle.remove(proc)
+            self._refill.set()